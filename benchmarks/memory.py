@@ -0,0 +1,103 @@
+"""
+Memory benchmark: bytes per record and footprint over a long-running audit stream.
+
+    python benchmarks/memory.py --records 1000000 --output memory.json
+
+Audits are simulated (no model, no statement), so the numbers cover only
+what VouchVault keeps per audit: AuditRecord, AuditMemory with and without
+a capacity, and AuditEvaluator with its bounded history. Traced memory is
+sampled at each tenth of the stream; a bounded store should stay flat.
+Timings run under tracemalloc and are several times slower than normal.
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import VENDORS  # noqa: E402
+from vouchvault.evaluation import AuditEvaluator  # noqa: E402
+from vouchvault.memory import AuditMemory, AuditRecord  # noqa: E402
+
+STATUSES = ("PASS", "FAIL")
+SAMPLES = 10
+
+
+def record(i: int) -> AuditRecord:
+    return AuditRecord(f"INV-{i:09d}", VENDORS[i % len(VENDORS)], 1000.0 + i % 997, STATUSES[i % 7 == 0])
+
+
+def record_size(count: int) -> Dict[str, float]:
+    """Traced bytes per AuditRecord, invoice ID included, when `count` are alive at once."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = [record(i) for i in range(count)]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del records
+    return {"ops": count, "bytes_per_op": round(used / count, 1)}
+
+
+def stream(name: str, count: int, step: Callable[[int], None]) -> Dict[str, object]:
+    """Feed `count` audits through `step`, sampling traced memory as the stream goes."""
+    tracemalloc.start()
+    samples: List[float] = []
+    start = time.perf_counter()
+    every = max(1, count // SAMPLES)
+    for i in range(count):
+        step(i)
+        if (i + 1) % every == 0:
+            samples.append(round(tracemalloc.get_traced_memory()[0] / 2**20, 2))
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    growth = samples[-1] - samples[len(samples) // 2] if len(samples) > 1 else 0.0
+    print(f"{name:<28}{peak / 2**20:>10.1f} MB peak{growth:>+10.2f} MB over the second half")
+    return {"ops": count, "seconds": round(seconds, 6), "per_op_us": round(seconds / count * 1e6, 3),
+            "ops_per_sec": round(count / seconds, 1), "peak_mb": round(peak / 2**20, 2),
+            "traced_mb": samples, "second_half_growth_mb": round(growth, 2)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=100_000, help="Audits fed through each store")
+    parser.add_argument("--capacity", type=int, default=10_000, help="Ring size for the bounded stores")
+    parser.add_argument("--output", help="Write results to this JSON file (same layout as run.py)")
+    args = parser.parse_args()
+
+    results = {"audit_record": record_size(min(args.records, 100_000))}
+    print(f"{'audit_record':<28}{results['audit_record']['bytes_per_op']:>10.1f} bytes each")
+
+    unbounded = AuditMemory()
+    results["memory_unbounded"] = stream("memory_unbounded", args.records,
+                                         lambda i: unbounded.add_record(record(i)))
+    del unbounded
+    bounded = AuditMemory(capacity=args.capacity, expected_records=args.records)
+    results["memory_ring"] = stream("memory_ring", args.records, lambda i: bounded.add_record(record(i)))
+    del bounded
+
+    evaluator = AuditEvaluator(history_size=args.capacity)
+
+    def audit(i: int) -> None:
+        metrics = evaluator.start_audit(f"INV-{i:09d}")
+        metrics.status = STATUSES[i % 7 == 0]
+        metrics.record("rules", 1_000 + i % 5_000)
+        evaluator.finish_audit(metrics)
+
+    results["evaluator"] = stream("evaluator", args.records, audit)
+    results["max_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    print(f"{'max_rss':<28}{results['max_rss_mb']:>10.1f} MB")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"config": {"size": "memory", "records": args.records, "capacity": args.capacity},
+                       "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Benchmark suite: tool microbenchmarks and end-to-end batch throughput on synthetic data.
+
+    python benchmarks/run.py --size 1k --output bench.json
+    python benchmarks/run.py --size 100k --output new.json --compare bench.json
+    python benchmarks/run.py --size 10m --only micro
+
+Results are saved as JSON (with the git commit and environment) so runs can
+be compared across commits; --compare exits non-zero on a regression.
+The model is replaced by vouchvault.fake.FakeAnalyst, or replayed from a
+recording through real AnalystAgents, so no API key is used.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import SIZES, make_dataset, write_statement_csv  # noqa: E402
+from vouchvault.analyst import AnalystAgent  # noqa: E402
+from vouchvault.backends import RecordingBackend, RecordingStore, ReplayBackend  # noqa: E402
+from vouchvault.batch import run_batch, run_batch_concurrent, run_batch_processes  # noqa: E402
+from vouchvault.compliance import check_tax_compliance_bulk  # noqa: E402
+from vouchvault.context import build_context  # noqa: E402
+from vouchvault.fake import FakeAnalyst, FakeModel  # noqa: E402
+from vouchvault.invoice import parse_invoice  # noqa: E402
+from vouchvault.matching import DEBIT, StatementIndex  # noqa: E402
+from vouchvault.rules import precheck, statement_indexes  # noqa: E402
+from vouchvault.statement import load_bank_statement  # noqa: E402
+from vouchvault.tools import calculate_tax_compliance  # noqa: E402
+from vouchvault.vendors import VendorIndex  # noqa: E402
+
+INVOICES = {"1k": 120, "100k": 1_200, "10m": 6_000}
+GROUPS = ("micro", "io", "e2e")
+
+
+def measure(fn: Callable[[], object], ops: int, repeat: int) -> Dict[str, float]:
+    """Best of `repeat` runs of `fn`, which performs `ops` operations."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return {
+        "ops": ops,
+        "seconds": round(best, 6),
+        "per_op_us": round(best / ops * 1e6, 3),
+        "ops_per_sec": round(ops / best, 1) if best else float("inf"),
+    }
+
+
+def micro(data, repeat: int) -> Dict[str, dict]:
+    statement = data.statement
+    texts = [text for _, text in data.invoices]
+    invoices = [parse_invoice(text) for text in texts]
+    vendors = [invoice.vendor for invoice in invoices]
+    totals = [invoice.total for invoice in invoices]
+    subtotals = np.array([invoice.subtotal for invoice in invoices])
+    taxes = np.array([invoice.tax for invoice in invoices])
+    lines = len(statement)
+    bulk_subtotals = np.resize(subtotals, lines)
+    bulk_taxes = np.resize(taxes, lines)
+
+    results = {
+        "parse_invoice": measure(lambda: [parse_invoice(t) for t in texts], len(texts), repeat),
+        "calculate_tax_compliance": measure(
+            lambda: [calculate_tax_compliance(s, t) for s, t in zip(subtotals, taxes)], len(texts), repeat),
+        "check_tax_compliance_bulk": measure(
+            lambda: check_tax_compliance_bulk(bulk_subtotals, bulk_taxes), lines, repeat),
+        "statement_index_build": measure(lambda: StatementIndex.from_statement(statement), 1, repeat),
+        "vendor_index_build": measure(lambda: VendorIndex.from_statement(statement), 1, 1),
+    }
+    amounts = StatementIndex.from_statement(statement)
+    vendor_index = VendorIndex.from_statement(statement)
+    results["amount_find"] = measure(
+        lambda: [amounts.find(total, tolerance=50, direction=DEBIT) for total in totals], len(totals), repeat)
+    results["amount_split"] = measure(
+        lambda: [amounts.find_split(total, tolerance=50, date=invoice.date, direction=DEBIT)
+                 for total, invoice in zip(totals, invoices)], len(totals), repeat)
+    results["vendor_match"] = measure(lambda: [vendor_index.match(v) for v in vendors], len(vendors), repeat)
+    unknown = [f"Unlisted Vendor {n}" for n in range(len(vendors))]  # Misses: the worst case before pruning
+    results["vendor_miss"] = measure(lambda: [vendor_index.match(v) for v in unknown], len(unknown), repeat)
+
+    statement_indexes.cache_clear()
+    statement_indexes(statement)  # Built once per statement in real runs; timed above
+    results["precheck"] = measure(lambda: [precheck(i, statement) for i in invoices], len(invoices), repeat)
+    results["build_context"] = measure(
+        lambda: [build_context(t, i, statement) for t, i in zip(texts, invoices)], len(invoices), repeat)
+    return results
+
+
+def load(data, repeat: int) -> Dict[str, dict]:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "statement.csv")
+        write_statement_csv(data.statement, path)
+        return {"load_bank_statement": measure(lambda: load_bank_statement(path), len(data.statement), repeat)}
+
+
+def e2e(data, latency: float, workers: int, processes: int) -> Dict[str, dict]:
+    statement, invoices = data.statement, data.invoices
+
+    def serial():
+        statement_indexes.cache_clear()
+        list(run_batch(invoices, statement, analyst=FakeAnalyst(latency=latency)))
+
+    def threaded():
+        statement_indexes.cache_clear()
+        fake = FakeAnalyst(latency=latency)
+        list(run_batch_concurrent(invoices, statement, workers=workers, analyst_factory=lambda: fake))
+
+    def multiprocess():
+        statement_indexes.cache_clear()
+        list(run_batch_processes(invoices, statement, processes=processes, analyst=FakeAnalyst(latency=latency)))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Record one run through real agents, then time replaying it at the fake latency
+        store = RecordingStore(os.path.join(tmp, "recordings.jsonl"))
+        recorder = RecordingBackend(store, backend=FakeModel(verdict="FAIL"))
+        list(run_batch(invoices, statement, analyst=AnalystAgent(model=recorder)))
+        replay = ReplayBackend(store, latency=latency)
+
+        def replayed():
+            statement_indexes.cache_clear()
+            list(run_batch_concurrent(invoices, statement, workers=workers,
+                                      analyst_factory=lambda: AnalystAgent(model=replay)))
+
+        return {
+            "batch_serial": measure(serial, len(invoices), 1),
+            f"batch_threads_{workers}": measure(threaded, len(invoices), 1),
+            f"batch_processes_{processes}": measure(multiprocess, len(invoices), 1),
+            f"batch_replay_{workers}": measure(replayed, len(invoices), 1),
+        }
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def compare(current: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """Print per-benchmark ratios; return the names that got slower by more than `threshold`."""
+    regressions = []
+    print(f"\n{'benchmark':<28}{'baseline us/op':>16}{'current us/op':>16}{'ratio':>8}")
+    for name, result in current.items():
+        if name not in baseline:
+            continue
+        ratio = result["per_op_us"] / baseline[name]["per_op_us"] if baseline[name]["per_op_us"] else 1.0
+        flag = ""
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<28}{baseline[name]['per_op_us']:>16.3f}{result['per_op_us']:>16.3f}{ratio:>7.2f}x{flag}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", choices=SIZES, default="1k", help="Statement rows: 1k, 100k or 10m")
+    parser.add_argument("--invoices", type=int, help="Invoices to audit (default depends on --size)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per microbenchmark; the best is kept")
+    parser.add_argument("--only", default=",".join(GROUPS), help="Comma-separated groups: micro,io,e2e")
+    parser.add_argument("--latency", type=float, default=0.01, help="Fake model latency in seconds")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file from an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Slowdown ratio counted as a regression")
+    args = parser.parse_args()
+
+    groups = set(args.only.split(","))
+    invoices = args.invoices or INVOICES[args.size]
+    start = time.perf_counter()
+    data = make_dataset(SIZES[args.size], invoices, args.seed)
+    print(f"dataset: {len(data.statement)} rows, {len(data.invoices)} invoices "
+          f"({time.perf_counter() - start:.1f}s to generate)")
+
+    results: Dict[str, dict] = {}
+    if "micro" in groups:
+        results.update(micro(data, args.repeat))
+    if "io" in groups:
+        results.update(load(data, args.repeat))
+    if "e2e" in groups:
+        results.update(e2e(data, args.latency, args.workers, args.processes))
+
+    for name, result in results.items():
+        print(f"{name:<28}{result['per_op_us']:>14.3f} us/op{result['ops_per_sec']:>14.1f} ops/s")
+
+    report = {
+        "environment": environment(),
+        "config": {"size": args.size, "rows": len(data.statement), "invoices": invoices, "seed": args.seed,
+                   "latency": args.latency, "workers": args.workers, "processes": args.processes},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config", {}).get("size") != args.size:
+            print(f"warning: baseline was run at size {baseline.get('config', {}).get('size')}")
+        if compare(results, baseline["results"], args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Startup-time benchmark: how long short-lived jobs spend importing VouchVault.
+
+    python benchmarks/startup.py --runs 20 --output startup.json
+
+Each case runs in a fresh interpreter. The report also records whether the
+Gemini SDK was loaded, which only the agent should ever trigger.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SDK_CHECK = "; import sys; print('google.generativeai' in sys.modules)"
+
+CASES = {
+    "python_baseline": "pass",
+    "import_package": "import vouchvault",
+    "import_tools": "from vouchvault import calculate_gst, calculate_tax_compliance",
+    "import_rules": "from vouchvault.rules import precheck",
+    "import_manager": "from vouchvault import run_vouch_vault",
+    "import_sdk": "import vouchvault.analyst; import google.generativeai",
+}
+
+
+def run_case(code: str, runs: int) -> dict:
+    timings, sdk_loaded = [], False
+    for _ in range(runs):
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, "-W", "ignore", "-c", code + SDK_CHECK], cwd=ROOT,
+                             capture_output=True, text=True, check=True).stdout
+        timings.append(time.perf_counter() - start)
+        sdk_loaded = out.strip().endswith("True")
+    median = statistics.median(timings)
+    return {"ops": runs, "seconds": round(median, 6), "per_op_us": round(median * 1e6, 3),
+            "ops_per_sec": round(1 / median, 1), "sdk_loaded": sdk_loaded}
+
+
+def run_help(runs: int) -> dict:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "main.py", "--help"], cwd=ROOT, capture_output=True, check=True)
+        timings.append(time.perf_counter() - start)
+    median = statistics.median(timings)
+    return {"ops": runs, "seconds": round(median, 6), "per_op_us": round(median * 1e6, 3),
+            "ops_per_sec": round(1 / median, 1)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="Interpreter launches per case; the median is kept")
+    parser.add_argument("--output", help="Write results to this JSON file (same layout as run.py)")
+    args = parser.parse_args()
+
+    results = {name: run_case(code, args.runs) for name, code in CASES.items()}
+    results["cli_help"] = run_help(args.runs)
+    baseline = results["python_baseline"]["seconds"]
+    for name, result in results.items():
+        extra = "  (SDK loaded)" if result.get("sdk_loaded") else ""
+        print(f"{name:<18}{result['seconds'] * 1000:>9.1f} ms{(result['seconds'] - baseline) * 1000:>+9.1f} ms{extra}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"config": {"size": "startup", "runs": args.runs}, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
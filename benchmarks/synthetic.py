@@ -0,0 +1,130 @@
+"""
+Seeded synthetic invoices and bank statements for benchmarks.
+
+Every invoice gets a scenario and, where the scenario has one, planted
+statement rows that pay it:
+
+    exact      one debit for the invoice total
+    fuzzy      one debit whose description misspells the vendor
+    tds        one debit for the total less 2% TDS on the subtotal
+    split      the total paid in two debits a few days apart
+    missing    an unknown vendor and no payment
+    gst_error  tax that is not 18% of the subtotal, paid in full
+
+The remaining rows are noise payments to the same vendor pool. The same
+seed always produces the same dataset.
+"""
+import csv
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+import numpy as np
+
+from vouchvault.statement import COLUMNS, BankStatement
+
+VENDORS = [
+    "TechSolutions Inc", "ABC Services Pvt Ltd", "Office Supplies Co", "Reliance Retail",
+    "Blue Dart Express", "Zenith Cloud Hosting", "Sharma Stationers", "Metro Cash and Carry",
+    "Infosys BPM Ltd", "Green Valley Caterers", "Apex Security Services", "Kumar Electricals",
+    "Northwind Logistics", "Sunrise Printers", "Vertex Legal Associates", "Coastal Facility Mgmt",
+]
+SCENARIOS = ("exact", "fuzzy", "tds", "split", "missing", "gst_error")
+SIZES = {"1k": 1_000, "100k": 100_000, "10m": 10_000_000}
+START_DATE = np.datetime64("2025-01-01", "D")
+NOISE_DESCRIPTIONS = 20_000  # Distinct noise descriptions, shared by reference across rows
+
+
+@dataclass
+class Dataset:
+    statement: BankStatement
+    invoices: List[Tuple[str, str]]  # (source, invoice text), as read_invoices yields them
+    scenarios: List[str] = field(default_factory=list)
+
+
+def misspell(name: str, rng: np.random.Generator) -> str:
+    """Drop, double or swap one letter, the way bank narrations mangle names."""
+    i = int(rng.integers(1, len(name) - 1))
+    kind = int(rng.integers(3))
+    if kind == 0:
+        return name[:i] + name[i + 1:]
+    if kind == 1:
+        return name[:i] + name[i] + name[i:]
+    return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+
+
+def _invoice_text(number: int, date: np.datetime64, vendor: str, subtotal: int, tax: int) -> str:
+    return (f"Invoice No: INV-{number:07d}\n"
+            f"Date: {date}\n"
+            f"Vendor: {vendor}\n"
+            f"Amount (before tax): {subtotal / 100:,.2f} INR\n"
+            f"GST (18%): {tax / 100:,.2f} INR\n"
+            f"Total Amount: {(subtotal + tax) / 100:,.2f} INR\n")
+
+
+def make_dataset(rows: int, invoices: int, seed: int = 42) -> Dataset:
+    """A statement of `rows` transactions and `invoices` invoices against it."""
+    rng = np.random.default_rng(seed)
+    texts, scenarios = [], []
+    planted_dates, planted_descriptions, planted_paise = [], [], []
+
+    for number in range(invoices):
+        scenario = SCENARIOS[number % len(SCENARIOS)]
+        vendor = VENDORS[int(rng.integers(len(VENDORS)))]
+        date = START_DATE + int(rng.integers(365))
+        subtotal = int(rng.integers(10_000, 5_000_000))          # 100 .. 50,000 INR in paise
+        tax = (subtotal * 18 + 50) // 100
+        if scenario == "gst_error":
+            tax = tax * 11 // 10
+        if scenario == "missing":
+            vendor = f"Unlisted Vendor {number}"
+        texts.append((f"synthetic/INV-{number:07d}.txt", _invoice_text(number, date, vendor, subtotal, tax)))
+        scenarios.append(scenario)
+
+        total = subtotal + tax
+        paid_on = date + int(rng.integers(0, 5))
+        payee = f"NEFT {vendor.upper()}"
+        if scenario == "missing":
+            continue
+        if scenario == "fuzzy":
+            payee = f"NEFT {misspell(vendor, rng).upper()}"
+        if scenario == "tds":
+            total -= (subtotal * 2 + 50) // 100
+        if scenario == "split":
+            first = total // 2
+            planted_dates += [paid_on, paid_on + 3]
+            planted_descriptions += [payee, payee]
+            planted_paise += [first, total - first]
+            continue
+        planted_dates.append(paid_on)
+        planted_descriptions.append(payee)
+        planted_paise.append(total)
+
+    noise = max(0, rows - len(planted_paise))
+    pool = [f"NEFT {VENDORS[k % len(VENDORS)].upper()} REF{k}" for k in range(min(noise, NOISE_DESCRIPTIONS))]
+    picks = rng.integers(len(pool), size=noise) if pool else np.array([], dtype=np.int64)
+    dates = np.concatenate([np.array(planted_dates, dtype="datetime64[D]"),
+                            START_DATE + rng.integers(0, 370, size=noise)])
+    paise = np.concatenate([np.array(planted_paise, dtype=np.int64), rng.integers(10_000, 10_000_000, size=noise)])
+    descriptions = planted_descriptions + [pool[i] for i in picks]
+
+    order = np.argsort(dates, kind="stable")
+    amounts = -paise[order] / 100
+    statement = BankStatement.from_columns(
+        dates=dates[order],
+        descriptions=[descriptions[i] for i in order],
+        amounts=amounts,
+        types=["DEBIT"] * len(order),
+        balances=10_000_000 + np.cumsum(amounts),
+    )
+    return Dataset(statement=statement, invoices=texts, scenarios=scenarios)
+
+
+def write_statement_csv(statement: BankStatement, path: str) -> None:
+    """Write a statement out as the CSV the CLI reads."""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(COLUMNS)
+        for date, description, amount, kind, balance in zip(
+                statement.dates.astype(str), statement.descriptions, statement.amounts,
+                statement.types, statement.balances):
+            writer.writerow((date, description, f"{amount:.2f}", kind, f"{balance:.2f}"))
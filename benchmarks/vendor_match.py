@@ -0,0 +1,102 @@
+"""
+Vendor matching benchmark: brute-force SequenceMatcher scan vs VendorIndex.
+
+    python benchmarks/vendor_match.py --lines 100000 --queries 20
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from difflib import SequenceMatcher
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vouchvault.vendors import VendorIndex  # noqa: E402
+
+VENDORS = [
+    "TechSolutions Inc", "ABC Services Pvt Ltd", "Office Supplies Co", "Reliance Retail",
+    "Blue Dart Express", "Zenith Cloud Hosting", "Sharma Stationers", "Metro Cash and Carry",
+]
+
+
+def brute_force_match(invoice_vendor: str, bank_statement_text: str) -> bool:
+    """
+    The pre-index fuzzy_match_vendor decision, kept for comparison.
+
+    Each ratio() sits behind difflib's own real_quick_ratio/quick_ratio upper
+    bounds (as in difflib.get_close_matches), which never change a decision
+    but keep a full scan affordable on a large statement.
+    """
+    clean_vendor = invoice_vendor.lower().strip()
+    clean_statement = bank_statement_text.lower()
+    if clean_vendor in clean_statement:
+        return True
+    matcher = SequenceMatcher(None, clean_vendor, clean_statement)
+    if matcher.real_quick_ratio() > 0.6 and matcher.quick_ratio() > 0.6 and matcher.ratio() > 0.6:
+        return True
+    words = clean_statement.split()
+    for i in range(len(words)):
+        for phrase_len in [1, 2, 3]:
+            if i + phrase_len <= len(words):
+                matcher.set_seq2(' '.join(words[i:i + phrase_len]))
+                if matcher.real_quick_ratio() > 0.75 and matcher.quick_ratio() > 0.75 and matcher.ratio() > 0.75:
+                    return True
+    return False
+
+
+def typo(name: str, rng: random.Random) -> str:
+    i = rng.randrange(len(name))
+    return name[:i] + name[i + 1:]
+
+
+def make_statement(lines: int, rng: random.Random) -> str:
+    rows = ["date,description,amount,type,balance"]
+    for n in range(lines):
+        vendor = rng.choice(VENDORS) + f" {n % 997}"
+        rows.append(f"2025-11-{rng.randint(1, 28):02d},NEFT {vendor},-{rng.randint(100, 99999)}.00,DEBIT,{rng.randint(1000, 999999)}.00")
+    return "\n".join(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    text = make_statement(args.lines, rng)
+    queries = [typo(rng.choice(VENDORS), rng) for _ in range(args.queries // 2)]
+    queries += [f"Unknown Vendor {n}" for n in range(args.queries - len(queries))]
+
+    start = time.perf_counter()
+    index = VendorIndex(text)
+    build = time.perf_counter() - start
+
+    timings = []
+    indexed = []
+    for q in queries:
+        start = time.perf_counter()
+        indexed.append(index.match(q) is not None)
+        timings.append(time.perf_counter() - start)
+    per_query = sum(timings) / len(queries)
+    misses = [t for t, found in zip(timings, indexed) if not found]
+
+    start = time.perf_counter()
+    brute = [brute_force_match(q, text) for q in queries]
+    brute_per_query = (time.perf_counter() - start) / len(queries)
+
+    for q, expected, found in zip(queries, brute, indexed):
+        assert expected == found, f"Indexed and brute-force decisions differ for {q!r}"
+    print(f"statement lines:      {args.lines}")
+    print(f"distinct phrases:     {len(index)}")
+    print(f"index build:          {build:.3f}s (once per statement)")
+    print(f"indexed per query:    {per_query * 1000:.2f}ms")
+    if misses:
+        print(f"indexed per miss:     {sum(misses) / len(misses) * 1000:.2f}ms ({len(misses)} misses)")
+    print(f"brute force per query: {brute_per_query * 1000:.2f}ms")
+    print(f"speedup per query:    {brute_per_query / per_query:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+import pytest
+
+from vouchvault import analyst as analyst_module
+from vouchvault.analyst import AgentPool, AnalystAgent
+from vouchvault.fake import FakeAnalyst
+from vouchvault.manager import run_vouch_vault
+
+
+class FakeModel:
+    def __init__(self):
+        self.histories = []
+
+    def start_chat(self, history=None, enable_automatic_function_calling=False):
+        self.histories.append(history or [])
+        return SimpleNamespace(send_message=lambda message: SimpleNamespace(text=f"re: {message}"))
+
+
+def test_agents_share_one_configured_model(monkeypatch):
+    built = []
+    fake_genai = SimpleNamespace(GenerativeModel=lambda **kwargs: built.append(kwargs) or FakeModel())
+    monkeypatch.setattr(analyst_module, "_configure_api", lambda: fake_genai)
+    analyst_module._shared_model.cache_clear()
+    try:
+        pool = AgentPool(size=2)
+        pool.warm_up()
+        first, second = pool.acquire(), pool.acquire()
+        assert first is not second and first.model is second.model
+        assert len(built) == 1
+    finally:
+        analyst_module._shared_model.cache_clear()
+
+
+def test_history_keeps_first_and_latest_turns():
+    model = FakeModel()
+    agent = AnalystAgent(model=model, max_turns=3)
+    agent.analyze("audit data")
+    for n in range(4):
+        agent.inject_message(f"retry {n}")
+
+    assert [m for m, _ in agent._turns] == ["audit data", "retry 2", "retry 3"]
+    agent.inject_message("retry 4")
+    assert [turn["parts"][0] for turn in model.histories[-1]][::2] == ["audit data", "retry 2", "retry 3"]
+
+
+def test_pool_reuses_agents_and_caps_size():
+    pool = AgentPool(size=1, factory=FakeAnalyst)
+    with pool.agent() as agent:
+        with pytest.raises(TimeoutError):
+            pool.acquire(timeout=0.01)
+    assert pool.acquire() is agent
+    assert pool.stats() == {"agents_created": 1, "agents_reused": 1}
+
+
+def test_audits_borrow_from_the_default_pool(monkeypatch):
+    pool = AgentPool(size=2, factory=FakeAnalyst)
+    monkeypatch.setattr("vouchvault.manager.default_pool", lambda: pool)
+    for n in range(3):
+        run_vouch_vault(f"Invoice No: INV-00{n}\nTotal: 500", "date,description,amount,type,balance\n",
+                        verbose=False)
+
+    assert pool.stats() == {"agents_created": 1, "agents_reused": 2}
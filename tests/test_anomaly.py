@@ -0,0 +1,66 @@
+from types import SimpleNamespace
+
+from vouchvault.anomaly import AMOUNT_OUTLIER, CADENCE_OUTLIER, NEAR_DUPLICATE, AnomalyIndex
+from vouchvault.evaluation import AuditEvaluator
+from vouchvault.invoice import Invoice
+from vouchvault.manager import run_vouch_vault
+from vouchvault.memory import AuditRecord
+from vouchvault.statement import BankStatement
+
+
+def monthly(index, vendor="ABC Services Pvt Ltd", months=6, amount=11800.0):
+    for month in range(1, months + 1):
+        index.add(Invoice(f"INV-{month:03d}", vendor, f"2025-{month:02d}-10", total=amount + month))
+
+
+def test_near_duplicate_under_another_number():
+    index = AnomalyIndex()
+    index.add(Invoice("INV-001", "ABC Services Pvt Ltd", "2025-03-10", total=11800.0))
+
+    found = index.check(Invoice("INV-777", "ABC Services, Pvt. Ltd.", "2025-03-14", total=11805.0))
+    assert [(a.kind, a.related) for a in found] == [(NEAR_DUPLICATE, "INV-001")]
+
+    assert index.check(Invoice("INV-001", "ABC Services Pvt Ltd", "2025-03-10", total=11800.0)) == []
+    assert index.check(Invoice("INV-778", "ABC Services Pvt Ltd", "2025-03-30", total=11800.0)) == []
+    assert index.check(Invoice("INV-779", "ABC Services Pvt Ltd", "2025-03-12", total=12500.0)) == []
+    assert index.check(Invoice("INV-780", "XYZ Corp", "2025-03-10", total=11800.0)) == []
+
+
+def test_vendor_outliers_from_rolling_statistics():
+    index = AnomalyIndex()
+    monthly(index)
+
+    profile = index.profile("ABC SERVICES PVT LTD")
+    assert profile.amounts.count == 6 and round(profile.gaps.mean) == 30
+
+    assert index.check(Invoice("INV-100", "ABC Services Pvt Ltd", "2025-07-10", total=11810.0)) == []
+    kinds = [a.kind for a in index.check(Invoice("INV-101", "ABC Services Pvt Ltd", "2025-07-10", total=95000.0))]
+    assert kinds == [AMOUNT_OUTLIER]
+    kinds = [a.kind for a in index.check(Invoice("INV-102", "ABC Services Pvt Ltd", "2025-06-12", total=11500.0))]
+    assert kinds == [CADENCE_OUTLIER]
+
+
+def test_old_invoices_leave_the_buckets():
+    index = AnomalyIndex(horizon_days=30)
+    index.add(Invoice("INV-001", "ABC Services", "2025-01-10", total=1000.0))
+    index.add(Invoice("INV-002", "ABC Services", "2025-06-10", total=5000.0))
+
+    assert len(index._windows) == 1
+    assert index.profile("ABC Services").amounts.count == 2
+
+
+def test_seeded_from_records_and_flagged_in_metrics():
+    history = AnomalyIndex.from_records([AuditRecord("INV-001", "TechSolutions Inc", 1180.0, "PASS",
+                                                     invoice_date="2025-11-17")])
+    evaluator = AuditEvaluator()
+    statement = BankStatement("date,description,amount,type,balance\n"
+                              "2025-11-19,NEFT TechSolutions Inc,-1180.00,DEBIT,48850.00\n")
+    invoice = ("Invoice No: INV-002\nDate: 2025-11-19\nVendor: TechSolutions Inc\n"
+               "Amount (before tax): 1,000.00 INR\nGST (18%): 180.00 INR\nTotal Amount: 1,180.00 INR\n")
+
+    metrics = run_vouch_vault(invoice, statement, evaluator=evaluator, analyst=SimpleNamespace(),
+                              verbose=False, history=history)
+
+    assert metrics.status == "PASS"
+    assert metrics.anomalies[0].startswith("Near-duplicate of INV-001")
+    assert evaluator.get_summary()["flagged_anomalies"] == 1
@@ -0,0 +1,125 @@
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from vouchvault.analyst import AnalystAgent
+from vouchvault.backends import RecordingBackend, RecordingStore, ReplayBackend, ReplayMiss, make_backend
+from vouchvault.cache import ResponseCache
+from vouchvault.manager import run_vouch_vault
+from vouchvault.statement import BankStatement
+
+STATEMENT = BankStatement("""date,description,amount,type,balance
+2025-11-19,NEFT TechSolutions Inc,-1150.00,DEBIT,48850.00
+""")
+INVOICE = """Invoice No: INV-007
+Date: 2025-11-19
+Vendor: TechSolutions Inc
+Amount (before tax): 1,000.00 INR
+GST (18%): 180.00 INR
+Total Amount: 1,180.00 INR
+"""
+
+
+class ToolCallingModel:
+    """Live-model stand-in whose chats log a tool call in their history, like automatic function calling."""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.calls = 0
+
+    def start_chat(self, history=None, enable_automatic_function_calling=False):
+        model = self
+        chat = SimpleNamespace(history=[])
+
+        def send_message(message):
+            text = model.replies[min(model.calls, len(model.replies) - 1)]
+            model.calls += 1
+            call = SimpleNamespace(name="calculate_tax_compliance", args={"subtotal": 1000.0, "tax": 180.0})
+            result = SimpleNamespace(name="calculate_tax_compliance", response={"is_compliant": True})
+            chat.history += [SimpleNamespace(parts=[SimpleNamespace(text=message)]),
+                             SimpleNamespace(parts=[SimpleNamespace(function_call=call)]),
+                             SimpleNamespace(parts=[SimpleNamespace(function_response=result)]),
+                             SimpleNamespace(parts=[SimpleNamespace(text=text)])]
+            return SimpleNamespace(text=text)
+
+        chat.send_message = send_message
+        return chat
+
+
+def test_record_then_replay_a_conversation(tmp_path):
+    path = str(tmp_path / "recordings.jsonl")
+    live = ToolCallingModel(["first", "second"])
+    agent = AnalystAgent(model=RecordingBackend(RecordingStore(path), backend=live))
+    agent.analyze("audit data")
+    agent.inject_message("retry")
+
+    entry = json.loads(open(path, encoding="utf-8").readlines()[1])
+    assert entry["messages"] == ["audit data", "retry"] and entry["text"] == "second"
+    assert [c["name"] for c in entry["function_calls"]] == ["calculate_tax_compliance"] * 2
+    assert entry["function_calls"][1]["response"] == {"is_compliant": True}
+
+    replay = AnalystAgent(model=ReplayBackend(RecordingStore(path)))
+    assert replay.analyze("  audit   data ").text == "first"  # Whitespace-normalized, like the cache
+    response = replay.inject_message("retry")
+    assert (response.text, response.function_calls[0]["args"]) == ("second", {"subtotal": 1000.0, "tax": 180.0})
+    with pytest.raises(ReplayMiss):
+        replay.inject_message("something new")
+    assert live.calls == 2
+
+
+def test_replayed_audit_matches_the_recorded_one(tmp_path):
+    path = str(tmp_path / "recordings.jsonl")
+    live = ToolCallingModel(["AUDIT STATUS: FAIL 1150", "AUDIT STATUS: PASS, 30.00 is a discount"])
+    recorded = run_vouch_vault(INVOICE, STATEMENT, verbose=False,
+                               analyst=AnalystAgent(model=RecordingBackend(RecordingStore(path), backend=live)))
+
+    start = time.perf_counter()
+    replayed = run_vouch_vault(INVOICE, STATEMENT, verbose=False,
+                               analyst=AnalystAgent(model=ReplayBackend(RecordingStore(path), latency=0.02)))
+
+    assert (replayed.status, replayed.trail) == (recorded.status, recorded.trail) == ("PASS", recorded.trail)
+    assert replayed.model_calls == 2 and live.calls == 2
+    assert time.perf_counter() - start >= 0.04
+
+
+def test_recording_against_a_warm_cache_replays(tmp_path):
+    path = str(tmp_path / "recordings.jsonl")
+    cache = ResponseCache(":memory:")
+    live = ToolCallingModel(["AUDIT STATUS: FAIL 1150", "AUDIT STATUS: PASS, 30.00 is a discount"])
+    warm = run_vouch_vault(INVOICE, STATEMENT, verbose=False, analyst=AnalystAgent(cache=cache, model=live))
+
+    # Every reply now comes from the cache, yet each exchange is still recorded
+    store = RecordingStore(path)
+    run_vouch_vault(INVOICE, STATEMENT, verbose=False,
+                    analyst=AnalystAgent(cache=cache, model=RecordingBackend(store, backend=live)))
+    assert live.calls == 2 and len(store) == 2
+
+    replayed = run_vouch_vault(INVOICE, STATEMENT, verbose=False,
+                               analyst=AnalystAgent(cache=ResponseCache(":memory:"),
+                                                    model=ReplayBackend(RecordingStore(path))))
+    assert (replayed.status, replayed.trail) == (warm.status, warm.trail)
+
+
+def test_replay_ignores_a_warm_cache(tmp_path):
+    path = str(tmp_path / "recordings.jsonl")
+    cache = ResponseCache(":memory:")
+    run_vouch_vault(INVOICE, STATEMENT, verbose=False,
+                    analyst=AnalystAgent(cache=cache, model=ToolCallingModel(["AUDIT STATUS: PASS"])))
+    recorded = run_vouch_vault(INVOICE, STATEMENT, verbose=False, analyst=AnalystAgent(
+        model=RecordingBackend(RecordingStore(path), backend=ToolCallingModel(["AUDIT STATUS: FAIL 1150"]))))
+
+    replayed = run_vouch_vault(INVOICE, STATEMENT, verbose=False,
+                               analyst=AnalystAgent(cache=cache, model=ReplayBackend(RecordingStore(path))))
+
+    assert (replayed.status, replayed.trail) == (recorded.status, recorded.trail)
+    assert cache.stats()["cache_hits"] == 0
+
+
+def test_make_backend_needs_recordings_for_offline_modes(tmp_path):
+    with pytest.raises(ValueError, match="recordings"):
+        make_backend("replay")
+    with pytest.raises(ValueError, match="Unknown model mode"):
+        make_backend("mock", str(tmp_path / "r.jsonl"))
+    assert isinstance(make_backend("replay", str(tmp_path / "r.jsonl")), ReplayBackend)
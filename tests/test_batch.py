@@ -0,0 +1,126 @@
+import multiprocessing
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from vouchvault.batch import find_invoice_files, read_invoices, run_batch, run_batch_processes
+from vouchvault.evaluation import AuditEvaluator
+from vouchvault.memory import AuditMemory
+from vouchvault.rules import precheck
+from vouchvault.shared import SharedStatement, attach_statement
+from vouchvault.statement import BankStatement
+
+BANK_CSV = """date,description,amount,type,balance
+2024-04-12,NEFT ABC SERVICES PVT LTD,11800.00,DEBIT,50000.00
+"""
+
+
+class StubAnalyst:
+    """Analyst stand-in that always passes and counts chat resets."""
+
+    def __init__(self):
+        self.resets = 0
+
+    def reset(self):
+        self.resets += 1
+
+    def analyze(self, prompt):
+        return SimpleNamespace(text="AUDIT STATUS: PASS")
+
+    def inject_message(self, message):
+        return SimpleNamespace(text="")
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr("vouchvault.manager.time.sleep", lambda s: None)
+
+
+def test_batch_shares_components():
+    """One analyst, memory and evaluator serve the whole batch."""
+    analyst = StubAnalyst()
+    memory = AuditMemory()
+    evaluator = AuditEvaluator()
+    invoices = [("a.txt", "Invoice No: INV-001\nTotal: 11,800"), ("b.txt", "Invoice No: INV-002\nTotal: 11,800")]
+
+    results = list(run_batch(invoices, BankStatement(BANK_CSV), memory=memory, evaluator=evaluator, analyst=analyst))
+
+    assert [r.status for r in results] == ["PASS", "PASS"]
+    assert analyst.resets == 2
+    assert memory.total_processed == 2
+    assert evaluator.get_summary()["total_audits"] == 2
+
+
+def test_batch_reports_unreadable_files(tmp_path):
+    """Missing or empty invoices are reported without stopping the batch."""
+    (tmp_path / "good.txt").write_text("Invoice No: INV-001", encoding="utf-8")
+    (tmp_path / "empty.txt").write_text("", encoding="utf-8")
+    paths = find_invoice_files(str(tmp_path)) + [str(tmp_path / "missing.txt")]
+
+    results = list(run_batch(read_invoices(paths), BANK_CSV, analyst=StubAnalyst()))
+
+    assert [r.status for r in results] == ["ERROR", "PASS", "ERROR"]
+
+
+RULES_INVOICE = """Invoice No: INV-{:03d}
+Vendor: ABC Services Pvt Ltd
+Amount (before tax): 10,000 INR
+GST (18%): 1,800 INR
+Total Amount: 11,800 INR
+"""
+
+
+def test_shared_statement_round_trips():
+    statement = BankStatement(BANK_CSV + "2024-04-13,,,CREDIT,\n")
+    with SharedStatement(statement) as shared:
+        attached = attach_statement(shared.path)
+        assert list(attached) == list(statement)
+        assert not attached.amounts.flags.writeable
+    assert not os.path.exists(shared.path)
+
+
+def test_process_batch_keeps_input_order():
+    analyst = StubAnalyst()
+    memory = AuditMemory()
+    invoices = [(f"{i}.txt", RULES_INVOICE.format(i)) for i in range(7)]
+    invoices.insert(3, ("model.txt", "Invoice No: INV-100\nTotal: 11,800"))
+    invoices.append(("missing.txt", None))
+
+    results = list(run_batch_processes(invoices, BANK_CSV, processes=2, shard_size=2,
+                                       memory=memory, analyst=analyst))
+
+    assert [r.source for r in results] == [s for s, _ in invoices]
+    assert [r.metrics.path for r in results[:-1]] == ["rules"] * 3 + ["model"] + ["rules"] * 4
+    assert results[-1].status == "ERROR"
+    assert analyst.resets == 1
+    assert memory.total_processed == 8
+
+
+def _crash_on_666(invoice, statement):
+    if invoice.invoice_id == "INV-666":
+        os._exit(1)
+    return precheck(invoice, statement)
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork", reason="patch must reach forked workers")
+def test_crashed_worker_does_not_lose_the_batch(monkeypatch):
+    monkeypatch.setattr("vouchvault.batch.precheck", _crash_on_666)
+    invoices = [(f"{i}.txt", RULES_INVOICE.format(i)) for i in (1, 2, 666, 3, 4)]
+
+    results = list(run_batch_processes(invoices, BANK_CSV, processes=2, shard_size=1, analyst=StubAnalyst()))
+
+    assert [r.source for r in results] == [s for s, _ in invoices]
+    assert [r.status for r in results] == ["PASS", "PASS", "ERROR", "PASS", "PASS"]
+    assert results[2].error == "Worker process crashed"
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork", reason="patch must reach forked workers")
+def test_crashing_invoice_does_not_fail_its_shard(monkeypatch):
+    monkeypatch.setattr("vouchvault.batch.precheck", _crash_on_666)
+    invoices = [(f"{i}.txt", RULES_INVOICE.format(i)) for i in (1, 2, 666, 3, 4, 5, 6, 7)]
+
+    results = list(run_batch_processes(invoices, BANK_CSV, processes=2, shard_size=4, analyst=StubAnalyst()))
+
+    assert [r.source for r in results] == [s for s, _ in invoices]
+    assert [r.status for r in results] == ["PASS", "PASS", "ERROR"] + ["PASS"] * 5
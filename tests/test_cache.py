@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+from vouchvault.analyst import AnalystAgent
+from vouchvault.cache import ResponseCache
+from vouchvault.evaluation import AuditEvaluator
+
+
+class FakeModel:
+    """Records each chat's starting history and every message sent."""
+
+    def __init__(self):
+        self.histories = []
+        self.sent = []
+
+    def start_chat(self, history=None, enable_automatic_function_calling=False):
+        self.histories.append(history or [])
+        return SimpleNamespace(send_message=self._reply)
+
+    def _reply(self, message):
+        self.sent.append(message)
+        return SimpleNamespace(text=f"reply {len(self.sent)}")
+
+
+def test_lru_ttl_and_disk_tier(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = ResponseCache(path, max_entries=1)
+    cache.put("a", "A")
+    cache.put("b", "B")  # Evicts "a" from memory, still on disk
+    assert cache.get("a") == "A"
+    assert cache.get("missing") is None
+    cache.close()
+
+    reopened = ResponseCache(path)
+    assert reopened.get("b") == "B"
+    expired = ResponseCache(path, ttl_seconds=-1)
+    assert expired.get("b") is None
+    assert (reopened.hits, reopened.misses) == (1, 0)
+
+
+def test_key_ignores_whitespace():
+    assert ResponseCache.key("m", ["t"], ["  audit\n   this "]) == ResponseCache.key("m", ["t"], ["audit this"])
+    assert ResponseCache.key("m", ["t"], ["a"]) != ResponseCache.key("m", ["t", "u"], ["a"])
+
+
+def test_analyst_replays_cached_conversation():
+    cache = ResponseCache()
+    model = FakeModel()
+    first = AnalystAgent(cache=cache)
+    first._model = model
+    assert first.analyze("audit INV-1").text == "reply 1"
+    first.inject_message("retry")
+
+    second = AnalystAgent(cache=cache)
+    second._model = model
+    assert second.analyze("audit   INV-1").text == "reply 1"
+    assert second.inject_message("retry").text == "reply 2"
+    assert len(model.sent) == 2
+
+    # A new turn after cached ones rebuilds the chat with the full history
+    assert second.inject_message("one more").text == "reply 3"
+    assert [part["parts"][0] for part in model.histories[-1]] == ["audit   INV-1", "reply 1", "retry", "reply 2"]
+
+    summary = AuditEvaluator(cache=cache).get_summary()
+    assert (summary["cache_hits"], summary["cache_misses"]) == (2, 3)
@@ -0,0 +1,40 @@
+import numpy as np
+
+from vouchvault.compliance import TDS_SECTIONS, apply_rate, check_tax_compliance_bulk, to_paise_array
+from vouchvault.tools import calculate_tax_compliance
+
+
+def test_rounds_half_away_from_zero_in_paise():
+    assert to_paise_array([0.1 + 0.2, 1180.005]).tolist() == [30, 118001]
+    assert apply_rate(np.array([250, -250]), np.array([1800, 1800])).tolist() == [45, -45]
+    assert apply_rate(np.array([25]), np.array([1800])).tolist() == [5]  # 4.5 paise
+
+
+def test_matches_scalar_check_at_18_percent():
+    subtotals = [10000, 1000, 999.99, 50]
+    taxes = [1800, 170, 180.0, 9.04]
+
+    result = check_tax_compliance_bulk(subtotals, taxes)
+
+    expected = [calculate_tax_compliance(s, t)["is_compliant"] for s, t in zip(subtotals, taxes)]
+    assert result.is_compliant.tolist() == expected
+    assert result.expected_tax.tolist() == [180000, 18000, 18000, 900]
+    assert result.difference.tolist() == [0, -1000, 0, 4]
+
+
+def test_slabs_splits_and_tds():
+    result = check_tax_compliance_bulk(
+        subtotals=[100000, 2000, 333.33],
+        tax_amounts=[28000, 240, 16.66],
+        rates=[0.28, 0.12, 0.05],
+        intra_state=[False, True, True],
+        tds_rates=TDS_SECTIONS["194J"],
+    )
+
+    assert result.igst.tolist() == [2800000, 0, 0]
+    assert result.cgst.tolist() == [0, 12000, 833]
+    assert (result.cgst == result.sgst).all()
+    assert result.expected_tax.tolist() == [2800000, 24000, 1666]
+    assert result.is_compliant.all()
+    assert result.tds.tolist() == [1000000, 20000, 3333]
+    assert result.net_payable.tolist() == [11800000, 204000, 33333 + 1666 - 3333]
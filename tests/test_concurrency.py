@@ -0,0 +1,112 @@
+import threading
+import time
+
+import pytest
+
+from vouchvault import ratelimit
+from vouchvault.analyst import TOOLS, AnalystAgent
+from vouchvault.batch import run_batch_concurrent
+from vouchvault.fake import FakeAnalyst, FakeModel
+from vouchvault.ratelimit import LimitedAnalyst, QuotaExceeded, TokenBucket, call_with_backoff, call_with_timeout
+
+BANK_CSV = """date,description,amount,type,balance
+2024-04-12,NEFT ABC SERVICES PVT LTD,11800.00,DEBIT,50000.00
+"""
+
+INVOICES = [(f"{i}.txt", f"Invoice No: INV-{i:03d}\nTotal: 11,800") for i in range(8)]
+
+
+def test_keeps_several_audits_in_flight():
+    fake = FakeAnalyst(latency=0.05)
+    start = time.monotonic()
+
+    results = list(run_batch_concurrent(INVOICES, BANK_CSV, workers=4, analyst_factory=lambda: fake))
+
+    assert sorted(r.source for r in results) == sorted(s for s, _ in INVOICES)
+    assert all(r.status == "PASS" for r in results)
+    assert fake.max_in_flight == 4
+    assert time.monotonic() - start < 8 * 0.05
+
+
+def test_rate_limit_is_shared_across_workers():
+    fake = FakeAnalyst()
+
+    list(run_batch_concurrent(INVOICES, BANK_CSV, workers=4, rate=50, burst=1, analyst_factory=lambda: fake))
+
+    # One call per invoice; after the first token the bucket refills at 50/s
+    assert fake.calls[-1] - fake.calls[0] >= 0.9 * (len(INVOICES) - 1) / 50
+
+
+def test_token_bucket_gives_up_at_timeout():
+    bucket = TokenBucket(rate=1, capacity=1)
+    assert bucket.acquire(timeout=0) is True
+    assert bucket.acquire(timeout=0.01) is False
+
+
+def test_quota_errors_back_off_then_succeed():
+    fake = FakeAnalyst(quota_errors=2)
+    assert call_with_backoff(lambda: fake.analyze("x"), base_delay=0.01).text == "AUDIT STATUS: PASS"
+    assert len(fake.calls) == 3
+
+    with pytest.raises(QuotaExceeded):
+        call_with_backoff(lambda: FakeAnalyst(quota_errors=5).analyze("x"), retries=1, base_delay=0.01)
+
+
+def test_slow_audits_time_out():
+    fake = FakeAnalyst(verdict="FAIL", latency=0.05)
+
+    results = list(run_batch_concurrent(INVOICES[:2], BANK_CSV, workers=2, timeout=0.03, analyst_factory=lambda: fake))
+
+    assert [r.status for r in results] == ["ERROR", "ERROR"]
+
+
+def test_hung_model_call_times_out():
+    fake = FakeAnalyst(latency=2.0)  # A single call that outlives the audit
+    start = time.monotonic()
+
+    results = list(run_batch_concurrent(INVOICES[:2], BANK_CSV, workers=2, timeout=0.05, analyst_factory=lambda: fake))
+
+    assert [r.status for r in results] == ["ERROR", "ERROR"]
+    assert len(fake.calls) == 2
+    assert time.monotonic() - start < 1.0
+
+
+class ToolCallingAnalyst(FakeAnalyst):
+    """Runs a model tool before every reply, as Gemini's automatic function calling does."""
+
+    def _reply(self, message: str):
+        TOOLS[0](10_000, 1_800)
+        return super()._reply(message)
+
+
+def test_tool_time_is_charged_with_a_timeout():
+    for timeout in (None, 5.0):
+        results = list(run_batch_concurrent(INVOICES[:1], BANK_CSV, workers=1, timeout=timeout,
+                                            analyst_factory=ToolCallingAnalyst))
+
+        assert "tools" in results[0].metrics.stage_ns, timeout
+
+
+def test_abandoned_calls_are_capped(monkeypatch):
+    monkeypatch.setattr(ratelimit, "MAX_ABANDONED_CALLS", 1)
+    monkeypatch.setattr(ratelimit, "_abandoned", set())  # Not the calls earlier tests left running
+    release = threading.Event()
+
+    with pytest.raises(TimeoutError, match="did not return"):
+        call_with_timeout(release.wait, 0.01)
+    with pytest.raises(TimeoutError, match="still running"):
+        call_with_timeout(lambda: "never started", 1.0)
+    release.set()
+    time.sleep(0.05)
+    assert call_with_timeout(lambda: "ok", 1.0) == "ok"
+
+
+def test_late_reply_is_dropped_after_timeout():
+    agent = AnalystAgent(model=FakeModel(latency=0.2))
+    limited = LimitedAnalyst(agent, timeout=0.05)
+    limited.reset()
+
+    with pytest.raises(TimeoutError):
+        limited.analyze("audit this")
+    time.sleep(0.3)
+    assert agent._turns == []
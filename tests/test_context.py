@@ -0,0 +1,73 @@
+from types import SimpleNamespace
+
+from vouchvault.context import build_context
+from vouchvault.evaluation import AuditEvaluator
+from vouchvault.manager import run_vouch_vault
+from vouchvault.invoice import parse_invoice
+from vouchvault.statement import BankStatement
+
+INVOICE = """Invoice No: INV-007
+Date: 2025-11-19
+Vendor: TechSolutions Inc
+Amount (before tax): 1,000.00 INR
+GST (18%): 180.00 INR
+Total Amount: 1,180.00 INR
+"""
+
+ROWS = ["date,description,amount,type,balance"]
+ROWS += [f"2025-0{1 + i % 9}-{1 + i % 28:02d},Vendor {i},-{5000 + i}.00,DEBIT,90000.00" for i in range(500)]
+ROWS += ["2025-11-19,NEFT TechSolutions Inc,-1150.00,DEBIT,48850.00"]
+STATEMENT = BankStatement("\n".join(ROWS))
+
+
+class RecordingAnalyst:
+    def __init__(self):
+        self.prompts = []
+
+    def reset(self):
+        pass
+
+    def analyze(self, prompt):
+        self.prompts.append(prompt)
+        return SimpleNamespace(text="AUDIT STATUS: FAIL")
+
+    def inject_message(self, message):
+        return SimpleNamespace(text="")
+
+
+def test_selects_relevant_rows_within_budget():
+    context = build_context(INVOICE, parse_invoice(INVOICE), STATEMENT, k=5)
+
+    assert context.total_rows == 501
+    assert 500 in context.rows
+    assert len(context.rows) <= 5
+    assert "NEFT TechSolutions Inc" in context.statement_csv
+
+    tight = build_context(INVOICE, parse_invoice(INVOICE), STATEMENT, k=5, token_budget=90)
+    assert tight.tokens <= 90
+    assert tight.rows == [500]
+
+
+def test_small_statement_drops_weakest_rows_first():
+    statement = BankStatement("date,description,amount,type,balance\n"
+                              "2025-03-02,Salary credit,90000.00,CREDIT,90000.00\n"
+                              "2025-06-14,Coffee Shop,-5.00,DEBIT,89995.00\n"
+                              "2025-11-19,NEFT TechSolutions Inc,-1150.00,DEBIT,88845.00")
+
+    context = build_context(INVOICE, parse_invoice(INVOICE), statement, token_budget=65)
+
+    assert context.tokens <= 65
+    assert context.rows == [2]
+
+
+def test_retries_do_not_resend_statement():
+    analyst = RecordingAnalyst()
+    evaluator = AuditEvaluator()
+
+    metrics = run_vouch_vault(INVOICE, STATEMENT, evaluator=evaluator, analyst=analyst, verbose=False)
+
+    assert metrics.attempts == 2
+    assert "NEFT TechSolutions Inc" in analyst.prompts[0]
+    assert "Vendor 1" not in analyst.prompts[1]
+    assert metrics.prompt_tokens[0] > metrics.prompt_tokens[1]
+    assert evaluator.get_summary()["avg_prompt_tokens"] == sum(metrics.prompt_tokens)
@@ -1,5 +1,12 @@
+import io
+import json
 import time
-from vouchvault.evaluation import AuditMetrics, AuditEvaluator
+from types import SimpleNamespace
+
+import pytest
+
+from vouchvault.evaluation import AuditMetrics, AuditEvaluator, LatencyHistogram, timed_tool
+from vouchvault.manager import run_vouch_vault
 
 
 def test_audit_metrics_duration():
@@ -35,3 +42,94 @@ def test_audit_evaluator_summary():
     assert summary["total_audits"] == 2
     assert summary["passed"] == 1
     assert summary["failed"] == 1
+
+
+def test_latency_histogram_quantiles_are_close():
+    histogram = LatencyHistogram()
+    for ms in range(1, 1001):
+        histogram.add(ms * 1_000_000)
+
+    for q, exact in [(0.5, 500e6), (0.95, 950e6), (0.99, 990e6)]:
+        assert abs(histogram.quantile(q) - exact) / exact < 0.05
+    assert histogram.quantile(1.0) == 1000 * 1_000_000
+    assert len(histogram.buckets) < 200
+
+
+def test_history_is_bounded_but_totals_are_not():
+    sink = io.StringIO()
+    evaluator = AuditEvaluator(history_size=2, sink=sink)
+    for i in range(5):
+        metrics = evaluator.start_audit(f"INV-{i}")
+        metrics.status = "PASS" if i % 2 == 0 else "FAIL"
+        metrics.record("model", 1_000_000)
+        evaluator.finish_audit(metrics)
+
+    assert len(evaluator.history) == 2
+    summary = evaluator.get_summary()
+    assert (summary["total_audits"], summary["passed"]) == (5, 3)
+    lines = [json.loads(line) for line in sink.getvalue().splitlines()]
+    assert [line["invoice_id"] for line in lines] == [f"INV-{i}" for i in range(5)]
+    assert lines[0]["stages_ms"] == {"model": 1.0}
+
+    text = evaluator.to_prometheus()
+    assert "vouchvault_audits_total 5" in text
+    assert 'vouchvault_stage_seconds{stage="model",quantile="0.5"}' in text
+    assert 'vouchvault_stage_seconds_count{stage="model"} 5' in text
+
+
+def test_audit_records_stage_spans_and_tool_time():
+    @timed_tool
+    def slow_tool():
+        time.sleep(0.01)
+
+    class ToolCallingAnalyst:
+        def reset(self):
+            pass
+
+        def analyze(self, prompt):
+            slow_tool()
+            return SimpleNamespace(text="AUDIT STATUS: PASS")
+
+    evaluator = AuditEvaluator()
+    metrics = run_vouch_vault("Invoice No: INV-001\nTotal: 500", "date,description,amount,type,balance\n",
+                              evaluator=evaluator, analyst=ToolCallingAnalyst(), verbose=False)
+
+    assert {"parse", "rules", "context", "model", "tools"} <= set(metrics.stage_ns)
+    assert metrics.stage_ns["model"] >= metrics.stage_ns["tools"] >= 10_000_000
+    assert metrics.response_tokens == [5]
+    assert metrics.token_sources == ["estimate"] and metrics.tokens_estimated
+    assert metrics.elapsed_ns >= metrics.stage_ns["model"]
+    assert evaluator.stage_latency["tools"].count == 1
+
+
+def test_token_counts_prefer_model_reported_usage():
+    class UsageAnalyst:
+        def reset(self):
+            pass
+
+        def analyze(self, prompt):
+            usage = SimpleNamespace(prompt_token_count=1234, candidates_token_count=56)
+            return SimpleNamespace(text="AUDIT STATUS: PASS", usage_metadata=usage)
+
+    metrics = run_vouch_vault("Invoice No: INV-001\nTotal: 500", "date,description,amount,type,balance\n",
+                              analyst=UsageAnalyst(), verbose=False)
+
+    assert (metrics.prompt_tokens, metrics.response_tokens) == ([1234], [56])
+    assert metrics.token_sources == ["usage"]
+    assert metrics.to_dict()["tokens_estimated"] is False
+
+
+def test_audit_that_raises_is_finished_as_error():
+    class BrokenAnalyst:
+        def reset(self):
+            raise RuntimeError("no agent available")
+
+    evaluator = AuditEvaluator()
+    with pytest.raises(RuntimeError):
+        run_vouch_vault("Invoice No: INV-001\nTotal: 500", "date,description,amount,type,balance\n",
+                        evaluator=evaluator, analyst=BrokenAnalyst(), verbose=False)
+
+    metrics = evaluator.history[-1]
+    assert (metrics.status, metrics.trail) == ("ERROR", ["error: no agent available"])
+    assert evaluator.latency.count == 1
+    assert evaluator.get_summary()["failed"] == 1
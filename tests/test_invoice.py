@@ -0,0 +1,58 @@
+from vouchvault.config import INVOICE_DATA
+from vouchvault.invoice import GSTLine, parse_invoice, parse_invoices
+
+INVOICE = """Invoice No: INV-001
+Date: 2024-04-10
+Vendor: ABC Services Pvt Ltd
+Amount (before tax): 10,000 INR
+GST (18%): 1,800 INR
+Total Amount: 11,800 INR
+"""
+
+SPLIT_GST = """Tax Invoice
+Invoice Number: KA/2024/0042
+Invoice Date: 05/06/2024
+Supplier: Shree Ganesh Traders
+Taxable Value: Rs. 1,00,000.00
+CGST @ 9%: Rs. 9,000.00
+SGST @ 9%: Rs. 9,000.00
+Total GST: Rs. 18,000.00
+Grand Total: ₹1,18,000.00
+"""
+
+
+def test_parses_labelled_fields():
+    invoice = parse_invoice(INVOICE)
+    assert invoice.invoice_id == "INV-001"
+    assert invoice.vendor == "ABC Services Pvt Ltd"
+    assert invoice.date == "2024-04-10"
+    assert (invoice.subtotal, invoice.tax, invoice.total) == (10000.0, 1800.0, 11800.0)
+    assert invoice.tax_rate == 0.18
+
+
+def test_split_gst_and_indian_grouping():
+    invoice = parse_invoice(SPLIT_GST)
+    assert invoice.invoice_id == "KA/2024/0042"
+    assert invoice.date == "2024-06-05"
+    assert invoice.gst_lines == (GSTLine("CGST", 0.09, 9000.0), GSTLine("SGST", 0.09, 9000.0))
+    assert (invoice.subtotal, invoice.tax, invoice.total) == (100000.0, 18000.0, 118000.0)
+    assert invoice.tax_rate == 0.18
+
+
+def test_sub_total_is_not_the_total():
+    invoice = parse_invoice("Invoice No: INV-7\nSub Total: 1,000.00\nGST (18%): 180.00\nTotal: 1,180.00\n")
+    assert (invoice.subtotal, invoice.tax, invoice.total) == (1000.0, 180.0, 1180.0)
+    assert parse_invoice("Sub-Total: 1,000.00\nTotal: 1,180.00").total == 1180.0
+    assert parse_invoice("SUB TOTAL 1,000.00\nGrand Total 1,180.00").total == 1180.0
+
+
+def test_missing_fields_are_none():
+    invoice = parse_invoice("Vendor: Unknown\nTotal: 500")
+    assert (invoice.invoice_id, invoice.date, invoice.subtotal, invoice.tax) == (None, None, None, None)
+    assert invoice.total == 500.0
+
+
+def test_bulk_parsing_is_lazy():
+    invoices = parse_invoices([INVOICE, SPLIT_GST, INVOICE_DATA])
+    assert next(invoices).invoice_id == "INV-001"
+    assert [i.total for i in invoices] == [118000.0, parse_invoice(INVOICE_DATA).total]
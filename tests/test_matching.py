@@ -1,4 +1,5 @@
 from vouchvault.tools import match_invoice_to_statement
+from vouchvault.matching import DEBIT, StatementIndex
 
 def test_match_invoice_to_statement_exact():
     invoice_amount = 11800
@@ -10,3 +11,64 @@ def test_match_invoice_to_statement_exact():
     match = match_invoice_to_statement(invoice_amount, bank_records)
     assert match is not None
     assert match["amount"] == 11800
+
+RECORDS = [
+    {"date": "2024-04-12", "description": "NEFT ABC SERVICES PVT LTD", "amount": "-11,800.00", "type": "DEBIT"},
+    {"date": "2024-04-15", "description": "Salary Credit", "amount": "11800.00", "type": "CREDIT"},
+    {"date": "2024-04-20", "description": "NEFT ABC SERVICES PVT LTD", "amount": "-11,790.00", "type": "DEBIT"},
+    {"date": "2024-04-13", "description": "ABC SERVICES PART 1", "amount": "-5000.00", "type": "DEBIT"},
+    {"date": "2024-04-14", "description": "ABC SERVICES PART 2", "amount": "-6800.00", "type": "DEBIT"},
+]
+
+
+def test_index_tolerance_and_filters():
+    index = StatementIndex(RECORDS)
+
+    exact = index.find(11800)
+    assert [c.records[0]["description"] for c in exact] == ["NEFT ABC SERVICES PVT LTD", "Salary Credit"]
+
+    debits = index.find(11800, tolerance=15, direction=DEBIT, date="2024-04-12", date_window=10)
+    assert [c.amount for c in debits] == [11800.0, 11790.0]
+    assert debits[1].amount_diff == 10.0
+
+
+def test_index_split_and_consolidated_payments():
+    index = StatementIndex(RECORDS)
+
+    splits = index.find_split(11800, date="2024-04-12", direction=DEBIT)
+    assert len(splits) == 1
+    assert sorted(c["amount"] for c in splits[0].records) == ["-5000.00", "-6800.00"]
+
+    consolidated = index.find_consolidated([("INV-1", 3000), ("INV-2", 2000), ("INV-3", 99)])
+    assert consolidated[0].invoice_ids == ["INV-1", "INV-2"]
+    assert consolidated[0].amount == 5000.0
+
+
+def test_split_pool_is_the_nearest_rows_not_the_whole_statement():
+    fees = [{"date": f"2023-{m:02d}-01", "description": "BANK FEE", "amount": "-1.00", "type": "DEBIT"}
+            for m in range(1, 13) for _ in range(50)]
+    index = StatementIndex(RECORDS + fees)
+
+    dated = index.find_split(11800, date="2024-04-12", direction=DEBIT)
+    assert sorted(c["amount"] for c in dated[0].records) == ["-5000.00", "-6800.00"]
+
+    # Without a date the pool is the amounts just below the invoice, not the 600 smallest fees
+    undated = index.find_split(11800, direction=DEBIT, max_candidates=5)
+    assert sorted(c["amount"] for c in undated[0].records) == ["-5000.00", "-6800.00"]
+    assert index.find_split(11800, date="2024-04-12", direction=DEBIT, max_scan=1) == []
+
+
+def test_nearest_rows_by_amount_and_date():
+    index = StatementIndex(RECORDS)
+
+    assert index.positions_near(11800, tolerance=1000, limit=3) == [0, 1, 2]
+    assert index.positions_near(6000, tolerance=900) == [4]
+    assert index.positions_by_date("2024-04-13", window=2) == [3, 0, 4, 1]
+    assert index.positions_by_date("2024-04-13", window=10, limit=2) == [3, 0]
+    assert index.positions_by_date("not a date") == []
+
+
+def test_match_accepts_prebuilt_index():
+    index = StatementIndex(RECORDS)
+    assert match_invoice_to_statement(6800, index)["description"] == "ABC SERVICES PART 2"
+    assert match_invoice_to_statement(1.23, index) is None
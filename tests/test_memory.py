@@ -1,4 +1,4 @@
-from vouchvault.memory import AuditMemory, AuditRecord
+from vouchvault.memory import AuditMemory, AuditRecord, SQLiteAuditMemory
 
 
 def test_add_and_count():
@@ -38,3 +38,81 @@ def test_get_recent():
     recent = memory.get_recent(3)
     assert len(recent) == 3
     assert recent[-1].invoice_id == "INV-009"
+
+
+def test_exact_vendor_lookup():
+    """Exact lookups use the normalized vendor name."""
+    memory = AuditMemory()
+    memory.add_record(AuditRecord("INV-001", "ABC Services, Pvt. Ltd", 1000.0, "PASS"))
+    memory.add_record(AuditRecord("INV-002", "ABC Services Pvt Ltd Branch", 1000.0, "PASS"))
+
+    assert [r.invoice_id for r in memory.get_by_vendor("abc services pvt ltd", exact=True)] == ["INV-001"]
+
+
+def test_records_are_compact():
+    record = AuditRecord("INV-001", "ABC " + "Services", 1000.0, "PASS")
+
+    assert not hasattr(record, "__dict__")
+    assert isinstance(record.timestamp, int)
+    assert record.vendor is AuditRecord("INV-002", "ABC Services", 1.0, "FAIL").vendor
+    assert AuditRecord("INV-003", "X", 1.0, "PASS", "2025-11-19T10:00:00").recorded_at.hour == 10
+
+
+def test_bounded_memory_keeps_latest_records():
+    memory = AuditMemory(capacity=3, expected_records=100)
+    for i in range(5):
+        memory.add_record(AuditRecord(f"INV-{i:03d}", "ABC Services" if i % 2 else "XYZ Corp", 100.0, "PASS"))
+
+    assert memory.total_processed == 5
+    assert [r.invoice_id for r in memory.get_recent(10)] == ["INV-002", "INV-003", "INV-004"]
+    assert [r.invoice_id for r in memory.get_by_vendor("abc")] == ["INV-003"]
+    assert [r.invoice_id for r in memory.get_by_vendor("xyz corp", exact=True)] == ["INV-002", "INV-004"]
+    assert memory.has_duplicate("INV-000") is True  # Evicted, still remembered
+    assert memory.has_duplicate("INV-999") is False
+
+
+def test_sqlite_memory_persists_across_instances(tmp_path):
+    """Records survive reopening the database and batches flush on close."""
+    path = str(tmp_path / "memory.db")
+    with SQLiteAuditMemory(path, batch_size=10) as memory:
+        memory.add_record(AuditRecord("INV-001", "ABC Services", 1000.0, "PASS"))
+        assert memory.has_duplicate("INV-001") is True  # Still queued
+
+    with SQLiteAuditMemory(path) as memory:
+        assert memory.total_processed == 1
+        assert memory.has_duplicate("INV-001") is True
+        assert memory.has_duplicate("INV-002") is False
+        assert memory.get_by_vendor("abc")[0].vendor == "ABC Services"
+
+
+def test_sqlite_memory_sees_other_writers(tmp_path):
+    """A duplicate written through another connection is still detected."""
+    path = str(tmp_path / "memory.db")
+    reader = SQLiteAuditMemory(path, expected_records=1)
+    assert reader.has_duplicate("INV-001") is False
+
+    with SQLiteAuditMemory(path, batch_size=1) as writer:
+        for i in range(5):
+            writer.add_record(AuditRecord(f"INV-{i:03d}", "Vendor", 100.0, "PASS"))
+
+    assert all(reader.has_duplicate(f"INV-{i:03d}") for i in range(5))
+    assert [r.invoice_id for r in reader.get_recent(2)] == ["INV-003", "INV-004"]
+    reader.close()
+
+
+def test_sqlite_memory_adds_invoice_date_to_old_databases(tmp_path):
+    import sqlite3
+
+    path = str(tmp_path / "old.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE audits (invoice_id TEXT NOT NULL, vendor TEXT NOT NULL, vendor_key TEXT NOT NULL, "
+                     "amount REAL NOT NULL, status TEXT NOT NULL, timestamp TEXT NOT NULL, notes TEXT)")
+        conn.execute("INSERT INTO audits VALUES ('INV-001', 'ABC', 'abc', 1.0, 'PASS', '2025-01-01T10:00:00', NULL)")
+    conn.close()
+
+    with SQLiteAuditMemory(path, batch_size=1) as memory:
+        memory.add_record(AuditRecord("INV-002", "ABC", 2.0, "PASS", invoice_date="2025-02-01"))
+        records = list(memory.iter_records(page_size=1))
+
+    assert [(r.invoice_id, r.invoice_date) for r in records] == [("INV-001", None), ("INV-002", "2025-02-01")]
+    assert all(isinstance(r.timestamp, int) for r in records)
@@ -0,0 +1,129 @@
+from vouchvault.invoice import parse_invoice
+from vouchvault.memory import AuditMemory, SQLiteAuditMemory
+from vouchvault.reconcile import MATCHED, OVERDUE, PARTIAL, Reconciler, record_match, tail_csv
+
+HEADER = "date,description,amount,type,balance\n"
+
+
+def invoice(number: int, vendor: str, subtotal: str, tax: str, total: str, date: str = "2024-04-01"):
+    return parse_invoice(f"Invoice No: INV-{number:03d}\nDate: {date}\nVendor: {vendor}\n"
+                         f"Amount (before tax): {subtotal}\nGST (18%): {tax}\nTotal Amount: {total}\n")
+
+
+def reconciler() -> Reconciler:
+    r = Reconciler(due_days=30)
+    r.add_invoice(invoice(1, "ABC Services Pvt Ltd", "10,000", "1,800", "11,800"))
+    r.add_invoice(invoice(2, "TechSolutions Inc", "1,000", "180", "1,180"))
+    r.add_invoice(invoice(3, "Sharma Stationers", "500", "90", "590", date="2024-03-01"))
+    return r
+
+
+def test_matches_partials_and_overdue():
+    r = reconciler()
+    rows = [
+        {"date": "2024-04-05", "description": "NEFT ABC SERVICES PVT LTD", "amount": "-11600.00", "type": "DEBIT"},
+        {"date": "2024-04-06", "description": "NEFT TECHSOLUTIONS INC", "amount": "-500.00", "type": "DEBIT"},
+        {"date": "2024-04-07", "description": "Salary credit", "amount": "1180.00", "type": "CREDIT"},
+        {"date": "2024-04-08", "description": "NEFT TECHSOLUTONS INC", "amount": "-680.00", "type": "DEBIT"},
+    ]
+
+    events = [(e.kind, e.invoice_id, e.outstanding) for row in rows for e in r.process(row)]
+
+    assert events == [
+        (OVERDUE, "INV-003", 590.0),
+        (MATCHED, "INV-001", 0.0),   # 11,800 less 2% TDS on the subtotal
+        (PARTIAL, "INV-002", 680.0),
+        (MATCHED, "INV-002", 0.0),   # Balance paid, narration misspelled
+    ]
+    assert list(r.items) == ["INV-003"]
+    assert r._by_amount.keys() == r._amounts(r.items["INV-003"])
+
+
+def test_checkpoint_resumes_without_reprocessing(tmp_path):
+    feed = tmp_path / "feed.csv"
+    state = str(tmp_path / "state.json")
+    feed.write_text(HEADER + "2024-04-05,NEFT TECHSOLUTIONS INC,-500.00,DEBIT,0\n", encoding="utf-8")
+
+    first = reconciler()
+    events = list(first.consume(tail_csv(str(feed), first.position), checkpoint=state))
+    assert [e.kind for e in events] == [OVERDUE, PARTIAL]
+
+    # Rows arrive after the restart; earlier ones must not be applied twice
+    with open(feed, "a", encoding="utf-8") as f:
+        f.write("2024-04-06,NEFT TECHSOLUTIONS INC,-680.00,DEBIT,0\n")
+    resumed = Reconciler.load(state)
+    events = list(resumed.consume(tail_csv(str(feed), resumed.position), checkpoint=state))
+
+    assert [(e.kind, e.invoice_id) for e in events] == [(MATCHED, "INV-002")]
+    assert sorted(resumed.items) == ["INV-001", "INV-003"]
+    assert resumed.items["INV-003"].overdue
+    assert Reconciler.load(state).rows_seen == 2
+
+
+def test_resume_after_crash_does_not_repeat_matches(tmp_path):
+    feed = tmp_path / "feed.csv"
+    state = str(tmp_path / "state.json")
+    feed.write_text(HEADER + "2024-04-05,NEFT TECHSOLUTIONS INC,-1180.00,DEBIT,0\n"
+                    "2024-04-06,NEFT ABC SERVICES PVT LTD,-11800.00,DEBIT,0\n", encoding="utf-8")
+    memory = AuditMemory()
+
+    first = reconciler()
+    feed_events = first.consume(tail_csv(str(feed), first.position), checkpoint=state)
+    for event in feed_events:
+        record_match(memory, event)
+        if event.invoice_id == "INV-001":
+            break  # The process dies after recording INV-001, before the next checkpoint
+
+    resumed = Reconciler.load(state)
+    events = list(resumed.consume(tail_csv(str(feed), resumed.position), checkpoint=state))
+
+    # Only the row being handled at the crash is replayed, and its write is skipped
+    assert [(e.kind, e.invoice_id) for e in events] == [(MATCHED, "INV-001")]
+    assert [record_match(memory, e) for e in events] == [False]
+    assert memory.total_processed == 2
+    assert list(resumed.items) == ["INV-003"]
+
+
+class Killed(Exception):
+    pass
+
+
+def test_checkpoint_never_gets_ahead_of_memory_writes(tmp_path):
+    feed = tmp_path / "feed.csv"
+    state = str(tmp_path / "state.json")
+    db = str(tmp_path / "memory.db")
+    feed.write_text(HEADER + "2024-04-05,NEFT TECHSOLUTIONS INC,-1180.00,DEBIT,0\n"
+                    "2024-04-06,Coffee Shop,-5.00,DEBIT,0\n", encoding="utf-8")
+
+    def killed_after_first_row(rows):
+        yield next(rows)
+        raise Killed  # The checkpoint past the paying row is on disk; memory is never closed
+
+    first = reconciler()
+    memory = SQLiteAuditMemory(db)  # Buffers up to 100 records
+    try:
+        for event in first.consume(killed_after_first_row(tail_csv(str(feed))), checkpoint=state,
+                                   before_save=memory.flush):
+            record_match(memory, event)
+    except Killed:
+        pass
+
+    resumed = Reconciler.load(state)
+    with SQLiteAuditMemory(db) as restarted:
+        assert "INV-002" not in resumed.items
+        assert restarted.has_duplicate("INV-002")
+    memory.close()
+
+
+def test_tail_holds_back_partial_lines(tmp_path):
+    feed = tmp_path / "feed.csv"
+    feed.write_text(HEADER + "2024-04-05,A,-1.00,DEBIT,0\n2024-04-06,B,-2.0", encoding="utf-8")
+
+    rows = tail_csv(str(feed), follow=True, poll=0.01)
+    row, position = next(rows)
+    assert row["description"] == "A"
+    with open(feed, "a", encoding="utf-8") as f:
+        f.write("0,DEBIT,0\n")
+    row, end = next(rows)
+    assert (row["description"], row["amount"]) == ("B", "-2.00")
+    assert end == feed.stat().st_size
@@ -0,0 +1,84 @@
+import csv
+import importlib.util
+
+import pytest
+
+from vouchvault.manager import run_vouch_vault
+from vouchvault.report import NAMES, ReportWriter
+from vouchvault.statement import BankStatement
+
+STATEMENT = BankStatement("""date,description,amount,type,balance
+2024-04-12,NEFT ABC SERVICES PVT LTD,-11800.00,DEBIT,50000.00
+""")
+INVOICE = """Invoice No: INV-001
+Date: 2024-04-10
+Vendor: ABC Services Pvt Ltd
+Amount (before tax): 10,000 INR
+GST (18%): 1,800 INR
+Total Amount: 11,800 INR
+"""
+
+
+def audits():
+    passed = run_vouch_vault(INVOICE, STATEMENT, verbose=False)
+    failed = run_vouch_vault(INVOICE.replace("1,800 INR", "1,000 INR"), STATEMENT, verbose=False)
+    return passed, failed
+
+
+def read_rows(path):
+    with open(path, encoding="utf-8", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def test_csv_report_in_row_groups(tmp_path):
+    passed, failed = audits()
+    path = str(tmp_path / "report.csv")
+
+    with ReportWriter(path, row_group_size=2) as report:
+        report.add(passed, source="a.txt")
+        report.add(failed, source="b.txt")
+        assert report.rows_written == 2  # First group flushed
+        report.add(None, source="c.txt", error="Could not read invoice")
+
+    rows = read_rows(path)
+    assert tuple(rows[0]) == NAMES
+    assert [(r["source"], r["status"]) for r in rows] == [("a.txt", "PASS"), ("b.txt", "FAIL"), ("c.txt", "")]
+    assert rows[0]["match_description"] == "NEFT ABC SERVICES PVT LTD"
+    assert (rows[0]["match_amount"], rows[0]["difference"], rows[0]["tax_compliant"]) == ("11800.0", "0.0", "true")
+    assert rows[1]["tax_compliant"] == "false" and rows[2]["error"] == "Could not read invoice"
+    assert float(rows[0]["rules_ms"]) > 0
+
+
+def test_csv_report_appends_without_second_header(tmp_path):
+    passed, _ = audits()
+    path = str(tmp_path / "report.csv")
+    for _ in range(2):
+        with ReportWriter(path, append=True) as report:
+            report.add(passed)
+
+    assert [r["invoice_id"] for r in read_rows(path)] == ["INV-001", "INV-001"]
+
+
+@pytest.mark.skipif(importlib.util.find_spec("pyarrow") is not None, reason="pyarrow is installed")
+def test_columnar_report_falls_back_to_csv(tmp_path):
+    with pytest.warns(UserWarning, match="pyarrow is not installed"):
+        report = ReportWriter(str(tmp_path / "report.parquet"))
+    assert (report.format, report.path) == ("csv", str(tmp_path / "report.csv"))
+    report.close()
+
+
+def test_parquet_report_appends_parts(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    passed, failed = audits()
+    path = str(tmp_path / "report.parquet")
+
+    with ReportWriter(path, row_group_size=1) as report:
+        report.add(passed)
+        report.add(failed)
+    with ReportWriter(path, append=True) as report:
+        report.add(passed)
+
+    assert pq.ParquetFile(path).num_row_groups == 2
+    assert pq.read_table(path).column("status").to_pylist() == ["PASS", "FAIL"]
+    assert report.path == str(tmp_path / "report-00001.parquet")
+    assert pq.read_table(report.path).num_rows == 1
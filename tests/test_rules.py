@@ -0,0 +1,123 @@
+from types import SimpleNamespace
+
+from vouchvault.evaluation import AuditEvaluator
+from vouchvault.manager import run_vouch_vault
+from vouchvault.memory import AuditMemory
+from vouchvault.invoice import parse_invoice
+from vouchvault.rules import explain_gap, precheck
+from vouchvault.statement import BankStatement
+
+INVOICE = """Invoice No: INV-001
+Date: 2024-04-10
+Vendor: ABC Services Pvt Ltd
+Amount (before tax): 10,000 INR
+GST (18%): 1,800 INR
+Total Amount: 11,800 INR
+"""
+
+STATEMENT = BankStatement("""date,description,amount,type,balance
+2024-04-12,NEFT ABC SERVICES PVT LTD,11800.00,DEBIT,50000.00
+2024-04-13,NEFT XYZ CORP,11600.00,DEBIT,38400.00
+2024-04-14,NEFT TECHSOLUTIONS INC,11780.00,DEBIT,26620.00
+""")
+
+
+class ScriptedAnalyst:
+    """Replies with the given texts in turn, repeating the last one."""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.prompts = []
+
+    def reset(self):
+        pass
+
+    def analyze(self, prompt):
+        self.prompts.append(prompt)
+        return SimpleNamespace(text=self.replies[min(len(self.prompts), len(self.replies)) - 1])
+
+
+class FailingAnalyst:
+    """The model must not be called when the rules decide."""
+
+    def reset(self):
+        pass
+
+    def analyze(self, prompt):
+        raise AssertionError("analyst should not be called")
+
+
+def test_clear_cases_are_decided_locally():
+    assert precheck(parse_invoice(INVOICE), STATEMENT).status == "PASS"
+    assert precheck(parse_invoice(INVOICE.replace("ABC Services Pvt Ltd", "XYZ Corp")), STATEMENT).reason.endswith("TDS at 2%")
+    assert precheck(parse_invoice(INVOICE.replace("1,800 INR", "1,000 INR")), STATEMENT).status == "FAIL"
+
+    unknown = INVOICE.replace("ABC Services Pvt Ltd", "Reliance Retail").replace("11,800", "99,999")
+    assert precheck(parse_invoice(unknown), STATEMENT).status == "FAIL"
+
+
+def test_ambiguous_cases_go_to_model():
+    near_miss = INVOICE.replace("ABC Services Pvt Ltd", "TechSolutions Inc")
+    decision = precheck(parse_invoice(near_miss), STATEMENT)
+    assert decision.status is None
+    assert decision.vendor_matched is True
+
+
+def test_missing_gst_line_goes_to_model():
+    no_gst = "Invoice No: INV-002\nVendor: TechSolutions Inc\nTotal: 1,180.00\n"
+    statement = BankStatement("date,description,amount,type,balance\n"
+                              "2024-04-12,NEFT TECHSOLUTIONS INC,-1180.00,DEBIT,50000.00\n")
+
+    for decide in (precheck, explain_gap):
+        decision = decide(parse_invoice(no_gst), statement)
+        assert decision.status is None
+        assert decision.tax_compliant is None
+        assert decision.amount_matched is True
+
+
+def test_rules_path_skips_analyst():
+    memory = AuditMemory()
+    evaluator = AuditEvaluator()
+
+    metrics = run_vouch_vault(INVOICE, STATEMENT, memory=memory, evaluator=evaluator,
+                              analyst=FailingAnalyst(), verbose=False)
+
+    assert (metrics.status, metrics.path, metrics.attempts) == ("PASS", "rules", 0)
+    assert memory.get_recent(1)[0].amount == 11800.0
+    assert evaluator.get_summary()["decided_by_rules"] == "100.0%"
+
+
+def test_failed_audit_gap_is_classified():
+    assert explain_gap(parse_invoice(INVOICE), STATEMENT).status == "PASS"
+    assert explain_gap(parse_invoice(INVOICE.replace("1,800 INR", "1,000 INR")), STATEMENT).status == "FAIL"
+    assert explain_gap(parse_invoice(INVOICE.replace("11,800", "99,999")), STATEMENT).status == "FAIL"
+
+    near_miss = INVOICE.replace("ABC Services Pvt Ltd", "TechSolutions Inc")
+    assert explain_gap(parse_invoice(near_miss), STATEMENT).status is None
+
+
+def test_settled_gaps_need_no_retry():
+    analyst = ScriptedAnalyst("AUDIT STATUS: FAIL")
+    metrics = run_vouch_vault(INVOICE, STATEMENT, analyst=analyst, use_rules=False, verbose=False)
+    assert (metrics.status, metrics.model_calls) == ("PASS", 1)
+    assert metrics.trail[-1] == "stop: gap settled by rules (PASS)"
+
+    missing = INVOICE.replace("11,800", "99,999")
+    metrics = run_vouch_vault(missing, STATEMENT, analyst=ScriptedAnalyst("AUDIT STATUS: FAIL"),
+                              use_rules=False, verbose=False)
+    assert (metrics.status, metrics.model_calls) == ("FAIL", 1)
+
+
+def test_retry_carries_hint_and_stops_on_convergence():
+    near_miss = INVOICE.replace("ABC Services Pvt Ltd", "TechSolutions Inc")
+    analyst = ScriptedAnalyst("AUDIT STATUS: FAIL. Paid 11780 against 11800.")
+    metrics = run_vouch_vault(near_miss, STATEMENT, analyst=analyst, verbose=False)
+
+    assert (metrics.status, metrics.model_calls) == ("FAIL", 2)
+    assert analyst.prompts[1].startswith("Previous audit failed. Check for discounts")
+    assert metrics.trail[-1] == "stop: model repeated its finding"
+    assert metrics.to_dict()["trail"] == metrics.trail
+
+    analyst = ScriptedAnalyst("AUDIT STATUS: FAIL 11780", "AUDIT STATUS: FAIL 20", "AUDIT STATUS: PASS")
+    metrics = run_vouch_vault(near_miss, STATEMENT, analyst=analyst, verbose=False)
+    assert (metrics.status, metrics.model_calls) == ("PASS", 3)
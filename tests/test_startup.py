@@ -0,0 +1,40 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Make any attempt to import the Gemini SDK or python-dotenv fail
+BLOCK_SDK = """
+import sys
+class Block:
+    def find_spec(self, name, path=None, target=None):
+        if name.startswith(("google.generativeai", "google.api_core", "dotenv")):
+            raise ImportError(f"{name} is blocked")
+sys.meta_path.insert(0, Block())
+"""
+
+
+def run_python(code: str) -> str:
+    return subprocess.run([sys.executable, "-c", BLOCK_SDK + code], cwd=ROOT,
+                          capture_output=True, text=True, check=True).stdout
+
+
+def test_tools_and_rules_run_without_the_sdk():
+    out = run_python("""
+from vouchvault import calculate_gst, run_vouch_vault
+from vouchvault.ratelimit import is_quota_error
+invoice = "Invoice No: INV-001\\nVendor: ABC Services\\nAmount (before tax): 100\\nGST (18%): 18\\nTotal Amount: 118"
+statement = "date,description,amount,type,balance\\n2024-04-12,NEFT ABC SERVICES,-118.00,DEBIT,0"
+metrics = run_vouch_vault(invoice, statement, verbose=False)
+print(calculate_gst(100), metrics.path, metrics.status, is_quota_error(ValueError()))
+""")
+    assert out.split() == ["18.0", "rules", "PASS", "False"]
+
+
+def test_package_import_is_lazy():
+    out = run_python("""
+import vouchvault, sys
+print(sorted(m for m in ("numpy", "vouchvault.analyst", "vouchvault.manager") if m in sys.modules))
+""")
+    assert out.strip() == "[]"
@@ -0,0 +1,46 @@
+import numpy as np
+
+from vouchvault.manager import _amount_hint
+from vouchvault.matching import DEBIT, StatementIndex
+from vouchvault.statement import BankStatement, iter_bank_statement, load_bank_statement
+from vouchvault.tools import match_invoice_to_statement
+
+BANK_CSV = """date,description,amount,type,balance
+2024-04-12,NEFT ABC SERVICES PVT LTD,"-11,800.00",DEBIT,50000.00
+2024-04-15,Salary Credit,60000.00,CREDIT,110000.00
+,Bank Charges,,DEBIT,
+"""
+
+
+def test_columnar_parse():
+    statement = BankStatement(BANK_CSV)
+
+    assert len(statement) == 3
+    assert statement.amounts.dtype == np.float64
+    assert statement.amounts[0] == -11800.0
+    assert np.isnan(statement.amounts[2])
+    assert np.isnat(statement.dates[2])
+    assert statement[0]["description"] == "NEFT ABC SERVICES PVT LTD"
+    assert statement.to_csv([1]).splitlines()[1] == "2024-04-15,Salary Credit,60000.00,CREDIT,110000.00"
+
+
+def test_chunked_load_matches_full_parse(tmp_path):
+    path = tmp_path / "statement.csv"
+    path.write_text(BANK_CSV, encoding="utf-8")
+
+    assert [len(c) for c in iter_bank_statement(str(path), chunk_size=2)] == [2, 1]
+    loaded = load_bank_statement(str(path), chunk_size=2)
+    assert loaded.records == BankStatement(BANK_CSV).records
+
+
+def test_index_from_statement():
+    index = StatementIndex.from_statement(BankStatement(BANK_CSV))
+
+    assert len(index) == 2
+    assert index.find(11800, direction=DEBIT, date="2024-04-10", date_window=5)[0].records[0]["type"] == "DEBIT"
+    assert match_invoice_to_statement(60000, BankStatement(BANK_CSV))["description"] == "Salary Credit"
+
+
+def test_hint_uses_closest_amount():
+    hint = _amount_hint(11830.0, BankStatement(BANK_CSV))
+    assert "30.00" in hint
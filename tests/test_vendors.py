@@ -0,0 +1,71 @@
+import random
+from difflib import SequenceMatcher
+
+from vouchvault.tools import fuzzy_match_vendor
+from vouchvault.vendors import VendorIndex
+
+STATEMENT = """date,description,amount,type,balance
+2025-11-18,Coffee Shop,-5.00,DEBIT,50000.00
+2025-11-19,NEFT Transfer to TechSolutons Inc,-1150.00,DEBIT,48850.00
+2025-11-20,Office Supplies,-50.00,DEBIT,48800.00
+"""
+
+
+def test_index_top_k_phrases():
+    index = VendorIndex(STATEMENT)
+
+    matches = index.search("TechSolutions", k=3, threshold=0.5)
+    assert [m.phrase for m in matches][0] == "techsolutons"
+    assert matches[0].confidence == 0.96
+    assert len(matches) == 3
+    assert all(a.confidence >= b.confidence for a, b in zip(matches, matches[1:]))
+
+
+def test_match_methods():
+    index = VendorIndex(STATEMENT)
+
+    assert index.match("office supplies").method == "exact"
+    assert index.match("TechSolutons").method == "exact"
+    assert index.match("TechSolutions").method == "phrase"
+    assert index.match("Reliance Retail") is None
+
+
+def _brute_force(vendor: str, text: str, threshold: float = 0.75) -> bool:
+    """Score every 1-3 word phrase, as fuzzy_match_vendor did before the index."""
+    words = text.lower().split()
+    phrases = {' '.join(words[i:i + n]) for i in range(len(words)) for n in (1, 2, 3) if i + n <= len(words)}
+    return any(SequenceMatcher(None, vendor.lower().strip(), p).ratio() > threshold for p in phrases)
+
+
+def test_search_finds_every_phrase_brute_force_finds():
+    rng = random.Random(7)
+    names = ["corp alpha blue", "cloud blue", "zenith cloud hosting", "techsolutions inc", "blue dart express"]
+
+    def typo(name: str) -> str:
+        chars = list(name)
+        for _ in range(rng.randint(1, 4)):
+            i = rng.randrange(len(chars))
+            kind = rng.randrange(3)
+            if kind == 0:
+                del chars[i]
+            elif kind == 1:
+                chars.insert(i, rng.choice("abcdeloprstu j"))
+            else:
+                chars[i] = rng.choice("abcdeloprstu")
+        return ''.join(chars)
+
+    padding = [f"UPI{n} REF{n * 7}" for n in range(50)]
+    cases = [("corp alpha blue", "neft cop lpp bluej"), ("cloud blue", "pcouud bbue")]
+    cases += [(rng.choice(names), "neft " + typo(rng.choice(names))) for _ in range(300)]
+    for vendor, description in cases:
+        index = VendorIndex("\n".join(padding + [description]))
+        assert bool(index.search(vendor, k=1)) == _brute_force(vendor, index.text), (vendor, description)
+
+    index = VendorIndex("\n".join(padding + ["NEFT ZENITH CLUOD HOSTING"]))
+    assert index.search("Zenith Cloud Hosting", k=1)[0].phrase == "zenith cluod hosting"
+    assert index.search("Unlisted Vendor 42") == []
+
+
+def test_tool_keeps_result_shape():
+    assert fuzzy_match_vendor("TechSolutions", STATEMENT)["note"].startswith("Fuzzy match detected (phrase:")
+    assert fuzzy_match_vendor("Reliance Retail", STATEMENT) == {"match_found": False, "vendor": "Reliance Retail"}
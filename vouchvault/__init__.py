@@ -1,24 +1,84 @@
-from .manager import run_vouch_vault
-from .analyst import AnalystAgent
-from .tools import (
-    calculate_gst,
-    calculate_tax_compliance,
-    fuzzy_match_vendor,
-    match_invoice_to_statement
-)
-from .evaluation import AuditMetrics, AuditEvaluator
-from .memory import AuditRecord, AuditMemory
+"""
+VouchVault public API.
+
+Names are imported from their submodules on first access, so
+`from vouchvault import calculate_gst` loads only the tools and never the
+agent or the Gemini SDK.
+"""
+from importlib import import_module
+from typing import TYPE_CHECKING
 
 __version__ = "0.1.0"
-__all__ = [
-    "run_vouch_vault",
-    "AnalystAgent", 
-    "calculate_gst",
-    "calculate_tax_compliance",
-    "fuzzy_match_vendor",
-    "match_invoice_to_statement",
-    "AuditMetrics",
-    "AuditEvaluator",
-    "AuditRecord",
-    "AuditMemory",
-]
+
+_EXPORTS = {
+    "run_vouch_vault": ".manager",
+    "run_batch": ".batch",
+    "BatchResult": ".batch",
+    "Invoice": ".invoice",
+    "GSTLine": ".invoice",
+    "parse_invoice": ".invoice",
+    "parse_invoices": ".invoice",
+    "BankStatement": ".statement",
+    "load_bank_statement": ".statement",
+    "iter_bank_statement": ".statement",
+    "AnalystAgent": ".analyst",
+    "ResponseCache": ".cache",
+    "RecordingStore": ".backends",
+    "RecordingBackend": ".backends",
+    "ReplayBackend": ".backends",
+    "calculate_gst": ".tools",
+    "calculate_tax_compliance": ".tools",
+    "fuzzy_match_vendor": ".tools",
+    "match_invoice_to_statement": ".tools",
+    "check_tax_compliance_bulk": ".compliance",
+    "BulkCompliance": ".compliance",
+    "StatementIndex": ".matching",
+    "MatchCandidate": ".matching",
+    "VendorIndex": ".vendors",
+    "VendorMatch": ".vendors",
+    "AnomalyIndex": ".anomaly",
+    "Anomaly": ".anomaly",
+    "AuditMetrics": ".evaluation",
+    "AuditEvaluator": ".evaluation",
+    "AuditRecord": ".memory",
+    "AuditMemory": ".memory",
+    "SQLiteAuditMemory": ".memory",
+    "ReportWriter": ".report",
+    "Reconciler": ".reconcile",
+    "ReconcileEvent": ".reconcile",
+    "tail_csv": ".reconcile",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
+
+
+if TYPE_CHECKING:
+    from .analyst import AnalystAgent
+    from .anomaly import Anomaly, AnomalyIndex
+    from .backends import RecordingBackend, RecordingStore, ReplayBackend
+    from .batch import BatchResult, run_batch
+    from .cache import ResponseCache
+    from .compliance import BulkCompliance, check_tax_compliance_bulk
+    from .evaluation import AuditEvaluator, AuditMetrics
+    from .invoice import GSTLine, Invoice, parse_invoice, parse_invoices
+    from .manager import run_vouch_vault
+    from .matching import MatchCandidate, StatementIndex
+    from .memory import AuditMemory, AuditRecord, SQLiteAuditMemory
+    from .reconcile import ReconcileEvent, Reconciler, tail_csv
+    from .report import ReportWriter
+    from .statement import BankStatement, iter_bank_statement, load_bank_statement
+    from .tools import calculate_gst, calculate_tax_compliance, fuzzy_match_vendor, match_invoice_to_statement
+    from .vendors import VendorIndex, VendorMatch
@@ -1,31 +1,205 @@
-import google.generativeai as genai
-from .config import API_KEY, MODEL_NAME
+import queue
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from . import config
+from .cache import CachedResponse, ResponseCache
+from .config import MODEL_NAME
+from .evaluation import timed_tool
 from .tools import calculate_tax_compliance, fuzzy_match_vendor
 
+TOOLS = [timed_tool(calculate_tax_compliance), timed_tool(fuzzy_match_vendor)]
+MAX_TURNS = 8  # Turns kept per chat; the first (which carries the audit data) is always kept
+
 
-def _configure_api() -> None:
-    """Configure the Gemini API with the API key."""
-    if not API_KEY:
+def _configure_api():
+    """Import the Gemini SDK on first use and configure it with the API key."""
+    api_key = config.API_KEY
+    if not api_key:
         raise ValueError("GOOGLE_API_KEY not found. Please check your .env file.")
-    genai.configure(api_key=API_KEY)
+    import google.generativeai as genai
+    genai.configure(api_key=api_key)
+    return genai
+
+
+@lru_cache(maxsize=1)
+def _shared_model():
+    """One configured model (and client connection) shared by every agent in the process."""
+    genai = _configure_api()
+    return genai.GenerativeModel(
+        model_name=MODEL_NAME,
+        tools=TOOLS
+    )
+
+
+@lru_cache(maxsize=1)
+def default_backend():
+    """
+    The model backend agents use unless given one.
+
+    VOUCHVAULT_MODEL_MODE picks live Gemini (the default), "record" or
+    "replay"; the last two read and write VOUCHVAULT_RECORDINGS.
+    """
+    from .backends import make_backend
+    return make_backend(config.MODEL_MODE, config.RECORDINGS)
 
 
 class AnalystAgent:
-    def __init__(self):
-        _configure_api()
-        self.model = genai.GenerativeModel(
-            model_name=MODEL_NAME,
-            tools=[
-                calculate_tax_compliance, 
-                fuzzy_match_vendor
-            ]
-        )
-        self.chat = self.model.start_chat(enable_automatic_function_calling=True)
+    """
+    Gemini-backed analyst. The SDK is imported and the model and chat are
+    created on first use, so audits settled by the pre-checks never load
+    or configure the API. `model` is any backend from vouchvault.backends
+    (e.g. ReplayBackend to run offline); by default it is chosen by
+    default_backend().
+
+    With a ResponseCache, a message whose conversation so far has been seen
+    before is answered from the cache; the chat is rebuilt from the
+    recorded turns the next time a real call is needed. A chat keeps at
+    most `max_turns` turns: the first, then the most recent ones.
+    """
+
+    def __init__(self, cache: Optional[ResponseCache] = None, model=None, max_turns: int = MAX_TURNS):
+        self.cache = cache
+        self.max_turns = max_turns
+        self._model = model
+        self._chat = None
+        self._turns: List[Tuple[str, str]] = []  # (message, response text) in this chat
+        self._generation = 0  # Bumped by reset(), so replies to an abandoned chat are dropped
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = default_backend()
+        return self._model
+
+    def warm_up(self) -> None:
+        """Configure the API and build the model now rather than on the first audit."""
+        if hasattr(self.model, "warm_up"):
+            self.model.warm_up()
+
+    @property
+    def chat(self):
+        if self._chat is None:
+            history = []
+            for message, text in self._turns:
+                history.append({"role": "user", "parts": [message]})
+                history.append({"role": "model", "parts": [text]})
+            self._chat = self.model.start_chat(history=history, enable_automatic_function_calling=True)
+        return self._chat
+
+    def reset(self) -> None:
+        """Drop the current chat; the next message starts a fresh one on the same model."""
+        self._chat = None
+        self._turns = []
+        self._generation += 1
+
+    def _record(self, message: str, text: str) -> None:
+        self._turns.append((message, text))
+        if len(self._turns) > self.max_turns:
+            self._turns = self._turns[:1] + self._turns[len(self._turns) - self.max_turns + 1:]
+            self._chat = None  # Rebuilt from the trimmed turns on the next real call
+
+    def _send(self, message: str):
+        key = None
+        if self.cache is not None and getattr(self.model, "cacheable", True):  # Not for ReplayBackend
+            messages = [m for m, _ in self._turns] + [message]
+            key = self.cache.key(MODEL_NAME, [tool.__name__ for tool in TOOLS], messages)
+            text = self.cache.get(key)
+            if text is not None:
+                if hasattr(self.model, "record_cached"):  # Keep recordings complete (see RecordingBackend)
+                    self.model.record_cached(messages, text)
+                self._record(message, text)
+                self._chat = None  # The live chat no longer has the full history
+                return CachedResponse(text)
+        generation = self._generation
+        response = self.chat.send_message(message)
+        if generation != self._generation:
+            return response  # Reset while waiting (e.g. the audit timed out)
+        self._record(message, response.text)
+        if key is not None:
+            self.cache.put(key, response.text)
+        return response
 
     def analyze(self, prompt: str):
         """Analyze the given prompt using the LLM."""
-        return self.chat.send_message(prompt)
+        return self._send(prompt)
     
     def inject_message(self, message: str):
         """Inject a message into the chat history."""
-        return self.chat.send_message(message)
+        return self._send(message)
+
+
+class AgentPool:
+    """
+    Agents reused across audits instead of being built per audit.
+
+    acquire() hands out an idle agent with a fresh chat, creating one only
+    while fewer than `size` exist, and otherwise waits for a release. All
+    agents share the process-wide model, so a reused agent costs nothing
+    to set up. warm_up() creates and configures them ahead of the first
+    audit. Safe to share between threads.
+    """
+
+    def __init__(self, size: int = 4, factory: Optional[Callable[[], AnalystAgent]] = None,
+                 cache: Optional[ResponseCache] = None, max_turns: int = MAX_TURNS):
+        self.size = size
+        self._factory = factory or (lambda: AnalystAgent(cache=cache, max_turns=max_turns))
+        self._idle: "queue.LifoQueue[AnalystAgent]" = queue.LifoQueue()  # Most recently used first
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, timeout: Optional[float] = None) -> AnalystAgent:
+        try:
+            agent = self._idle.get_nowait()
+            with self._lock:
+                self.reused += 1
+        except queue.Empty:
+            with self._lock:
+                create = self.created < self.size
+                if create:
+                    self.created += 1
+            if create:
+                agent = self._factory()
+            else:
+                try:
+                    agent = self._idle.get(timeout=timeout)
+                except queue.Empty:
+                    raise TimeoutError(f"No agent became free within {timeout}s") from None
+                with self._lock:
+                    self.reused += 1
+        agent.reset()
+        return agent
+
+    def release(self, agent: AnalystAgent) -> None:
+        self._idle.put(agent)
+
+    @contextmanager
+    def agent(self, timeout: Optional[float] = None) -> Iterator[AnalystAgent]:
+        agent = self.acquire(timeout)
+        try:
+            yield agent
+        finally:
+            self.release(agent)
+
+    def warm_up(self, count: Optional[int] = None) -> None:
+        """Create agents until `count` (default: `size`) exist and build their model."""
+        with self._lock:
+            missing = max(0, min(count or self.size, self.size) - self.created)
+            self.created += missing
+        for _ in range(missing):
+            agent = self._factory()
+            if hasattr(agent, "warm_up"):
+                agent.warm_up()
+            self._idle.put(agent)
+
+    def stats(self) -> dict:
+        return {"agents_created": self.created, "agents_reused": self.reused}
+
+
+@lru_cache(maxsize=1)
+def default_pool() -> AgentPool:
+    """The pool run_vouch_vault borrows from when no analyst is passed in."""
+    return AgentPool()
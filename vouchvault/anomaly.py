@@ -0,0 +1,190 @@
+"""Near-duplicate and vendor-outlier checks over past invoices, in constant time per invoice."""
+import math
+import threading
+from dataclasses import dataclass, field
+from datetime import date as Date, datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .invoice import Invoice
+from .memory import AuditRecord, normalize_vendor
+
+AMOUNT_TOLERANCE = 0.01  # Amounts within 1% of each other count as near-identical
+DATE_WINDOW = 7          # Days either side of the invoice date searched for near-duplicates
+OUTLIER_Z = 3.0          # Standard deviations from a vendor's norm that make an outlier
+MIN_HISTORY = 5          # Invoices from a vendor before its statistics are trusted
+HORIZON_DAYS = 400       # Past invoices older than this are dropped from the near-duplicate buckets
+NEAR_DUPLICATE, AMOUNT_OUTLIER, CADENCE_OUTLIER = "near_duplicate", "amount_outlier", "cadence_outlier"
+
+
+@dataclass(slots=True)
+class RunningStats:
+    """Mean and standard deviation updated one value at a time (Welford's method)."""
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def zscore(self, value: float, floor: float = 0.0) -> float:
+        """Distance from the mean in standard deviations of at least `floor` (0 when both are 0)."""
+        stddev = max(self.stddev, floor)
+        return (value - self.mean) / stddev if stddev else 0.0
+
+
+@dataclass(slots=True)
+class VendorProfile:
+    """Rolling statistics for one vendor: invoice amounts and days between invoices."""
+    amounts: RunningStats = field(default_factory=RunningStats)
+    gaps: RunningStats = field(default_factory=RunningStats)
+    last_day: Optional[int] = None  # Latest invoice date seen, as a date ordinal
+
+
+class Anomaly(NamedTuple):
+    """Something unusual about an invoice, given the vendor's history."""
+    kind: str                      # NEAR_DUPLICATE, AMOUNT_OUTLIER or CADENCE_OUTLIER
+    reason: str
+    related: Optional[str] = None  # The earlier invoice it resembles, for near-duplicates
+
+
+def _day(iso_date: Optional[str], default: Optional[int] = None) -> int:
+    if iso_date:
+        try:
+            return Date.fromisoformat(iso_date).toordinal()
+        except ValueError:
+            pass
+    return default if default is not None else Date.today().toordinal()
+
+
+class AnomalyIndex:
+    """
+    Indexed history of past invoices for fraud-style checks.
+
+    Invoices are bucketed by normalized vendor, a log-scaled amount band
+    `amount_tolerance` wide and a `date_window`-day window, so a
+    near-duplicate (same vendor, near-identical amount, close date, other
+    invoice number) is found by looking in the nine neighbouring buckets
+    instead of scanning the history. Per-vendor mean and spread of amounts
+    and of days between invoices are updated incrementally and flag
+    outliers once a vendor has `min_history` invoices. Buckets older than
+    `horizon_days` are dropped, so memory follows the recent invoice volume.
+    Safe to share between threads.
+    """
+
+    def __init__(self, amount_tolerance: float = AMOUNT_TOLERANCE, date_window: int = DATE_WINDOW,
+                 z_limit: float = OUTLIER_Z, min_history: int = MIN_HISTORY, horizon_days: int = HORIZON_DAYS):
+        self.amount_tolerance = amount_tolerance
+        self.date_window = date_window
+        self.z_limit = z_limit
+        self.min_history = min_history
+        self.horizon_days = horizon_days
+        self.profiles: Dict[str, VendorProfile] = {}
+        # window -> (vendor key, amount band) -> [(invoice_id, amount, day)]
+        self._windows: Dict[int, Dict[Tuple[str, int], List[Tuple[str, float, int]]]] = {}
+        self._latest_day: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_records(cls, records: Iterable[AuditRecord], **options) -> "AnomalyIndex":
+        """Seed an index from audit memory (e.g. SQLiteAuditMemory.iter_records())."""
+        index = cls(**options)
+        for record in records:
+            index.add_record(record)
+        return index
+
+    def _band(self, amount: float) -> int:
+        return math.floor(math.log(amount) / math.log1p(self.amount_tolerance))
+
+    def profile(self, vendor: str) -> Optional[VendorProfile]:
+        return self.profiles.get(normalize_vendor(vendor))
+
+    def check(self, invoice: Invoice) -> List[Anomaly]:
+        """Anomalies of `invoice` against the history, without adding it."""
+        if not invoice.vendor or not invoice.total or invoice.total <= 0:
+            return []
+        with self._lock:
+            return self._check(invoice.invoice_id, normalize_vendor(invoice.vendor), invoice.total,
+                               _day(invoice.date), invoice.vendor)
+
+    def add(self, invoice: Invoice) -> None:
+        """Add an invoice to the history."""
+        if not invoice.vendor or not invoice.total or invoice.total <= 0:
+            return
+        with self._lock:
+            self._add(invoice.invoice_id or "", normalize_vendor(invoice.vendor), invoice.total, _day(invoice.date))
+
+    def observe(self, invoice: Invoice) -> List[Anomaly]:
+        """Check an invoice, then add it, as one step (so concurrent twins still catch each other)."""
+        if not invoice.vendor or not invoice.total or invoice.total <= 0:
+            return []
+        key, day = normalize_vendor(invoice.vendor), _day(invoice.date)
+        with self._lock:
+            anomalies = self._check(invoice.invoice_id, key, invoice.total, day, invoice.vendor)
+            self._add(invoice.invoice_id or "", key, invoice.total, day)
+        return anomalies
+
+    def add_record(self, record: AuditRecord) -> None:
+        """Add a past audit; records without an invoice date fall back to the audit date."""
+        if record.amount <= 0:
+            return
+        day = _day(record.invoice_date, datetime.fromtimestamp(record.timestamp).toordinal())
+        with self._lock:
+            self._add(record.invoice_id, normalize_vendor(record.vendor), record.amount, day)
+
+    def _check(self, invoice_id: Optional[str], key: str, amount: float, day: int, vendor: str) -> List[Anomaly]:
+        anomalies = []
+        band, window = self._band(amount), day // self.date_window
+        for w in (window - 1, window, window + 1):
+            buckets = self._windows.get(w)
+            if buckets is None:
+                continue
+            for b in (band - 1, band, band + 1):
+                for other_id, other_amount, other_day in buckets.get((key, b), ()):
+                    if (other_id != invoice_id and abs(other_day - day) <= self.date_window
+                            and abs(other_amount - amount) <= self.amount_tolerance * max(amount, other_amount)):
+                        anomalies.append(Anomaly(
+                            NEAR_DUPLICATE,
+                            f"Near-duplicate of {other_id}: {vendor}, {amount:.2f} vs {other_amount:.2f}, "
+                            f"{abs(other_day - day)} days apart", related=other_id))
+
+        profile = self.profiles.get(key)
+        if profile is None or profile.amounts.count < self.min_history:
+            return anomalies
+        z = profile.amounts.zscore(amount, floor=self.amount_tolerance * profile.amounts.mean)
+        if abs(z) > self.z_limit:
+            anomalies.append(Anomaly(
+                AMOUNT_OUTLIER, f"Amount {amount:.2f} is {abs(z):.1f} standard deviations "
+                                f"{'above' if z > 0 else 'below'} {vendor}'s mean of {profile.amounts.mean:.2f}"))
+        if profile.last_day is not None and day >= profile.last_day and profile.gaps.count >= self.min_history - 1:
+            gap = day - profile.last_day
+            if profile.gaps.zscore(gap, floor=1.0) < -self.z_limit:
+                anomalies.append(Anomaly(
+                    CADENCE_OUTLIER, f"Invoiced {gap} days after the previous one; {vendor} usually invoices "
+                                     f"every {profile.gaps.mean:.0f} days"))
+        return anomalies
+
+    def _add(self, invoice_id: str, key: str, amount: float, day: int) -> None:
+        profile = self.profiles.setdefault(key, VendorProfile())
+        profile.amounts.add(amount)
+        if profile.last_day is not None and day >= profile.last_day:
+            profile.gaps.add(day - profile.last_day)
+        if profile.last_day is None or day > profile.last_day:
+            profile.last_day = day
+
+        window = day // self.date_window
+        if self._latest_day is not None and day < self._latest_day - self.horizon_days:
+            return  # Too old to be anyone's near-duplicate
+        buckets = self._windows.setdefault(window, {})
+        buckets.setdefault((key, self._band(amount)), []).append((invoice_id, amount, day))
+        if self._latest_day is None or day > self._latest_day:
+            self._latest_day = day
+            oldest = (day - self.horizon_days) // self.date_window
+            for stale in [w for w in self._windows if w < oldest]:
+                del self._windows[stale]
@@ -0,0 +1,234 @@
+"""
+Model backends behind AnalystAgent: live Gemini, record to disk, replay from disk.
+
+A backend is anything with `start_chat(history, enable_automatic_function_calling)`
+returning a chat whose `send_message(message)` returns a response with
+`.text`, which is the shape of google.generativeai.GenerativeModel.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, Optional, Protocol
+
+from .cache import ResponseCache
+from .config import MODEL_NAME
+
+LIVE, RECORD, REPLAY = "live", "record", "replay"
+MODES = (LIVE, RECORD, REPLAY)
+
+
+class ModelBackend(Protocol):
+    def start_chat(self, history: Optional[List[dict]] = None, enable_automatic_function_calling: bool = False):
+        ...
+
+
+class ReplayMiss(LookupError):
+    """A replayed conversation reached a message that was never recorded."""
+
+
+class RecordedResponse:
+    """Stands in for a Gemini response served from a recording."""
+    replayed = True
+
+    def __init__(self, text: str, function_calls: Optional[List[dict]] = None):
+        self.text = text
+        self.function_calls = function_calls or []
+
+
+def conversation_key(messages: List[str]) -> str:
+    """Key of a conversation: the same hash the response cache uses."""
+    from .analyst import TOOLS
+    return ResponseCache.key(MODEL_NAME, [tool.__name__ for tool in TOOLS], messages)
+
+
+def _user_messages(history: Optional[List[dict]]) -> List[str]:
+    return [entry["parts"][0] for entry in history or () if entry.get("role") == "user"]
+
+
+def _plain(value: Any) -> Any:
+    """SDK proto values (maps, repeated fields) as JSON-ready Python values."""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if hasattr(value, "items"):
+        return {str(k): _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)) or hasattr(value, "__iter__"):
+        return [_plain(v) for v in value]
+    return str(value)
+
+
+def _function_calls(contents) -> List[dict]:
+    """Tool calls and their results from the chat turns added by one automatic-function-calling exchange."""
+    calls = []
+    for content in contents:
+        for part in getattr(content, "parts", ()):
+            call = getattr(part, "function_call", None)
+            if call is not None and getattr(call, "name", ""):
+                calls.append({"name": call.name, "args": _plain(call.args)})
+            result = getattr(part, "function_response", None)
+            if result is not None and getattr(result, "name", ""):
+                calls.append({"name": result.name, "response": _plain(result.response)})
+    return calls
+
+
+class RecordingStore:
+    """
+    Request/response pairs in a JSON-lines file, one exchange per line.
+
+    Each line holds the conversation key, the full list of user messages,
+    the response text, any tool calls the model made, and the latency.
+    Lines are appended and flushed as exchanges happen, so a crashed run
+    keeps what it recorded. Safe to share between threads.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._entries: Dict[str, Deque[dict]] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries.setdefault(entry["key"], deque()).append(entry)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+    def __iter__(self) -> Iterator[dict]:
+        for entries in list(self._entries.values()):
+            yield from list(entries)
+
+    def add(self, messages: List[str], text: str, function_calls: List[dict], latency: float) -> None:
+        entry = {"key": conversation_key(messages), "messages": messages, "text": text,
+                 "function_calls": function_calls, "latency": round(latency, 6), "recorded_at": int(time.time())}
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+            self._entries.setdefault(entry["key"], deque()).append(entry)
+
+    def take(self, messages: List[str]) -> Optional[dict]:
+        """
+        The recorded exchange for this conversation, or None.
+
+        A conversation recorded more than once is served in recorded order,
+        then the last recording repeats.
+        """
+        with self._lock:
+            entries = self._entries.get(conversation_key(messages))
+            if not entries:
+                return None
+            return entries.popleft() if len(entries) > 1 else entries[0]
+
+
+class GeminiBackend:
+    """The live model, shared by every agent in the process and built on first use."""
+
+    @property
+    def model(self):
+        from .analyst import _shared_model
+        return _shared_model()
+
+    def warm_up(self) -> None:
+        self.model
+
+    def start_chat(self, history: Optional[List[dict]] = None, enable_automatic_function_calling: bool = False):
+        return self.model.start_chat(history=history or [],
+                                     enable_automatic_function_calling=enable_automatic_function_calling)
+
+
+class _RecordingChat:
+    def __init__(self, chat, store: RecordingStore, messages: List[str]):
+        self._chat = chat
+        self._store = store
+        self._messages = messages
+
+    def send_message(self, message: str):
+        seen = len(getattr(self._chat, "history", ()) or ())
+        start = time.perf_counter()
+        response = self._chat.send_message(message)
+        latency = time.perf_counter() - start
+        added = list(getattr(self._chat, "history", ()) or ())[seen:]
+        self._messages.append(message)
+        self._store.add(list(self._messages), response.text, _function_calls(added), latency)
+        return response
+
+
+class RecordingBackend:
+    """
+    Passes every message to `backend` (live Gemini by default) and saves each exchange to `store`.
+
+    Replies an agent answers from its ResponseCache never reach the
+    backend; the agent hands them to record_cached instead, so a recording
+    made against a warm cache is still complete.
+    """
+
+    def __init__(self, store: RecordingStore, backend: Optional[ModelBackend] = None):
+        self.store = store
+        self.backend = backend if backend is not None else GeminiBackend()
+
+    def warm_up(self) -> None:
+        if hasattr(self.backend, "warm_up"):
+            self.backend.warm_up()
+
+    def record_cached(self, messages: List[str], text: str) -> None:
+        """Save an exchange answered from the response cache (no tool calls, no latency)."""
+        self.store.add(list(messages), text, [], 0.0)
+
+    def start_chat(self, history: Optional[List[dict]] = None, enable_automatic_function_calling: bool = False):
+        chat = self.backend.start_chat(history=history,
+                                       enable_automatic_function_calling=enable_automatic_function_calling)
+        return _RecordingChat(chat, self.store, _user_messages(history))
+
+
+class _ReplayChat:
+    def __init__(self, backend: "ReplayBackend", messages: List[str]):
+        self._backend = backend
+        self._messages = messages
+
+    def send_message(self, message: str):
+        self._messages.append(message)
+        entry = self._backend.store.take(self._messages)
+        if entry is None:
+            raise ReplayMiss(f"No recording for message {len(self._messages)} of this conversation: "
+                             f"{' '.join(message.split())[:80]!r}")
+        delay = entry["latency"] * self._backend.speed if self._backend.latency is None else self._backend.latency
+        if delay > 0:
+            time.sleep(delay)
+        return RecordedResponse(entry["text"], entry.get("function_calls"))
+
+
+class ReplayBackend:
+    """
+    Serves recorded exchanges back without the network or an API key.
+
+    Each reply waits `latency` seconds, or with `latency=None` the recorded
+    latency scaled by `speed` (1.0 reproduces the original timing). A
+    message with no recording raises ReplayMiss, which the manager reports
+    as an ERROR audit. Agents neither read nor fill the response cache in
+    front of it, so every reply comes from the recording.
+    """
+
+    cacheable = False
+
+    def __init__(self, store: RecordingStore, latency: Optional[float] = 0.0, speed: float = 1.0):
+        self.store = store
+        self.latency = latency
+        self.speed = speed
+
+    def start_chat(self, history: Optional[List[dict]] = None, enable_automatic_function_calling: bool = False):
+        return _ReplayChat(self, _user_messages(history))
+
+
+def make_backend(mode: str = LIVE, recordings: Optional[str] = None,
+                 latency: Optional[float] = 0.0) -> ModelBackend:
+    """The backend for a mode name ("live", "record" or "replay"); the last two need `recordings`."""
+    if mode == LIVE:
+        return GeminiBackend()
+    if mode not in MODES:
+        raise ValueError(f"Unknown model mode {mode!r}; expected one of {', '.join(MODES)}")
+    if not recordings:
+        raise ValueError(f"Model mode {mode!r} needs a recordings file")
+    store = RecordingStore(recordings)
+    return RecordingBackend(store) if mode == RECORD else ReplayBackend(store, latency=latency)
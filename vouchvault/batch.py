@@ -0,0 +1,280 @@
+"""Batch auditing of many invoices against one parsed bank statement."""
+import glob
+import os
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .analyst import AnalystAgent
+from .anomaly import AnomalyIndex
+from .evaluation import AuditEvaluator, AuditMetrics
+from .invoice import parse_invoice
+from .manager import run_vouch_vault
+from .memory import AuditMemory, AuditStore
+from .ratelimit import LimitedAnalyst, TokenBucket
+from .rules import RuleDecision, precheck
+from .shared import SharedStatement, attach_statement
+from .statement import BankStatement
+
+SHARD_SIZE = 32  # Invoices per task sent to a worker process
+
+
+@dataclass
+class BatchResult:
+    """Outcome of auditing one invoice in a batch."""
+    source: str
+    metrics: Optional[AuditMetrics] = None
+    error: Optional[str] = None
+
+    @property
+    def status(self) -> str:
+        if self.metrics is not None:
+            return self.metrics.status
+        return "ERROR"
+
+
+def find_invoice_files(pattern: str) -> List[str]:
+    """Expand a directory or glob pattern into a sorted list of invoice files."""
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "*.txt")
+    return sorted(p for p in glob.glob(pattern) if os.path.isfile(p))
+
+
+def run_batch(
+    invoices: Iterable[Tuple[str, Optional[str]]],
+    bank_data: Union[str, BankStatement],
+    memory: Optional[AuditStore] = None,
+    evaluator: Optional[AuditEvaluator] = None,
+    analyst: Optional[AnalystAgent] = None,
+    verbose: bool = False,
+    history: Optional[AnomalyIndex] = None,
+) -> Iterator[BatchResult]:
+    """
+    Audit (source, invoice_text) pairs against one bank statement.
+
+    The statement is parsed once and the memory, evaluator and analyst are
+    shared across the run. Results are yielded as each invoice finishes.
+    An invoice text of None marks a source that could not be read.
+    A shared `history` flags near-duplicates across the batch and beyond.
+    """
+    statement = bank_data if isinstance(bank_data, BankStatement) else BankStatement(bank_data)
+    memory = memory if memory is not None else AuditMemory()
+    evaluator = evaluator if evaluator is not None else AuditEvaluator()
+
+    for source, invoice_data in invoices:
+        if invoice_data is None:
+            yield BatchResult(source=source, error="Could not read invoice")
+            continue
+        if analyst is None:
+            analyst = AnalystAgent()
+        try:
+            metrics = run_vouch_vault(
+                invoice_data, statement,
+                memory=memory, evaluator=evaluator, analyst=analyst, verbose=verbose, history=history,
+            )
+        except ValueError as e:
+            yield BatchResult(source=source, error=str(e))
+            continue
+        yield BatchResult(source=source, metrics=metrics)
+
+
+def run_batch_concurrent(
+    invoices: Iterable[Tuple[str, Optional[str]]],
+    bank_data: Union[str, BankStatement],
+    workers: int = 4,
+    rate: Optional[float] = None,
+    burst: Optional[float] = None,
+    timeout: Optional[float] = None,
+    memory: Optional[AuditStore] = None,
+    evaluator: Optional[AuditEvaluator] = None,
+    analyst_factory: Callable[[], AnalystAgent] = AnalystAgent,
+    verbose: bool = False,
+    history: Optional[AnomalyIndex] = None,
+) -> Iterator[BatchResult]:
+    """
+    Audit invoices with up to `workers` in flight at once.
+
+    Each worker thread owns one analyst from `analyst_factory`. All model
+    calls share a token bucket of `rate` calls per second (bursts of up to
+    `burst`), back off on
+    quota errors, and give up once an audit has run for `timeout` seconds
+    (reported as status ERROR), even in the middle of a model call that
+    never returns. At most 2 x `workers` invoices are read
+    ahead, and results are yielded in completion order.
+    """
+    statement = bank_data if isinstance(bank_data, BankStatement) else BankStatement(bank_data)
+    memory = memory if memory is not None else AuditMemory()
+    evaluator = evaluator if evaluator is not None else AuditEvaluator()
+    limiter = TokenBucket(rate, burst) if rate else None
+    local = threading.local()
+
+    def audit(source: str, invoice_data: Optional[str]) -> BatchResult:
+        if invoice_data is None:
+            return BatchResult(source=source, error="Could not read invoice")
+        if not hasattr(local, "analyst"):
+            local.analyst = LimitedAnalyst(analyst_factory(), limiter, timeout)
+        try:
+            metrics = run_vouch_vault(
+                invoice_data, statement,
+                memory=memory, evaluator=evaluator, analyst=local.analyst, verbose=verbose, history=history,
+            )
+        except ValueError as e:
+            return BatchResult(source=source, error=str(e))
+        return BatchResult(source=source, metrics=metrics)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for source, invoice_data in invoices:
+            pending.add(pool.submit(audit, source, invoice_data))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+_worker_statement: Optional[BankStatement] = None
+
+
+def _attach_worker(path: str) -> None:
+    global _worker_statement
+    _worker_statement = attach_statement(path)
+
+
+def _precheck_shard(shard: List[Tuple[str, Optional[str]]]) -> List[Optional[RuleDecision]]:
+    """Run the pre-checks for one shard inside a worker process."""
+    decisions = []
+    for _, invoice_data in shard:
+        if not invoice_data or not invoice_data.strip():
+            decisions.append(None)
+            continue
+        decisions.append(precheck(parse_invoice(invoice_data), _worker_statement))
+    return decisions
+
+
+_CRASHED = object()  # Decision slot for an invoice that crashes a worker on its own
+
+
+def _lost(future: Future) -> bool:
+    """Whether a shard's future went down with a broken pool and needs resubmitting."""
+    return not future.done() or future.cancelled() or future.exception() is not None
+
+
+def run_batch_processes(
+    invoices: Iterable[Tuple[str, Optional[str]]],
+    bank_data: Union[str, BankStatement],
+    processes: Optional[int] = None,
+    shard_size: int = SHARD_SIZE,
+    memory: Optional[AuditStore] = None,
+    evaluator: Optional[AuditEvaluator] = None,
+    analyst: Optional[AnalystAgent] = None,
+    verbose: bool = False,
+    history: Optional[AnomalyIndex] = None,
+) -> Iterator[BatchResult]:
+    """
+    Run the CPU-bound pre-checks on a pool of `processes` worker processes.
+
+    Invoices are sharded `shard_size` at a time. Workers memory-map the
+    statement from a SharedStatement instead of unpickling a copy per task.
+    Results are yielded in input order. Invoices the rules cannot settle
+    go to the shared analyst in this process. If a worker dies, the pool
+    is restarted, the shard at the head is retried on its own, and only
+    the queued shards that went down with the pool are resubmitted. A
+    shard that crashes again is retried one invoice at a time, so only an
+    invoice that crashes a worker by itself is reported as ERROR and the
+    rest of the batch carries on.
+    """
+    statement = bank_data if isinstance(bank_data, BankStatement) else BankStatement(bank_data)
+    memory = memory if memory is not None else AuditMemory()
+    evaluator = evaluator if evaluator is not None else AuditEvaluator()
+    processes = processes or os.cpu_count() or 1
+    invoices = iter(invoices)
+
+    with SharedStatement(statement) as shared:
+        def new_pool() -> ProcessPoolExecutor:
+            return ProcessPoolExecutor(processes, initializer=_attach_worker, initargs=(shared.path,))
+
+        pool = new_pool()
+        pending = deque()
+
+        def submit(shard) -> Future:
+            try:
+                return pool.submit(_precheck_shard, shard)
+            except BrokenProcessPool as e:
+                # The pool died before this shard was queued; finish() recovers
+                future = Future()
+                future.set_exception(e)
+                return future
+
+        def restart() -> None:
+            nonlocal pool
+            pool.shutdown(wait=False, cancel_futures=True)
+            pool = new_pool()
+
+        def rerun(shard) -> Optional[List[Optional[RuleDecision]]]:
+            try:
+                return pool.submit(_precheck_shard, shard).result()
+            except BrokenProcessPool:
+                restart()
+                return None
+
+        def finish(shard, future) -> List[BatchResult]:
+            try:
+                decisions = future.result()
+            except BrokenProcessPool:
+                restart()
+                decisions = rerun(shard)
+                if decisions is None:
+                    singles = [rerun([item]) for item in shard] if len(shard) > 1 else [None]
+                    decisions = [_CRASHED if single is None else single[0] for single in singles]
+                for i, (other, other_future) in enumerate(pending):
+                    if _lost(other_future):
+                        pending[i] = (other, submit(other))
+            return [BatchResult(source=source, error="Worker process crashed") if decision is _CRASHED
+                    else audit(source, invoice_data, decision)
+                    for (source, invoice_data), decision in zip(shard, decisions)]
+
+        def audit(source: str, invoice_data: Optional[str], decision: Optional[RuleDecision]) -> BatchResult:
+            nonlocal analyst
+            if invoice_data is None:
+                return BatchResult(source=source, error="Could not read invoice")
+            if analyst is None and (decision is None or not decision.decided):
+                analyst = AnalystAgent()
+            try:
+                metrics = run_vouch_vault(
+                    invoice_data, statement, memory=memory, evaluator=evaluator,
+                    analyst=analyst, verbose=verbose, decision=decision, history=history,
+                )
+            except ValueError as e:
+                return BatchResult(source=source, error=str(e))
+            return BatchResult(source=source, metrics=metrics)
+
+        try:
+            while True:
+                shard = list(islice(invoices, shard_size))
+                if not shard:
+                    break
+                pending.append((shard, submit(shard)))
+                if len(pending) >= 2 * processes:
+                    yield from finish(*pending.popleft())
+            while pending:
+                yield from finish(*pending.popleft())
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+def read_invoices(paths: Iterable[str]) -> Iterator[Tuple[str, Optional[str]]]:
+    """Lazily yield (path, content) pairs; unreadable files yield None content."""
+    for path in paths:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                yield path, f.read()
+        except (OSError, UnicodeDecodeError):
+            yield path, None
@@ -0,0 +1,138 @@
+"""Content-addressed cache of model responses (in-memory LRU plus optional SQLite tier)."""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Sequence, Tuple
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace so re-indented but identical prompts share a key."""
+    return " ".join(prompt.split())
+
+
+class CachedResponse:
+    """Stands in for a Gemini response when the text comes from the cache."""
+    cached = True
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class ResponseCache:
+    """
+    Model responses keyed by a hash of the model name, tool set and the
+    normalized conversation up to and including the new message.
+
+    Lookups check the in-memory LRU tier first, then the on-disk tier when
+    `path` is given. Entries older than `ttl_seconds` are ignored and
+    removed; each tier evicts its least recently used entries beyond its
+    size limit. Safe to share between threads.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 1024,
+                 max_disk_entries: int = 100_000, ttl_seconds: Optional[float] = 7 * 24 * 3600):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        if path is not None:
+            self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            with self._conn:
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    "key TEXT PRIMARY KEY, text TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+                )
+                self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+            self._expire()
+
+    @staticmethod
+    def key(model_name: str, tools: Sequence[str], messages: Sequence[str]) -> str:
+        payload = json.dumps([model_name, sorted(tools), [normalize_prompt(m) for m in messages]])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _fresh(self, created: float) -> bool:
+        return self.ttl_seconds is None or time.time() - created <= self.ttl_seconds
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached text for `key`, or None. Counts a hit or a miss."""
+        with self._lock:
+            return self._get(key)
+
+    def _get(self, key: str) -> Optional[str]:
+        entry = self._memory.get(key)
+        if entry is not None and self._fresh(entry[1]):
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        self._memory.pop(key, None)
+
+        if self._conn is not None:
+            row = self._conn.execute("SELECT text, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self._fresh(row[1]):
+                with self._conn:
+                    self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key))
+                self._remember(key, row[0], row[1])
+                self.hits += 1
+                return row[0]
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, text: str) -> None:
+        """Store a response in both tiers."""
+        with self._lock:
+            self._put(key, text)
+
+    def _put(self, key: str, text: str) -> None:
+        now = time.time()
+        self._remember(key, text, now)
+        if self._conn is not None:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, text, created, accessed) VALUES (?, ?, ?, ?)",
+                    (key, text, now, now))
+            self._puts += 1
+            if self._puts % 100 == 0:
+                self._evict()
+
+    def _evict(self) -> None:
+        with self._conn:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_disk_entries,))
+
+    def _remember(self, key: str, text: str, created: float) -> None:
+        self._memory[key] = (text, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _expire(self) -> None:
+        if self.ttl_seconds is not None:
+            with self._conn:
+                self._conn.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl_seconds,))
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "cache_hits": self.hits,
+            "cache_misses": self.misses,
+            "cache_hit_rate": f"{(self.hits / lookups) * 100:.1f}%" if lookups else "0.0%",
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._evict()
+                self._conn.close()
+                self._conn = None
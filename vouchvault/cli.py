@@ -1,8 +1,139 @@
 import sys
 import io
 import argparse
-from .manager import run_vouch_vault
-from .config import INVOICE_DATA, BANK_STATEMENT_CSV
+from . import config
+
+# The audit modules (and NumPy) are imported only once a command runs, so
+# --help and argument errors return without loading them.
+
+
+def _read_file(path: str) -> str:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        print(f"Error: File not found: {path}")
+        sys.exit(1)
+    except PermissionError:
+        print(f"Error: Permission denied: {path}")
+        sys.exit(1)
+
+
+def _read_statement(path: str):
+    from .statement import load_bank_statement
+    try:
+        return load_bank_statement(path)
+    except FileNotFoundError:
+        print(f"Error: File not found: {path}")
+        sys.exit(1)
+    except PermissionError:
+        print(f"Error: Permission denied: {path}")
+        sys.exit(1)
+
+
+def _backend(args: argparse.Namespace):
+    from .backends import make_backend
+    try:
+        latency = None if args.replay_latency < 0 else args.replay_latency
+        return make_backend(args.model_mode, args.recordings, latency=latency)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+def _run_batch_command(args: argparse.Namespace) -> None:
+    from .analyst import AnalystAgent
+    from .anomaly import AnomalyIndex
+    from .batch import find_invoice_files, read_invoices, run_batch, run_batch_concurrent, run_batch_processes
+    from .cache import ResponseCache
+    from .evaluation import AuditEvaluator
+    from .memory import SQLiteAuditMemory
+    from .report import ReportWriter
+    from .statement import BankStatement
+
+    paths = find_invoice_files(args.invoices)
+    if not paths:
+        print(f"Error: No invoice files found for: {args.invoices}")
+        sys.exit(1)
+
+    statement = _read_statement(args.bank_csv) if args.bank_csv else BankStatement(config.BANK_STATEMENT_CSV)
+    backend = _backend(args)
+    cache = ResponseCache(args.cache_db)
+    sink = open(args.metrics_jsonl, 'a', encoding='utf-8') if args.metrics_jsonl else None
+    evaluator = AuditEvaluator(cache=cache, sink=sink)
+    report = ReportWriter(args.report, append=args.append_report) if args.report else None
+    print(f"📦 [Batch] Auditing {len(paths)} invoices against {len(statement)} transactions...")
+
+    with SQLiteAuditMemory(args.memory_db) as memory:
+        history = AnomalyIndex.from_records(memory.iter_records()) if args.history else None
+        if args.processes > 1:
+            results = run_batch_processes(
+                read_invoices(paths), statement, processes=args.processes, memory=memory,
+                evaluator=evaluator, analyst=AnalystAgent(cache=cache, model=backend), verbose=args.verbose,
+                history=history)
+        elif args.workers > 1 or args.rate or args.timeout:
+            results = run_batch_concurrent(
+                read_invoices(paths), statement, workers=args.workers, rate=args.rate, timeout=args.timeout,
+                memory=memory, evaluator=evaluator, analyst_factory=lambda: AnalystAgent(cache=cache, model=backend),
+                verbose=args.verbose, history=history)
+        else:
+            results = run_batch(read_invoices(paths), statement, memory=memory, evaluator=evaluator,
+                                analyst=AnalystAgent(cache=cache, model=backend), verbose=args.verbose,
+                                history=history)
+        for result in results:
+            detail = f" ({result.error})" if result.error else ""
+            print(f"{result.status:<7} {result.source}{detail}")
+            for reason in result.metrics.anomalies if result.metrics is not None else ():
+                print(f"        🚩 {reason}")
+            if report is not None:
+                report.add(result.metrics, source=result.source, error=result.error)
+    if report is not None:
+        report.close()
+        print(f"📄 [Batch] Report: {report.rows_written} audits written to {report.path}")
+    cache.close()
+    if sink is not None:
+        sink.close()
+    if args.prometheus:
+        with open(args.prometheus, 'w', encoding='utf-8') as f:
+            f.write(evaluator.to_prometheus())
+
+    print("\n📊 [Batch Summary]")
+    for key, value in evaluator.get_summary().items():
+        print(f"   {key}: {value}")
+
+
+def _run_reconcile_command(args: argparse.Namespace) -> None:
+    from .batch import find_invoice_files, read_invoices
+    from .invoice import parse_invoice
+    from .memory import SQLiteAuditMemory
+    from .reconcile import Reconciler, record_match, tail_csv
+
+    reconciler = Reconciler.load(args.state, due_days=args.due_days)
+    with SQLiteAuditMemory(args.memory_db) as memory:
+        # Settled invoices leave the open set; audit memory stops them being reopened
+        opened = 0
+        paths = find_invoice_files(args.invoices) if args.invoices else []
+        for path, text in read_invoices(paths):
+            if text is None:
+                continue
+            invoice = parse_invoice(text)
+            if invoice.invoice_id and not memory.has_duplicate(invoice.invoice_id):
+                opened += reconciler.add_invoice(invoice) is not None
+        print(f"🔁 [Reconcile] {len(reconciler)} open invoices ({opened} new); "
+              f"resuming {args.feed} after byte {reconciler.position}...")
+
+        rows = tail_csv(args.feed, reconciler.position, follow=args.follow, poll=args.poll)
+        try:
+            # Matches are flushed to memory before each checkpoint, so a checkpoint never outruns them
+            for event in reconciler.consume(rows, checkpoint=args.state, checkpoint_every=args.checkpoint_every,
+                                            before_save=memory.flush):
+                row = f" <- {event.row['date']} {event.row['description']} {event.row['amount']}" if event.row else ""
+                print(f"{event.kind.upper():<8} {event.invoice_id} outstanding {event.outstanding:.2f}{row}")
+                record_match(memory, event)
+        except KeyboardInterrupt:
+            pass
+    print(f"🔁 [Reconcile] {len(reconciler)} invoices still open after {reconciler.rows_seen} rows.")
+
 
 def run_cli() -> None:
     # Force UTF-8 output for Windows consoles
@@ -11,32 +142,76 @@ def run_cli() -> None:
     parser = argparse.ArgumentParser(description="VouchVault: Autonomous Enterprise Audit Agent")
     parser.add_argument("--invoice_path", help="Path to the invoice text file")
     parser.add_argument("--bank_csv", help="Path to the bank statement CSV file")
+    parser.add_argument("--memory_db", default=config.MEMORY_DB, help="SQLite file holding audit history (':memory:' to disable)")
+    parser.add_argument("--cache_db", default=config.RESPONSE_CACHE_DB, help="SQLite file caching model responses (':memory:' to disable)")
+    parser.add_argument("--pause", type=float, default=0.0, help="Cosmetic delay in seconds before each audit cycle (demos)")
+    parser.add_argument("--model_mode", choices=("live", "record", "replay"), default=config.MODEL_MODE,
+                        help="Call Gemini, call it and save every exchange, or serve saved exchanges offline")
+    parser.add_argument("--recordings", default=config.RECORDINGS, help="JSON-lines file of recorded exchanges")
+    parser.add_argument("--replay_latency", type=float, default=0.0,
+                        help="Seconds per replayed reply (-1 reproduces the recorded latency)")
+    subparsers = parser.add_subparsers(dest="command")
+
+    batch_parser = subparsers.add_parser("batch", help="Audit many invoices against one bank statement")
+    batch_parser.add_argument("invoices", help="Directory of invoice .txt files or a glob pattern")
+    batch_parser.add_argument("--bank_csv", default=argparse.SUPPRESS, help="Path to the bank statement CSV file")
+    batch_parser.add_argument("--memory_db", default=argparse.SUPPRESS, help="SQLite file holding audit history")
+    batch_parser.add_argument("--cache_db", default=argparse.SUPPRESS, help="SQLite file caching model responses")
+    batch_parser.add_argument("--model_mode", choices=("live", "record", "replay"), default=argparse.SUPPRESS,
+                              help="Call Gemini, call it and save every exchange, or serve saved exchanges offline")
+    batch_parser.add_argument("--recordings", default=argparse.SUPPRESS, help="JSON-lines file of recorded exchanges")
+    batch_parser.add_argument("--replay_latency", type=float, default=argparse.SUPPRESS,
+                              help="Seconds per replayed reply (-1 reproduces the recorded latency)")
+    batch_parser.add_argument("--workers", type=int, default=1, help="Audits to keep in flight at once")
+    batch_parser.add_argument("--processes", type=int, default=1,
+                              help="Worker processes for the local pre-checks (model calls stay in this process)")
+    batch_parser.add_argument("--rate", type=float, help="Maximum model calls per second across all workers")
+    batch_parser.add_argument("--timeout", type=float, help="Seconds before an audit is abandoned as ERROR")
+    batch_parser.add_argument("--metrics_jsonl", help="Append one JSON line of metrics per audit to this file")
+    batch_parser.add_argument("--prometheus", help="Write counters and latency quantiles in Prometheus text format")
+    batch_parser.add_argument("--report", help="Write one row per audit to this .parquet, .arrow or .csv file")
+    batch_parser.add_argument("--append_report", action="store_true",
+                              help="Add to an existing --report (a new part file for Parquet/Arrow)")
+    batch_parser.add_argument("--history", action="store_true",
+                              help="Flag near-duplicate invoices and vendor outliers against the audit history")
+    batch_parser.add_argument("--verbose", action="store_true", help="Print the full report for every invoice")
+
+    reconcile_parser = subparsers.add_parser("reconcile", help="Settle open invoices as rows arrive on a bank feed")
+    reconcile_parser.add_argument("invoices", nargs="?", help="Directory or glob of invoices to open")
+    reconcile_parser.add_argument("--memory_db", default=argparse.SUPPRESS, help="SQLite file holding audit history")
+    reconcile_parser.add_argument("--feed", required=True, help="Bank feed CSV (one transaction per line)")
+    reconcile_parser.add_argument("--state", default="vouchvault_reconcile.json",
+                                  help="Checkpoint file holding open invoices and the feed position")
+    reconcile_parser.add_argument("--follow", action="store_true", help="Keep waiting for new rows (like tail -f)")
+    reconcile_parser.add_argument("--poll", type=float, default=1.0, help="Seconds between checks with --follow")
+    reconcile_parser.add_argument("--due_days", type=int, default=30, help="Days after the invoice date it falls due")
+    reconcile_parser.add_argument("--checkpoint_every", type=int, default=1000, help="Quiet rows between checkpoints (rows with events always checkpoint)")
     args = parser.parse_args()
 
+    if args.command == "batch":
+        _run_batch_command(args)
+        return
+    if args.command == "reconcile":
+        _run_reconcile_command(args)
+        return
+
+    from .analyst import AnalystAgent
+    from .cache import ResponseCache
+    from .manager import run_vouch_vault
+    from .memory import SQLiteAuditMemory
+
     # Default to simulated data
-    invoice_content = INVOICE_DATA
-    bank_content = BANK_STATEMENT_CSV
+    invoice_content = config.INVOICE_DATA
+    bank_content = config.BANK_STATEMENT_CSV
 
     if args.invoice_path:
-        try:
-            with open(args.invoice_path, 'r', encoding='utf-8') as f:
-                invoice_content = f.read()
-        except FileNotFoundError:
-            print(f"Error: File not found: {args.invoice_path}")
-            sys.exit(1)
-        except PermissionError:
-            print(f"Error: Permission denied: {args.invoice_path}")
-            sys.exit(1)
+        invoice_content = _read_file(args.invoice_path)
 
     if args.bank_csv:
-        try:
-            with open(args.bank_csv, 'r', encoding='utf-8') as f:
-                bank_content = f.read()
-        except FileNotFoundError:
-            print(f"Error: File not found: {args.bank_csv}")
-            sys.exit(1)
-        except PermissionError:
-            print(f"Error: Permission denied: {args.bank_csv}")
-            sys.exit(1)
-
-    run_vouch_vault(invoice_content, bank_content)
+        bank_content = _read_statement(args.bank_csv)
+
+    cache = ResponseCache(args.cache_db)
+    with SQLiteAuditMemory(args.memory_db) as memory:
+        run_vouch_vault(invoice_content, bank_content, memory=memory,
+                        analyst=AnalystAgent(cache=cache, model=_backend(args)), pause=args.pause)
+    cache.close()
@@ -0,0 +1,98 @@
+"""Vectorized GST and TDS checks over many invoice lines, in integer paise."""
+from dataclasses import dataclass
+from typing import Optional, Union
+
+import numpy as np
+
+GST_SLABS = (0.05, 0.12, 0.18, 0.28)
+TDS_SECTIONS = {
+    "194C_individual": 0.01,
+    "194C": 0.02,
+    "194H": 0.05,
+    "194J": 0.10,
+}
+TOLERANCE_PAISE = 5  # Same as calculate_tax_compliance: differences under 0.05 INR pass
+
+ArrayLike = Union[float, np.ndarray, list]
+
+
+def to_paise_array(amounts: ArrayLike) -> np.ndarray:
+    """Rupee amounts -> int64 paise, rounded to the nearest paisa."""
+    return np.rint(np.asarray(amounts, dtype=np.float64) * 100).astype(np.int64)
+
+
+def to_basis_points(rates: ArrayLike) -> np.ndarray:
+    """Fractional rates (0.18) -> int64 basis points (1800)."""
+    return np.rint(np.asarray(rates, dtype=np.float64) * 10_000).astype(np.int64)
+
+
+def apply_rate(paise: np.ndarray, basis_points: np.ndarray, divisor: int = 1) -> np.ndarray:
+    """`paise` x rate / divisor, rounded half away from zero, without leaving integers."""
+    scale = 10_000 * divisor
+    product = np.abs(paise) * basis_points
+    return np.sign(paise) * ((2 * product + scale) // (2 * scale))
+
+
+@dataclass
+class BulkCompliance:
+    """Per-line results of check_tax_compliance_bulk. All amounts in paise."""
+    expected_tax: np.ndarray
+    actual_tax: np.ndarray
+    difference: np.ndarray       # actual - expected
+    is_compliant: np.ndarray     # bool
+    cgst: np.ndarray             # Zero on inter-state lines
+    sgst: np.ndarray
+    igst: np.ndarray             # Zero on intra-state lines
+    tds: np.ndarray
+    net_payable: np.ndarray      # subtotal + expected tax - TDS
+
+    def __len__(self) -> int:
+        return len(self.expected_tax)
+
+    @property
+    def compliance_rate(self) -> float:
+        return float(self.is_compliant.mean()) if len(self) else 0.0
+
+
+def check_tax_compliance_bulk(
+    subtotals: ArrayLike,
+    tax_amounts: ArrayLike,
+    rates: ArrayLike = 0.18,
+    intra_state: Optional[ArrayLike] = None,
+    tds_rates: ArrayLike = 0.0,
+    tolerance_paise: int = TOLERANCE_PAISE,
+) -> BulkCompliance:
+    """
+    Check many invoice lines in one pass.
+
+    `rates` is the GST slab per line (or one slab for all). Intra-state
+    lines (`intra_state` True) are split into CGST and SGST at half the
+    slab each, rounded per component as they are printed on the invoice;
+    other lines carry the whole slab as IGST. `tds_rates` is the TDS
+    deducted on the subtotal (see TDS_SECTIONS). Scalars broadcast.
+    """
+    subtotal = to_paise_array(subtotals)
+    actual = to_paise_array(tax_amounts)
+    subtotal, actual, bp, tds_bp = np.broadcast_arrays(
+        subtotal, actual, to_basis_points(rates), to_basis_points(tds_rates))
+    intra = (np.zeros(subtotal.shape, dtype=bool) if intra_state is None
+             else np.broadcast_to(np.asarray(intra_state, dtype=bool), subtotal.shape))
+
+    half = apply_rate(subtotal, bp, divisor=2)
+    cgst = np.where(intra, half, 0)
+    igst = np.where(intra, 0, apply_rate(subtotal, bp))
+    expected = 2 * cgst + igst
+    difference = actual - expected
+    tds = apply_rate(subtotal, tds_bp)
+
+    return BulkCompliance(
+        expected_tax=expected,
+        actual_tax=actual,
+        difference=difference,
+        is_compliant=np.abs(difference) < tolerance_paise,
+        cgst=cgst,
+        sgst=cgst.copy(),
+        igst=igst,
+        tds=tds,
+        net_payable=subtotal + expected - tds,
+    )
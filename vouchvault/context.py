@@ -0,0 +1,112 @@
+"""Pick the statement rows worth showing the model and fit them to a token budget."""
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+from .invoice import Invoice
+from .rules import NEAR_MISS_TOLERANCE, statement_indexes
+from .statement import BankStatement
+
+CONTEXT_ROWS = 10
+TOKEN_BUDGET = 1500
+DATE_WINDOW = 30     # Days either side of the invoice date
+NEIGHBOURS = 200     # Rows nearest by amount, and by date, that get scored
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)."""
+    return (len(text) + 3) // 4
+
+
+@dataclass
+class AuditContext:
+    """The invoice and the selected statement rows, rendered for a prompt."""
+    invoice: str
+    statement_csv: str
+    rows: List[int] = field(default_factory=list)
+    total_rows: int = 0
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.invoice) + estimate_tokens(self.statement_csv)
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _day(invoice: Invoice) -> Optional[np.datetime64]:
+    try:
+        return np.datetime64(invoice.date, "D") if invoice.date else None
+    except ValueError:
+        return None
+
+
+def _candidates(invoice: Invoice, statement: BankStatement) -> Set[int]:
+    """Rows nearest the invoice by amount and by date, the only ones worth scoring."""
+    pool = set()
+    amounts, _ = statement_indexes(statement)
+    if invoice.total:
+        tolerance = max(NEAR_MISS_TOLERANCE, 0.2 * invoice.total)
+        pool.update(amounts.positions_near(invoice.total, tolerance, NEIGHBOURS))
+    day = _day(invoice)
+    if day is not None:
+        pool.update(amounts.positions_by_date(str(day), DATE_WINDOW, NEIGHBOURS))
+    return pool
+
+
+def _score_rows(invoice: Invoice, statement: BankStatement, pool: Iterable[int]) -> Dict[int, float]:
+    """
+    Score rows on amount closeness, vendor similarity and date distance.
+
+    Descriptions sharing no trigram with the vendor score 0 for similarity
+    without running SequenceMatcher; each description is scored once.
+    """
+    vendor = invoice.vendor.lower() if invoice.vendor else None
+    grams = _trigrams(vendor) if vendor else set()
+    day = _day(invoice)
+    similarity: Dict[str, float] = {}  # Statements repeat descriptions; score each once
+    scores = {}
+    for pos in pool:
+        score = 0.0
+        amount = statement.amounts[pos]
+        if invoice.total and not np.isnan(amount):
+            score += 0.5 * max(0.0, 1 - abs(abs(amount) - invoice.total) / invoice.total)
+        if vendor:
+            description = statement.descriptions[pos]
+            if description not in similarity:
+                lowered = description.lower()
+                related = not grams or any(gram in lowered for gram in grams)  # Short vendors: always score
+                similarity[description] = SequenceMatcher(None, vendor, lowered).ratio() if related else 0.0
+            score += 0.3 * similarity[description]
+        if day is not None and not np.isnat(statement.dates[pos]):
+            days = abs(int((statement.dates[pos] - day).astype(int)))
+            score += 0.2 * max(0.0, 1 - days / DATE_WINDOW)
+        scores[pos] = score
+    return scores
+
+
+def build_context(invoice_data: str, invoice: Invoice, statement: BankStatement,
+                  k: int = CONTEXT_ROWS, token_budget: int = TOKEN_BUDGET) -> AuditContext:
+    """
+    Keep the `k` best-scoring statement rows for this invoice, dropping the
+    weakest until the rendered invoice and rows fit in `token_budget`.
+
+    Statements of at most `k` rows are scored whole. Rows stay in statement
+    order so dates read naturally.
+    """
+    text = "\n".join(line.strip() for line in invoice_data.strip().splitlines() if line.strip())
+    pool = range(len(statement)) if len(statement) <= k else _candidates(invoice, statement)
+    scores = _score_rows(invoice, statement, pool)
+    ranked = sorted(scores, key=lambda p: (-scores[p], p))[:k]
+    if not ranked:
+        ranked = list(range(min(k, len(statement))))
+
+    while True:
+        rows = sorted(ranked)
+        context = AuditContext(text, statement.to_csv(rows), rows, len(statement))
+        if context.tokens <= token_budget or not ranked:
+            return context
+        ranked.pop()
@@ -1,9 +1,62 @@
 """Evaluation metrics for audit accuracy (Day 4 capability)."""
+import json
+import math
+import threading
 import time
-from dataclasses import dataclass, field
-from typing import Optional, List
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field, replace
+from functools import wraps
+from typing import Callable, Dict, Iterator, List, Optional, TextIO
 
-@dataclass
+from .cache import ResponseCache
+
+# Per-audit stages timed with perf_counter_ns. "model" includes any "tools"
+# the model calls during the round trip.
+STAGES = ("parse", "anomaly", "rules", "context", "model", "tools", "hint")
+QUANTILES = (0.5, 0.95, 0.99)
+
+_active: "ContextVar[Optional[AuditMetrics]]" = ContextVar("vouchvault_active_audit", default=None)
+
+
+class LatencyHistogram:
+    """
+    Streaming quantile estimates over nanosecond durations.
+
+    Values are counted in log-spaced buckets 2**(1/16) apart, so memory is
+    bounded (a few hundred buckets for 1 ns .. 1 h) and quantiles are
+    accurate to about 4.5%.
+    """
+    GROWTH = 2 ** (1 / 16)
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def add(self, value_ns: int) -> None:
+        index = math.ceil(math.log(value_ns, self.GROWTH)) if value_ns > 1 else 0
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total_ns += value_ns
+        self.max_ns = max(self.max_ns, value_ns)
+
+    def quantile(self, q: float) -> int:
+        """Upper bound of the bucket holding the q-th value (0 when empty)."""
+        if not self.count:
+            return 0
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(self.max_ns, round(self.GROWTH ** index))
+        return self.max_ns
+
+
+@dataclass(slots=True)
 class AuditMetrics:
     """Metrics for a single audit."""
     invoice_id: str
@@ -14,7 +67,37 @@ class AuditMetrics:
     tax_compliant: Optional[bool] = None
     vendor_matched: Optional[bool] = None
     amount_matched: Optional[bool] = None
-    
+    path: str = "model"  # "rules" when the pre-checks settled the audit
+    prompt_tokens: List[int] = field(default_factory=list)  # Prompt tokens of each model call
+    response_tokens: List[int] = field(default_factory=list)  # Reply tokens of each model call
+    token_sources: List[str] = field(default_factory=list)  # Per call: "usage" (model-reported) or "estimate"
+    stage_ns: Dict[str, int] = field(default_factory=dict)  # Time spent per stage (see STAGES)
+    start_ns: int = field(default_factory=time.perf_counter_ns)
+    elapsed_ns: Optional[int] = None  # Set when the evaluator finishes the audit
+    trail: List[str] = field(default_factory=list)  # Why each model attempt was made or the loop stopped
+    anomalies: List[str] = field(default_factory=list)  # Near-duplicates and outliers against past invoices
+    vendor: Optional[str] = None
+    invoice_total: Optional[float] = None
+    match_date: Optional[str] = None  # Bank debit that paid the invoice, or the closest one the rules found
+    match_description: Optional[str] = None
+    match_amount: Optional[float] = None
+
+    @property
+    def model_calls(self) -> int:
+        return len(self.response_tokens)
+
+    @property
+    def tokens_estimated(self) -> bool:
+        """Whether any token count of this audit is an estimate rather than model-reported usage."""
+        return "estimate" in self.token_sources
+
+    @property
+    def difference(self) -> Optional[float]:
+        """Invoice total less the matched debit."""
+        if self.invoice_total is None or self.match_amount is None:
+            return None
+        return round(self.invoice_total - self.match_amount, 2)
+
     @property
     def duration_seconds(self) -> float:
         """Calculate audit duration."""
@@ -28,6 +111,27 @@ class AuditMetrics:
         checks = [self.tax_compliant, self.vendor_matched, self.amount_matched]
         return sum(1 for c in checks if c is True)
     
+    def record(self, stage: str, duration_ns: int) -> None:
+        self.stage_ns[stage] = self.stage_ns.get(stage, 0) + duration_ns
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        """Time the enclosed block and add it to `stage`."""
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter_ns() - start)
+
+    @contextmanager
+    def active(self) -> Iterator[None]:
+        """Make this audit the one that timed_tool calls are charged to."""
+        token = _active.set(self)
+        try:
+            yield
+        finally:
+            _active.reset(token)
+
     def to_dict(self) -> dict:
         """Convert to dictionary for logging/display."""
         return {
@@ -36,31 +140,162 @@ class AuditMetrics:
             "attempts": self.attempts,
             "status": self.status,
             "checks_passed": f"{self.passed_checks}/3",
+            "path": self.path,
+            "prompt_tokens": sum(self.prompt_tokens),
+            "response_tokens": sum(self.response_tokens),
+            "tokens_estimated": self.tokens_estimated,
+            "model_calls": self.model_calls,
+            "trail": self.trail,
+            "anomalies": self.anomalies,
+            "stages_ms": {stage: round(ns / 1e6, 3) for stage, ns in self.stage_ns.items()},
         }
 
+
+def timed_tool(fn: Callable) -> Callable:
+    """Wrap a model tool so its run time is charged to the active audit's "tools" stage."""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        metrics = _active.get()
+        if metrics is None:
+            return fn(*args, **kwargs)
+        with metrics.span("tools"):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+@dataclass
+class _Totals:
+    audits: int = 0
+    passed: int = 0
+    by_rules: int = 0
+    duration: float = 0.0
+    prompted: int = 0
+    prompt_tokens: int = 0
+    model_calls: int = 0
+    flagged: int = 0
+
+    def add(self, metrics: AuditMetrics) -> None:
+        self.audits += 1
+        self.passed += metrics.status == "PASS"
+        self.by_rules += metrics.path == "rules"
+        self.duration += metrics.duration_seconds
+        self.flagged += bool(metrics.anomalies)
+        if metrics.prompt_tokens:
+            self.prompted += 1
+            self.prompt_tokens += sum(metrics.prompt_tokens)
+            self.model_calls += metrics.model_calls
+
+
 class AuditEvaluator:
-    """Tracks and aggregates audit metrics across sessions."""
+    """
+    Tracks and aggregates audit metrics across sessions.
+
+    Finished audits are folded into running totals and latency histograms,
+    so memory stays bounded: only the last `history_size` audits are kept
+    in `history`. With a `sink`, each finished audit is also written to it
+    as one JSON line. Safe to share between threads.
+    """
     
-    def __init__(self):
-        self.history: List[AuditMetrics] = []
+    def __init__(self, cache: Optional[ResponseCache] = None, history_size: int = 1000,
+                 sink: Optional[TextIO] = None):
+        self.history: "deque[AuditMetrics]" = deque(maxlen=history_size)
+        self.cache = cache  # Response cache whose hit/miss counters are reported
+        self.sink = sink
+        self.latency = LatencyHistogram()
+        self.stage_latency: Dict[str, LatencyHistogram] = {stage: LatencyHistogram() for stage in STAGES}
+        self._totals = _Totals()
+        self._open: Dict[int, AuditMetrics] = {}  # Started but not yet finished
+        self._lock = threading.Lock()
     
     def start_audit(self, invoice_id: str) -> AuditMetrics:
         """Start tracking a new audit."""
         metrics = AuditMetrics(invoice_id=invoice_id, start_time=time.time())
-        self.history.append(metrics)
+        with self._lock:
+            self.history.append(metrics)
+            self._open[id(metrics)] = metrics
         return metrics
+
+    def finish_audit(self, metrics: AuditMetrics) -> None:
+        """Fold a completed audit into the totals, histograms and sink."""
+        metrics.elapsed_ns = time.perf_counter_ns() - metrics.start_ns
+        with self._lock:
+            if self._open.pop(id(metrics), None) is None:
+                return
+            self._totals.add(metrics)
+            self.latency.add(metrics.elapsed_ns)
+            for stage, ns in metrics.stage_ns.items():
+                self.stage_latency.setdefault(stage, LatencyHistogram()).add(ns)
+            if self.sink is not None:
+                self.sink.write(json.dumps(metrics.to_dict()) + "\n")
     
+    def abort_audit(self, metrics: AuditMetrics, error: BaseException) -> None:
+        """Finish an audit that raised as ERROR; a no-op if it was already finished."""
+        with self._lock:
+            if id(metrics) not in self._open:
+                return
+        metrics.status = "ERROR"
+        metrics.trail.append(f"error: {error}")
+        if metrics.end_time is None:
+            metrics.end_time = time.time()
+        self.finish_audit(metrics)
+
     def get_summary(self) -> dict:
         """Get aggregate statistics."""
-        if not self.history:
-            return {}
-        total = len(self.history)
-        passed = sum(1 for m in self.history if m.status == "PASS")
-        avg_time = sum(m.duration_seconds for m in self.history) / total
+        with self._lock:
+            totals = replace(self._totals)
+            for metrics in self._open.values():
+                totals.add(metrics)
+        if not totals.audits:
+            return self.cache.stats() if self.cache is not None else {}
+        total = totals.audits
+        passed = totals.passed
+        by_rules = totals.by_rules
+        latency = {f"p{round(q * 100)}_latency": f"{self.latency.quantile(q) / 1e9:.3f}s" for q in QUANTILES}
         return {
             "total_audits": total,
             "passed": passed,
             "failed": total - passed,
             "pass_rate": f"{(passed/total)*100:.1f}%",
-            "avg_duration": f"{avg_time:.2f}s",
+            "avg_duration": f"{totals.duration / total:.2f}s",
+            **latency,
+            "flagged_anomalies": totals.flagged,
+            "decided_by_rules": f"{(by_rules/total)*100:.1f}%",
+            "decided_by_model": f"{((total - by_rules)/total)*100:.1f}%",
+            "avg_prompt_tokens": round(totals.prompt_tokens / totals.prompted) if totals.prompted else 0,
+            "avg_model_calls": round(totals.model_calls / totals.prompted, 2) if totals.prompted else 0,
+            **(self.cache.stats() if self.cache is not None else {}),
         }
+
+    def to_prometheus(self) -> str:
+        """Finished-audit counters and latency quantiles in Prometheus text format."""
+        with self._lock:
+            totals = replace(self._totals)
+            lines = [
+                "# TYPE vouchvault_audits_total counter",
+                f"vouchvault_audits_total {totals.audits}",
+                "# TYPE vouchvault_audits_passed_total counter",
+                f"vouchvault_audits_passed_total {totals.passed}",
+                "# TYPE vouchvault_audits_by_rules_total counter",
+                f"vouchvault_audits_by_rules_total {totals.by_rules}",
+                "# TYPE vouchvault_audits_flagged_total counter",
+                f"vouchvault_audits_flagged_total {totals.flagged}",
+                "# TYPE vouchvault_prompt_tokens_total counter",
+                f"vouchvault_prompt_tokens_total {totals.prompt_tokens}",
+                "# TYPE vouchvault_model_calls_total counter",
+                f"vouchvault_model_calls_total {totals.model_calls}",
+                "# TYPE vouchvault_audit_seconds summary",
+            ]
+            lines += _summary_lines("vouchvault_audit_seconds", "", self.latency)
+            lines.append("# TYPE vouchvault_stage_seconds summary")
+            for stage, histogram in self.stage_latency.items():
+                if histogram.count:
+                    lines += _summary_lines("vouchvault_stage_seconds", f'stage="{stage}",', histogram)
+        return "\n".join(lines) + "\n"
+
+
+def _summary_lines(name: str, labels: str, histogram: LatencyHistogram) -> List[str]:
+    lines = [f'{name}{{{labels}quantile="{q}"}} {histogram.quantile(q) / 1e9:.9f}' for q in QUANTILES]
+    suffix = f"{{{labels.rstrip(',')}}}" if labels else ""
+    lines.append(f"{name}_sum{suffix} {histogram.total_ns / 1e9:.9f}")
+    lines.append(f"{name}_count{suffix} {histogram.count}")
+    return lines
@@ -0,0 +1,68 @@
+"""Offline stand-ins for AnalystAgent and its model, for exercising the pipeline without Gemini."""
+import threading
+import time
+from types import SimpleNamespace
+
+from .ratelimit import QuotaExceeded
+
+
+class FakeAnalyst:
+    """
+    Answers every prompt with a fixed verdict after `latency` seconds.
+
+    The first `quota_errors` calls (counted across threads) raise
+    QuotaExceeded, and call timestamps are kept so tests can check the
+    achieved rate and concurrency.
+    """
+
+    def __init__(self, verdict: str = "PASS", latency: float = 0.0, quota_errors: int = 0):
+        self.verdict = verdict
+        self.latency = latency
+        self.quota_errors = quota_errors
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        pass
+
+    def _reply(self, message: str):
+        with self._lock:
+            self.calls.append(time.monotonic())
+            if self.quota_errors > 0:
+                self.quota_errors -= 1
+                raise QuotaExceeded("429 Resource has been exhausted")
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.latency)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        return SimpleNamespace(text=f"AUDIT STATUS: {self.verdict}")
+
+    def analyze(self, prompt: str):
+        return self._reply(prompt)
+
+    def inject_message(self, message: str):
+        return self._reply(message)
+
+
+class FakeModel:
+    """
+    Model backend that answers every message with a fixed verdict.
+
+    Lets the real AnalystAgent (chat history, cache, recording) run
+    without Gemini, e.g. to make recordings for ReplayBackend.
+    """
+
+    def __init__(self, verdict: str = "PASS", latency: float = 0.0):
+        self.verdict = verdict
+        self.latency = latency
+
+    def start_chat(self, history=None, enable_automatic_function_calling: bool = False):
+        def send_message(message: str):
+            time.sleep(self.latency)
+            return SimpleNamespace(text=f"AUDIT STATUS: {self.verdict}")
+        return SimpleNamespace(history=[], send_message=send_message)
@@ -0,0 +1,106 @@
+"""Plain-text invoice parsing with precompiled extractors."""
+import re
+from datetime import datetime
+from typing import Iterable, Iterator, NamedTuple, Optional, Tuple
+
+DEFAULT_GST_RATE = 0.18
+
+# Amounts: optional currency marker, Indian or Western digit grouping, optional paise
+_AMOUNT = r"(?:₹|Rs\.?|INR)?\s*(\d+(?:,\d+)*(?:\.\d+)?)"
+_LABEL_END = r"[^\S\n]*[:=\-]?[^\S\n]*"
+
+_INVOICE_ID = re.compile(
+    r"Invoice[^\S\n]*(?:No\b\.?|Number|#)[^\S\n]*[:#]?[^\S\n]*([A-Z0-9][\w/-]*)|\b(INV-\d+)\b", re.IGNORECASE)
+_VENDOR = re.compile(r"^[^\S\n]*(?:Vendor|Supplier|Seller|From)" + _LABEL_END + r"(.+?)[^\S\n]*$",
+                     re.IGNORECASE | re.MULTILINE)
+_DATE = re.compile(r"^[^\S\n]*(?:Invoice[^\S\n]*)?Date" + _LABEL_END + r"(.+?)[^\S\n]*$",
+                   re.IGNORECASE | re.MULTILINE)
+_SUBTOTAL = re.compile(
+    r"(?:Amount[^\S\n]*\(before tax\)|Sub[- ]?total|Taxable[^\S\n]*(?:Value|Amount))" + _LABEL_END + _AMOUNT,
+    re.IGNORECASE)
+_GST = re.compile(
+    r"\b(CGST|SGST|UTGST|IGST|GST|Tax)\b[^\S\n]*(?:@[^\S\n]*)?(?:\(?[^\S\n]*(\d+(?:\.\d+)?)[^\S\n]*%[^\S\n]*\)?)?"
+    + _LABEL_END + _AMOUNT, re.IGNORECASE)
+_TOTAL = re.compile(
+    r"(?<![\w-])(?<!\bSub[^\S\n])"  # Not the "Total" of "Sub Total" / "Sub-Total" / "SubTotal"
+    r"(?:Grand[^\S\n]*Total|Total(?:[^\S\n]*Amount)?|Amount[^\S\n]*Payable|Net[^\S\n]*Payable)"
+    + _LABEL_END + _AMOUNT, re.IGNORECASE)
+_DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d.%m.%Y", "%d %b %Y", "%d %B %Y", "%b %d, %Y")
+
+
+class GSTLine(NamedTuple):
+    """One tax line: kind (GST, CGST, SGST, UTGST, IGST), rate if printed, amount."""
+    kind: str
+    rate: Optional[float]
+    amount: float
+
+
+class Invoice(NamedTuple):
+    """Fields parsed from an invoice; None where a field is missing."""
+    invoice_id: Optional[str] = None
+    vendor: Optional[str] = None
+    date: Optional[str] = None       # ISO yyyy-mm-dd
+    subtotal: Optional[float] = None
+    tax: Optional[float] = None      # Sum of all GST lines
+    tax_rate: float = DEFAULT_GST_RATE
+    total: Optional[float] = None
+    gst_lines: Tuple[GSTLine, ...] = ()
+
+
+def parse_amount(text: str) -> float:
+    """'1,18,000.50' or '1,180' -> float."""
+    return float(text.replace(',', ''))
+
+
+def parse_date(text: str) -> Optional[str]:
+    """Normalize a printed date to ISO format, or None if it is not recognised."""
+    text = text.strip().rstrip('.')
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def _first_amount(pattern: re.Pattern, text: str) -> Optional[float]:
+    match = pattern.search(text)
+    return parse_amount(match.group(match.lastindex)) if match else None
+
+
+def parse_invoice(text: str) -> Invoice:
+    """Parse one plain-text invoice."""
+    invoice_id = _INVOICE_ID.search(text)
+    vendor = _VENDOR.search(text)
+    date = _DATE.search(text)
+
+    gst_lines = tuple(
+        GSTLine(kind.upper(), float(rate) / 100 if rate else None, parse_amount(amount))
+        for kind, rate, amount in _GST.findall(text)
+    )
+    # Component lines (CGST/SGST/IGST) win over generic "GST"/"Tax" summary lines
+    components = tuple(line for line in gst_lines if line.kind not in ("GST", "TAX"))
+    if components:
+        gst_lines = components
+    elif any(line.kind == "GST" for line in gst_lines):
+        gst_lines = tuple(line for line in gst_lines if line.kind == "GST")
+    tax = round(sum(line.amount for line in gst_lines), 2) if gst_lines else None
+    rates = [line.rate for line in gst_lines if line.rate is not None]
+    tax_rate = round(sum(rates), 4) if rates else DEFAULT_GST_RATE
+
+    return Invoice(
+        invoice_id=(invoice_id.group(1) or invoice_id.group(2)) if invoice_id else None,
+        vendor=vendor.group(1) if vendor else None,
+        date=parse_date(date.group(1)) if date else None,
+        subtotal=_first_amount(_SUBTOTAL, text),
+        tax=tax,
+        tax_rate=tax_rate,
+        total=_first_amount(_TOTAL, text),
+        gst_lines=gst_lines,
+    )
+
+
+def parse_invoices(documents: Iterable[str]) -> Iterator[Invoice]:
+    """Lazily parse a stream of invoice texts."""
+    for text in documents:
+        yield parse_invoice(text)
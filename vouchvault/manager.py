@@ -1,128 +1,306 @@
 import re
 import time
-from .analyst import AnalystAgent
-from .memory import AuditMemory, AuditRecord  # <--- CRITICAL: Connects Memory
-from .evaluation import AuditEvaluator        # <--- CRITICAL: Connects Metrics
+from typing import Optional, Union
+
+import numpy as np
+
+from .analyst import AnalystAgent, default_pool
+from .anomaly import AnomalyIndex
+from .memory import AuditMemory, AuditRecord, AuditStore  # <--- CRITICAL: Connects Memory
+from .evaluation import AuditEvaluator, AuditMetrics  # <--- CRITICAL: Connects Metrics
+from .context import CONTEXT_ROWS, TOKEN_BUDGET, build_context, estimate_tokens
+from .invoice import Invoice, parse_invoice
+from .matching import MatchCandidate
+from .rules import RuleDecision, explain_gap, precheck
+from .statement import BankStatement
+
+
+_AMOUNT = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+
+def _quiet(*args, **kwargs) -> None:
+    pass
+
+
+def _amount_hint(invoice_total: Optional[float], statement: BankStatement) -> str:
+    """Point the analyst at the gap between the invoice and the closest bank amount."""
+    hint_msg = "Check for discounts or partial payments."
+    amounts = np.abs(statement.amounts[~np.isnan(statement.amounts)])
+    if invoice_total is None or not len(amounts):
+        return hint_msg
+    bank_total = amounts[np.argmin(np.abs(amounts - invoice_total))]
+    diff = abs(invoice_total - bank_total)
+    if diff > 0:
+        hint_msg = f"The difference is exactly {diff:.2f}. Check if this amount corresponds to a tax deduction (TDS) or discount."
+    return hint_msg
+
+
+def _finding(text: str) -> frozenset:
+    """Amounts cited in a reply; the same set twice in a row means retrying has converged."""
+    return frozenset(float(amount.replace(",", "")) for amount in _AMOUNT.findall(text))
+
+
+def _remember(memory: AuditStore, invoice_id: str, invoice: Invoice) -> None:
+    memory.add_record(AuditRecord(
+        invoice_id=invoice_id,
+        vendor=invoice.vendor or "Detected Vendor",
+        amount=invoice.total or 0.0,
+        status="PASS",
+        invoice_date=invoice.date,
+    ))
+
+
+def _ask(metrics: AuditMetrics, send, message: str):
+    """
+    One model round trip, timed as the "model" stage (tool calls inside it as "tools").
+
+    Token counts come from the response's usage metadata when the model
+    reports it; otherwise (cached, replayed or stand-in replies) they are
+    estimated from the text. `metrics.token_sources` records which.
+    """
+    metrics.prompt_tokens.append(estimate_tokens(message))
+    with metrics.active(), metrics.span("model"):
+        response = send(message)
+    usage = getattr(response, "usage_metadata", None)
+    if getattr(usage, "prompt_token_count", 0):
+        metrics.prompt_tokens[-1] = usage.prompt_token_count
+        metrics.response_tokens.append(getattr(usage, "candidates_token_count", 0) or 0)
+        metrics.token_sources.append("usage")
+    else:
+        metrics.response_tokens.append(estimate_tokens(response.text or ""))
+        metrics.token_sources.append("estimate")
+    return response
+
+
+def _note_decision(metrics: AuditMetrics, decision: RuleDecision) -> None:
+    """Copy the rules' verdicts and the debit they matched onto the metrics."""
+    metrics.tax_compliant = decision.tax_compliant
+    metrics.vendor_matched = decision.vendor_matched
+    metrics.amount_matched = decision.amount_matched
+    if decision.match is not None:
+        _note_match(metrics, decision.match)
+
+
+def _note_match(metrics: AuditMetrics, match: MatchCandidate) -> None:
+    row = match.records[0]
+    metrics.match_date = str(row.get("date") or "") or None
+    metrics.match_description = row.get("description")
+    metrics.match_amount = match.amount
+
+
+def _report(say, metrics: AuditMetrics) -> None:
+    say("\n📊 [System Evaluation Metrics]")
+    say(f"   Duration: {metrics.duration_seconds}s")
+    say(f"   Attempts: {metrics.attempts}")
+    say(f"   Status:   {metrics.status}")
+    say(f"   Path:     {metrics.path}")
+    say(f"   Model calls: {metrics.model_calls}")
+    if metrics.stage_ns:
+        stages = ", ".join(f"{stage} {ns / 1e6:.1f}ms" for stage, ns in metrics.stage_ns.items())
+        say(f"   Stages:   {stages}")
+
+
+def run_vouch_vault(
+    invoice_data: str,
+    bank_data: Union[str, BankStatement],
+    memory: Optional[AuditStore] = None,
+    evaluator: Optional[AuditEvaluator] = None,
+    analyst: Optional[AnalystAgent] = None,
+    verbose: bool = True,
+    use_rules: bool = True,
+    pause: float = 0.0,
+    context_rows: int = CONTEXT_ROWS,
+    token_budget: int = TOKEN_BUDGET,
+    decision: Optional[RuleDecision] = None,
+    history: Optional[AnomalyIndex] = None,
+) -> AuditMetrics:
+    """
+    Audit one invoice against a bank statement.
+
+    Batch callers pass in a pre-parsed BankStatement plus the shared memory,
+    evaluator and analyst so nothing is rebuilt per invoice. Clear-cut cases
+    are settled by the deterministic pre-checks unless `use_rules` is False;
+    only the rest go to the analyst. The prompt carries only the
+    `context_rows` most relevant statement rows, trimmed to `token_budget`.
+    `pause` adds a cosmetic delay before each audit cycle for demos.
+    A `decision` already reached elsewhere (e.g. in a worker process) is
+    used instead of running the pre-checks again. With a `history`, the
+    invoice is checked for near-duplicates and vendor outliers and then
+    added to it; findings are recorded in `metrics.anomalies`.
+    """
+    say = print if verbose else _quiet
+    parse_start = time.perf_counter_ns()
 
-def run_vouch_vault(invoice_data: str, bank_data: str) -> None:
     # Input validation
     if not invoice_data or not invoice_data.strip():
         raise ValueError("Invoice data cannot be empty")
-    if not bank_data or not bank_data.strip():
-        raise ValueError("Bank statement data cannot be empty")
+    if isinstance(bank_data, str):
+        if not bank_data.strip():
+            raise ValueError("Bank statement data cannot be empty")
+        bank_data = BankStatement(bank_data)
     
     # --- 1. Initialize System Components ---
-    memory = AuditMemory()
-    evaluator = AuditEvaluator()
+    memory = memory if memory is not None else AuditMemory()
+    evaluator = evaluator if evaluator is not None else AuditEvaluator()
     
-    # Extract Invoice ID for tracking (Regex to find "INV-XXX")
-    inv_id_match = re.search(r"(INV-\d+)", invoice_data)
-    invoice_id = inv_id_match.group(1) if inv_id_match else "UNKNOWN_INV"
+    # Parse the invoice once; the ID drives memory and metrics tracking
+    invoice = parse_invoice(invoice_data)
+    invoice_id = invoice.invoice_id or "UNKNOWN_INV"
 
     # --- 2. Memory Check (Rubric: Sessions & Memory) ---
     if memory.has_duplicate(invoice_id):
-        print(f"⚠️ [Memory] Invoice {invoice_id} has already been processed. Skipping...")
+        say(f"⚠️ [Memory] Invoice {invoice_id} has already been processed. Skipping...")
         # In a real app we might return here, but for demo we'll proceed with a warning
     
-    print("\n🤖 --- VouchVault: Enterprise Audit Agent ---")
-    print("----------------------------------------------")
+    say("\n🤖 --- VouchVault: Enterprise Audit Agent ---")
+    say("----------------------------------------------")
 
     # --- 3. Start Evaluation Tracker (Rubric: Evaluation) ---
     metrics = evaluator.start_audit(invoice_id)
+    try:
+        metrics.record("parse", time.perf_counter_ns() - parse_start)
+        metrics.vendor = invoice.vendor
+        metrics.invoice_total = invoice.total
 
-    # Step 1: The Manager "Sees" the Data
-    print(f"📄 [Manager] Incoming Invoice Detected:\n{invoice_data.strip()}")
-    print(f"🏦 [Manager] Bank Statement Fetched ({len(bank_data.splitlines())-1} transactions found).")
-    
-    # Step 2: The Audit Loop
-    max_retries = 3
-    attempts = 0
-    audit_passed = False
-    
-    # Initialize Analyst Agent
-    analyst = AnalystAgent()
-    
-    while attempts < max_retries and not audit_passed:
-        attempts += 1
-        metrics.attempts = attempts
-        print(f"\n🔍 [Analyst] Audit Cycle #{attempts} Started...")
-        time.sleep(1) # Artificial pause for effect
-        
-        # --- SMART AUDITOR PROMPT ---
-        prompt = f"""
-        You are the Senior Audit Agent.
-        
-        YOUR MISSION:
-        1. Verify if the 'Tax' amount on the Invoice is exactly 18% of the Subtotal using the 'calculate_tax_compliance' tool.
-        2. Check if the 'Total' amount from the Invoice appears in the Bank Statement using the 'fuzzy_match_vendor' tool.
-        
-        CURRENT DATA:
-        - Invoice: {invoice_data}
-        - Bank Statement: {bank_data}
-        
-        OUTPUT RULES:
-        - If the amounts match EXACTLY: Start with "AUDIT STATUS: PASS".
-        - If there is a SMALL difference (e.g., < 50 INR): Check if it could be a Tax Deduction (TDS) or Discount.
-          -> IF you can explain the difference as TDS/Discount, you MAY start with "AUDIT STATUS: PASS" but verify the math.
-          -> IF the difference is unexplained, you MUST start with "AUDIT STATUS: FAIL".
-        """
-        
-        try:
-            # Send to Gemini
-            response = analyst.analyze(prompt)
-            print(f"📝 [Analyst Report]:\n{response.text}")
-            
-            # Logic to break the loop or retry
-            if "AUDIT STATUS: PASS" in response.text.upper():
-                audit_passed = True
-                metrics.status = "PASS"
+        # Step 1: The Manager "Sees" the Data
+        say(f"📄 [Manager] Incoming Invoice Detected:\n{invoice_data.strip()}")
+        say(f"🏦 [Manager] Bank Statement Fetched ({len(bank_data)} transactions found).")
+
+        # Near-duplicates and outliers among past invoices are flagged, not failed
+        if history is not None:
+            with metrics.span("anomaly"):
+                anomalies = history.observe(invoice)
+            metrics.anomalies = [anomaly.reason for anomaly in anomalies]
+            for reason in metrics.anomalies:
+                say(f"🚩 [History] {reason}")
+
+        # Step 1b: Deterministic pre-checks settle clear-cut cases without the model
+        if decision is None and use_rules:
+            with metrics.span("rules"):
+                decision = precheck(invoice, bank_data)
+        if decision is not None:
+            _note_decision(metrics, decision)
+            if decision.decided:
+                metrics.path = "rules"
+                metrics.status = decision.status
                 metrics.end_time = time.time()
-                
-                # Save to Memory
-                memory.add_record(AuditRecord(
-                    invoice_id=invoice_id,
-                    vendor="Detected Vendor",
-                    amount=0.0, 
-                    status="PASS"
-                ))
-                print("\n✅ [Manager] Audit Verified. Invoice Approved.")
-            else:
-                print("\n⚠️ [Manager] Discrepancy Detected.")
-                if attempts < max_retries:
-                    # --- INTELLIGENT HINT LOGIC ---
-                    try:
-                        inv_matches = re.findall(r'[\d,]+\.?\d*', invoice_data)
-                        bank_matches = re.findall(r'[\d,]+\.?\d*', bank_data)
-                        
-                        inv_vals = [float(x.replace(',', '')) for x in inv_matches if x.replace(',', '').replace('.', '').isdigit()]
-                        bank_vals = [float(x.replace(',', '')) for x in bank_matches if x.replace(',', '').replace('.', '').isdigit()]
-                        
-                        hint_msg = "Check for discounts or partial payments."
-                        
-                        if inv_vals and bank_vals:
-                            inv_total = max(inv_vals)
-                            bank_total = max(bank_vals) 
-                            diff = abs(inv_total - bank_total)
-                            
-                            if diff > 0:
-                                hint_msg = f"The difference is exactly {diff:.2f}. Check if this amount corresponds to a tax deduction (TDS) or discount."
-                    except (ValueError, IndexError, AttributeError):
-                        hint_msg = "Check for discounts or partial payments."
-
-                    print(f"🔄 [Manager] Instruction: '{hint_msg}'")
-                    analyst.inject_message(f"Previous audit failed. {hint_msg} Re-evaluate and if the difference is valid TDS, you may PASS.")
+                if decision.status == "PASS":
+                    _remember(memory, invoice_id, invoice)
+                say(f"\n⚡ [Manager] Pre-checks settled the audit: {decision.reason}.")
+                evaluator.finish_audit(metrics)
+                _report(say, metrics)
+                return metrics
+            say(f"\n⚡ [Manager] Pre-checks inconclusive: {decision.reason}.")
+
+        # Select the relevant rows once; retries refer back to them instead of resending
+        with metrics.span("context"):
+            context = build_context(invoice_data, invoice, bank_data, context_rows, token_budget)
+
+        # Step 2: The Audit Loop. A FAIL is retried only while the rules can neither
+        # explain the gap nor rule it out, and only until the model repeats itself.
+        max_retries = 3
+        attempts = 0
+        gap: Optional[RuleDecision] = None  # Why the first attempt failed, from explain_gap
+        hint_msg = ""
+        finding = None  # Amounts cited in the last FAIL reply
+
+        # Borrow a pooled agent unless one was passed in (a shared agent gets a fresh chat per invoice)
+        pool = default_pool() if analyst is None else None
+        if pool is not None:
+            analyst = pool.acquire()
+        else:
+            analyst.reset()
+
+        try:
+            while attempts < max_retries and metrics.status == "PENDING":
+                attempts += 1
+                metrics.attempts = attempts
+                say(f"\n🔍 [Analyst] Audit Cycle #{attempts} Started...")
+                if pause:
+                    time.sleep(pause) # Artificial pause for effect (demo only)
+
+                # --- SMART AUDITOR PROMPT ---
+                if attempts == 1:
+                    prompt = f"""
+                You are the Senior Audit Agent.
+
+                YOUR MISSION:
+                1. Verify if the 'Tax' amount on the Invoice is exactly 18% of the Subtotal using the 'calculate_tax_compliance' tool.
+                2. Check if the 'Total' amount from the Invoice appears in the Bank Statement using the 'fuzzy_match_vendor' tool.
+
+                CURRENT DATA:
+                - Invoice: {context.invoice}
+                - Bank Statement ({len(context.rows)} most relevant of {context.total_rows} transactions): {context.statement_csv}
+
+                OUTPUT RULES:
+                - If the amounts match EXACTLY: Start with "AUDIT STATUS: PASS".
+                - If there is a SMALL difference (e.g., < 50 INR): Check if it could be a Tax Deduction (TDS) or Discount.
+                  -> IF you can explain the difference as TDS/Discount, you MAY start with "AUDIT STATUS: PASS" but verify the math.
+                  -> IF the difference is unexplained, you MUST start with "AUDIT STATUS: FAIL".
+                """
                 else:
+                    # Hint and re-audit in one message; the chat already holds the data
+                    prompt = (f"Previous audit failed. {hint_msg} Re-audit the invoice and bank statement above; "
+                              'if the difference is valid TDS, you may PASS. Start with "AUDIT STATUS: PASS" or "AUDIT STATUS: FAIL".')
+                say(f"🧾 [Manager] Prompt size: ~{estimate_tokens(prompt)} tokens "
+                    f"({len(context.rows)} of {context.total_rows} statement rows).")
+
+                try:
+                    # Send to Gemini
+                    response = _ask(metrics, analyst.analyze, prompt)
+                    say(f"📝 [Analyst Report]:\n{response.text}")
+                except Exception as e:
+                    say(f"\n❌ [Manager] Error during analysis: {e}")
+                    metrics.trail.append(f"attempt {attempts}: model error")
+                    metrics.status = "ERROR"
+                    break
+
+                if "AUDIT STATUS: PASS" in response.text.upper():
+                    metrics.trail.append(f"attempt {attempts}: model PASS")
+                    metrics.status = "PASS"
+                    say("\n✅ [Manager] Audit Verified. Invoice Approved.")
+                    continue
+
+                say("\n⚠️ [Manager] Discrepancy Detected.")
+                metrics.trail.append(f"attempt {attempts}: model FAIL")
+                previous, finding = finding, _finding(response.text)
+                if gap is None:
+                    with metrics.span("hint"):
+                        gap = explain_gap(invoice, bank_data)
+                        hint_msg = _amount_hint(invoice.total, bank_data)
+                    metrics.trail.append(f"gap: {gap.reason}")
+                    if gap.match is not None and metrics.match_amount is None:
+                        _note_match(metrics, gap.match)
+
+                if gap.decided:
+                    metrics.trail.append(f"stop: gap settled by rules ({gap.status})")
+                    metrics.status = gap.status
+                    _note_decision(metrics, gap)
+                    say(f"\n⚡ [Manager] {gap.reason}; no further model call needed.")
+                elif finding == previous:
+                    metrics.trail.append("stop: model repeated its finding")
+                    metrics.status = "FAIL"
+                elif attempts >= max_retries:
+                    metrics.trail.append("stop: retries exhausted")
                     metrics.status = "FAIL"
-                    metrics.end_time = time.time()
-                    print("\n❌ [Manager] Audit Failed after multiple attempts. Flagging for Human Review.")
-        except Exception as e:
-             print(f"\n❌ [Manager] Error during analysis: {e}")
-             metrics.status = "ERROR"
-             metrics.end_time = time.time()
-             break
-
-    # --- 4. Print Evaluation Metrics (Proof for Judges) ---
-    print("\n📊 [System Evaluation Metrics]")
-    print(f"   Duration: {metrics.duration_seconds}s")
-    print(f"   Attempts: {metrics.attempts}")
-    print(f"   Status:   {metrics.status}")
+                else:
+                    say(f"🔄 [Manager] Instruction: '{hint_msg}'")
+
+                if metrics.status == "FAIL":
+                    say("\n❌ [Manager] Audit Failed. Flagging for Human Review.")
+        finally:
+            if pool is not None:
+                pool.release(analyst)
+
+        metrics.end_time = time.time()
+        if metrics.status == "PASS":
+            _remember(memory, invoice_id, invoice)
+
+        # --- 4. Print Evaluation Metrics (Proof for Judges) ---
+        evaluator.finish_audit(metrics)
+        _report(say, metrics)
+        return metrics
+    except BaseException as e:
+        # Pre-checks, the agent pool or the model may raise; the audit must not stay open
+        evaluator.abort_audit(metrics, e)
+        raise
@@ -0,0 +1,293 @@
+"""Indexed bank-transaction matching (built once per statement, queried per invoice)."""
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from datetime import date as Date
+from itertools import combinations, islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .statement import BankStatement
+
+DEBIT = "DEBIT"
+CREDIT = "CREDIT"
+_EPOCH_ORDINAL = Date(1970, 1, 1).toordinal()
+
+DateLike = Union[str, Date, None]
+
+
+def to_paise(amount: Union[str, float, int]) -> int:
+    """Convert a rupee amount (number or '11,800.00' string) to integer paise."""
+    if isinstance(amount, str):
+        amount = amount.replace(',', '').strip()
+    return int(round(float(amount) * 100))
+
+
+def _to_ordinal(value: DateLike) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, Date):
+        return value.toordinal()
+    try:
+        return Date.fromisoformat(str(value).strip()).toordinal()
+    except ValueError:
+        return None
+
+
+def _direction(record: Dict) -> Optional[str]:
+    kind = str(record.get("type") or "").strip().upper()
+    if kind in (DEBIT, CREDIT):
+        return kind
+    try:
+        return DEBIT if float(str(record["amount"]).replace(',', '')) < 0 else None
+    except (KeyError, ValueError):
+        return None
+
+
+def _nearest(keys: List[int], positions: List[int], value: int, within: Optional[int] = None) -> Iterator[int]:
+    """`positions` in order of their sorted `keys`' distance from `value`, stopping past `within`."""
+    after = bisect_left(keys, value)
+    before = after - 1
+    while before >= 0 or after < len(keys):
+        if after >= len(keys) or (before >= 0 and value - keys[before] <= keys[after] - value):
+            distance, pos = value - keys[before], positions[before]
+            before -= 1
+        else:
+            distance, pos = keys[after] - value, positions[after]
+            after += 1
+        if within is not None and distance > within:
+            return
+        yield pos
+
+
+@dataclass
+class MatchCandidate:
+    """One way of explaining an invoice amount with bank transactions."""
+    kind: str                      # "single", "split" (many-to-one) or "consolidated" (one-to-many)
+    records: List[Dict]
+    amount: float                  # Total of the matched transaction(s)
+    amount_diff: float             # |matched total - target total|
+    date_diff_days: Optional[int]  # Largest date distance of the matched rows, None if unknown
+    invoice_ids: List[str] = field(default_factory=list)
+
+    @property
+    def rank_key(self) -> Tuple:
+        date_diff = self.date_diff_days if self.date_diff_days is not None else float("inf")
+        return (self.amount_diff, date_diff, len(self.records))
+
+
+class StatementIndex:
+    """
+    Amount-sorted index over bank records.
+
+    Amounts are stored as absolute integer paise in a sorted list so each
+    lookup is a bisect over a tolerance range instead of a scan of every
+    record. Date and debit/credit filters are applied to the small range.
+    Dates get a second sorted list, so rows nearest an invoice date are
+    also found with a bisect.
+    """
+
+    def __init__(self, records: Sequence[Dict]):
+        self.records = list(records)
+        self._paise: List[Optional[int]] = [None] * len(self.records)
+        keyed = []
+        for pos, record in enumerate(self.records):
+            try:
+                paise = abs(to_paise(record["amount"]))  # Handle negative debits
+            except (KeyError, TypeError, ValueError):
+                continue
+            self._paise[pos] = paise
+            keyed.append((paise, pos))
+        keyed.sort()
+        self._amounts = [paise for paise, _ in keyed]
+        self._positions = [pos for _, pos in keyed]
+        self._dates = [_to_ordinal(r.get("date")) for r in self.records]
+        self._directions = [_direction(r) for r in self.records]
+        dated = sorted((day, pos) for pos, day in enumerate(self._dates) if day is not None)
+        self._days = [day for day, _ in dated]
+        self._day_positions = [pos for _, pos in dated]
+
+    @classmethod
+    def from_statement(cls, statement: BankStatement) -> "StatementIndex":
+        """
+        Build the index straight from a columnar BankStatement.
+
+        Sorting and paise conversion run on the NumPy columns; row dicts are
+        only built for the records that end up in a MatchCandidate.
+        """
+        index = cls.__new__(cls)
+        index.records = statement
+        valid = ~np.isnan(statement.amounts)
+        paise = np.rint(np.abs(np.where(valid, statement.amounts, 0.0)) * 100).astype(np.int64)
+        index._paise = [int(p) if ok else None for p, ok in zip(paise.tolist(), valid.tolist())]
+        positions = np.flatnonzero(valid)
+        order = positions[np.argsort(paise[positions], kind="stable")]
+        index._amounts = paise[order].tolist()
+        index._positions = order.tolist()
+        days = statement.dates.astype(np.int64) + _EPOCH_ORDINAL
+        undated = np.isnat(statement.dates)
+        index._dates = [None if nat else int(d) for d, nat in zip(days.tolist(), undated.tolist())]
+        dated = np.flatnonzero(~undated)
+        by_day = dated[np.argsort(days[dated], kind="stable")]
+        index._days = days[by_day].tolist()
+        index._day_positions = by_day.tolist()
+        index._directions = [
+            kind if kind in (DEBIT, CREDIT) else (DEBIT if amount < 0 else None)
+            for kind, amount in zip(statement.types, statement.amounts.tolist())
+        ]
+        return index
+
+    def __len__(self) -> int:
+        return len(self._amounts)
+
+    def _range(self, low: int, high: int) -> range:
+        return range(bisect_left(self._amounts, low), bisect_right(self._amounts, high))
+
+    def positions_by_date(self, date: DateLike, window: Optional[int] = None,
+                          limit: Optional[int] = None) -> List[int]:
+        """Up to `limit` row positions nearest to `date` and within `window` days of it, closest first."""
+        day = _to_ordinal(date)
+        if day is None:
+            return []
+        return list(islice(_nearest(self._days, self._day_positions, day, window), limit))
+
+    def _accept(self, pos: int, date: Optional[int], window: Optional[int], direction: Optional[str]) -> bool:
+        if direction is not None and self._directions[pos] not in (None, direction):
+            return False
+        if date is not None and window is not None:
+            record_date = self._dates[pos]
+            if record_date is None or abs(record_date - date) > window:
+                return False
+        return True
+
+    def _date_diff(self, positions: Iterable[int], date: Optional[int]) -> Optional[int]:
+        if date is None:
+            return None
+        diffs = [abs(self._dates[p] - date) for p in positions if self._dates[p] is not None]
+        return max(diffs) if diffs else None
+
+    def _candidate(self, kind: str, positions: Sequence[int], target: int, date: Optional[int],
+                   invoice_ids: Optional[List[str]] = None) -> MatchCandidate:
+        total = sum(self._paise[p] for p in positions)
+        return MatchCandidate(
+            kind=kind,
+            records=[self.records[p] for p in positions],
+            amount=total / 100,
+            amount_diff=abs(total - target) / 100,
+            date_diff_days=self._date_diff(positions, date),
+            invoice_ids=invoice_ids or [],
+        )
+
+    def positions_near(self, amount: float, tolerance: float = 0.0, limit: Optional[int] = None) -> List[int]:
+        """Up to `limit` row positions within `tolerance` rupees of `amount`, closest first."""
+        nearest = _nearest(self._amounts, self._positions, abs(to_paise(amount)), to_paise(tolerance))
+        return list(islice(nearest, limit))
+
+    def find(self, amount: float, tolerance: float = 0.0, date: DateLike = None,
+             date_window: Optional[int] = None, direction: Optional[str] = None) -> List[MatchCandidate]:
+        """Single transactions within `tolerance` rupees of `amount`, best first."""
+        target = abs(to_paise(amount))
+        tol = to_paise(tolerance)
+        day = _to_ordinal(date)
+        hits = [
+            self._positions[i] for i in self._range(target - tol, target + tol)
+            if self._accept(self._positions[i], day, date_window, direction)
+        ]
+        hits.sort()
+        candidates = [self._candidate("single", [p], target, day) for p in hits]
+        candidates.sort(key=lambda c: c.rank_key)
+        return candidates
+
+    def find_split(self, amount: float, tolerance: float = 0.0, date: DateLike = None,
+                   date_window: Optional[int] = 30, direction: Optional[str] = None,
+                   max_parts: int = 3, max_candidates: int = 40, max_scan: int = 400,
+                   max_results: int = 10) -> List[MatchCandidate]:
+        """
+        Many-to-one: several transactions that together pay one invoice.
+
+        Rows are taken nearest in date first from the date index (or, with
+        no date, nearest below the invoice amount from the amount index),
+        looking at no more than `max_scan` rows and keeping the first
+        `max_candidates` that are no larger than the invoice. The subset-sum
+        search is bounded by `max_parts`, so the cost per invoice does not
+        grow with the statement.
+        """
+        target = abs(to_paise(amount))
+        tol = to_paise(tolerance)
+        day = _to_ordinal(date)
+        if day is not None:
+            nearby: Iterable[int] = _nearest(self._days, self._day_positions, day, date_window)
+        else:
+            nearby = (self._positions[i] for i in reversed(self._range(1, target + tol)))
+        pool = []
+        for pos in islice(nearby, max_scan):
+            paise = self._paise[pos]
+            if paise and paise <= target + tol and self._accept(pos, None, None, direction):
+                pool.append(pos)
+                if len(pool) == max_candidates:
+                    break
+        pool.sort(key=lambda p: -self._paise[p])
+        values = [self._paise[p] for p in pool]
+
+        found: List[List[int]] = []
+
+        def search(start: int, remaining: int, chosen: List[int]) -> None:
+            if len(found) >= max_results * 4:
+                return
+            if abs(remaining) <= tol and len(chosen) >= 2:
+                found.append(list(chosen))
+                return
+            if len(chosen) == max_parts:
+                return
+            for i in range(start, len(values)):
+                if values[i] > remaining + tol:
+                    continue
+                chosen.append(pool[i])
+                search(i + 1, remaining - values[i], chosen)
+                chosen.pop()
+
+        search(0, target, [])
+        candidates = [self._candidate("split", sorted(c), target, day) for c in found]
+        candidates.sort(key=lambda c: c.rank_key)
+        return candidates[:max_results]
+
+    def find_consolidated(self, invoices: Sequence[Tuple[str, float]], tolerance: float = 0.0,
+                          date: DateLike = None, date_window: Optional[int] = 30,
+                          direction: Optional[str] = None, max_parts: int = 3,
+                          max_combinations: int = 20000) -> List[MatchCandidate]:
+        """
+        One-to-many: a single transaction that pays several invoices at once.
+
+        Each combination of 2..`max_parts` invoices is looked up with a bisect,
+        stopping after `max_combinations` combinations.
+        """
+        tol = to_paise(tolerance)
+        day = _to_ordinal(date)
+        paise = [(inv_id, abs(to_paise(amt))) for inv_id, amt in invoices]
+        candidates = []
+        budget = max_combinations
+        for size in range(2, max_parts + 1):
+            for combo in combinations(paise, size):
+                budget -= 1
+                if budget < 0:
+                    break
+                target = sum(amt for _, amt in combo)
+                for i in self._range(target - tol, target + tol):
+                    pos = self._positions[i]
+                    if self._accept(pos, day, date_window, direction):
+                        candidates.append(self._candidate(
+                            "consolidated", [pos], target, day, invoice_ids=[inv_id for inv_id, _ in combo]))
+        candidates.sort(key=lambda c: c.rank_key)
+        return candidates
+
+    def match(self, amount: float, tolerance: float = 0.0, date: DateLike = None,
+              date_window: Optional[int] = None, direction: Optional[str] = None,
+              allow_split: bool = True, max_parts: int = 3) -> List[MatchCandidate]:
+        """All single and split-payment candidates for one invoice, best first."""
+        candidates = self.find(amount, tolerance, date, date_window, direction)
+        if allow_split:
+            candidates += self.find_split(
+                amount, tolerance, date, date_window if date_window is not None else 30,
+                direction, max_parts=max_parts)
+        candidates.sort(key=lambda c: c.rank_key)
+        return candidates
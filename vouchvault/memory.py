@@ -1,41 +1,283 @@
-"""Simple audit memory for tracking processed invoices (Day 3 capability)."""
+"""Audit memory for tracking processed invoices (Day 3 capability)."""
+import hashlib
+import math
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional, List
+from itertools import islice
+from typing import Deque, Dict, Iterator, List, Optional, Set, Union
 
-@dataclass
+_COLUMNS = "invoice_id, vendor, amount, status, timestamp, notes, invoice_date"
+
+
+@dataclass(slots=True)
 class AuditRecord:
-    """Record of a completed audit."""
+    """Record of a completed audit. `timestamp` is in epoch seconds."""
     invoice_id: str
     vendor: str
     amount: float
     status: str
-    timestamp: str = field(default_factory=lambda: datetime.now().isoformat())
+    timestamp: int = field(default_factory=lambda: int(time.time()))
     notes: Optional[str] = None
+    invoice_date: Optional[str] = None  # ISO date printed on the invoice, when known
+
+    def __post_init__(self):
+        # A few vendors and statuses repeat across millions of records; keep one copy of each
+        self.vendor = sys.intern(self.vendor)
+        self.status = sys.intern(self.status)
+        if isinstance(self.timestamp, str):  # Read back from a TEXT column, or ISO text from older versions
+            text = self.timestamp
+            self.timestamp = int(text) if text.isdigit() else int(datetime.fromisoformat(text).timestamp())
+
+    @property
+    def recorded_at(self) -> datetime:
+        return datetime.fromtimestamp(self.timestamp)
+
+
+def normalize_vendor(vendor: str) -> str:
+    """Lowercase and collapse punctuation/whitespace: 'ABC Services, Pvt.' -> 'abc services pvt'."""
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", vendor.lower()).split())
+
 
 class AuditMemory:
-    """Short-term memory for audit session."""
-    
-    def __init__(self):
-        self._records: List[AuditRecord] = []
-    
+    """
+    Short-term, in-process memory for an audit session.
+
+    With a `capacity`, only the latest `capacity` records are kept (a ring
+    buffer), so a long-running worker stays at a flat memory footprint.
+    IDs of evicted records go into a Bloom filter sized for
+    `expected_records`, so has_duplicate never misses a re-submitted
+    invoice but may rarely flag a new one.
+    """
+
+    def __init__(self, capacity: Optional[int] = None, expected_records: int = 1_000_000):
+        self.capacity = capacity
+        self._records: Deque[AuditRecord] = deque()
+        self._first = 0  # Sequence number of _records[0]
+        self._ids: Set[str] = set()
+        self._evicted = BloomFilter(expected_records) if capacity is not None else None
+        self._by_vendor: Dict[str, Deque[int]] = {}
+        self._by_key: Dict[str, Deque[int]] = {}
+
     def add_record(self, record: AuditRecord) -> None:
-        """Add a new audit record to memory."""
+        """Add a new audit record to memory, evicting the oldest one when full."""
+        seq = self._first + len(self._records)
+        self._by_vendor.setdefault(record.vendor.lower(), deque()).append(seq)
+        self._by_key.setdefault(normalize_vendor(record.vendor), deque()).append(seq)
         self._records.append(record)
-    
-    def get_by_vendor(self, vendor: str) -> List[AuditRecord]:
-        """Retrieve past audits for a vendor (useful for pattern detection)."""
-        return [r for r in self._records if vendor.lower() in r.vendor.lower()]
-    
+        self._ids.add(record.invoice_id)
+        if self.capacity is not None and len(self._records) > self.capacity:
+            self._evict()
+
+    def _evict(self) -> None:
+        record = self._records.popleft()
+        self._first += 1
+        # The oldest record is first in its vendor lists
+        for index, name in ((self._by_vendor, record.vendor.lower()), (self._by_key, normalize_vendor(record.vendor))):
+            positions = index[name]
+            positions.popleft()
+            if not positions:
+                del index[name]
+        self._ids.discard(record.invoice_id)
+        self._evicted.add(record.invoice_id)
+
+    def get_by_vendor(self, vendor: str, exact: bool = False) -> List[AuditRecord]:
+        """
+        Retrieve past audits for a vendor (useful for pattern detection).
+
+        Matches vendors containing `vendor`, or with `exact` only vendors
+        whose normalized name is equal to it.
+        """
+        if exact:
+            positions = self._by_key.get(normalize_vendor(vendor), [])
+        else:
+            needle = vendor.lower()
+            positions = sorted(p for name, ps in self._by_vendor.items() if needle in name for p in ps)
+        return [self._records[p - self._first] for p in positions]
+
     def get_recent(self, n: int = 5) -> List[AuditRecord]:
         """Get the most recent N audits."""
-        return self._records[-n:]
-    
+        return list(islice(reversed(self._records), max(n, 0)))[::-1]
+
+    def iter_records(self) -> Iterator[AuditRecord]:
+        """Records still held, oldest first."""
+        return iter(list(self._records))
+
     def has_duplicate(self, invoice_id: str) -> bool:
         """Check if invoice was already processed."""
-        return any(r.invoice_id == invoice_id for r in self._records)
-    
+        return invoice_id in self._ids or (self._evicted is not None and invoice_id in self._evicted)
+
+    @property
+    def total_processed(self) -> int:
+        """Total number of processed invoices, including evicted ones."""
+        return self._first + len(self._records)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings; no false negatives."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.capacity = max(capacity, 1)
+        self.size = max(8, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class SQLiteAuditMemory:
+    """
+    Persistent audit memory in a SQLite file, shareable between processes.
+
+    Records are indexed on invoice_id and normalized vendor. Writes are
+    buffered and committed `batch_size` at a time in one transaction; reads
+    flush first. Duplicate checks go through a Bloom filter, which is
+    topped up with rows other processes have written since the last check,
+    so most misses never touch the database. Safe to share between threads.
+    """
+
+    def __init__(self, path: str = ":memory:", batch_size: int = 100, expected_records: int = 100_000):
+        self.path = path
+        self.batch_size = batch_size
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._lock = threading.RLock()  # One connection shared by worker threads
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS audits ("
+                "invoice_id TEXT NOT NULL, vendor TEXT NOT NULL, vendor_key TEXT NOT NULL, "
+                "amount REAL NOT NULL, status TEXT NOT NULL, timestamp NOT NULL, notes TEXT, invoice_date TEXT)"
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(audits)")}
+            if "invoice_date" not in columns:  # Databases created before invoice dates were kept
+                self._conn.execute("ALTER TABLE audits ADD COLUMN invoice_date TEXT")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS audits_invoice_id ON audits (invoice_id)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS audits_vendor_key ON audits (vendor_key)")
+        self._pending: List[AuditRecord] = []
+        self._pending_ids: Set[str] = set()
+        self._bloom = BloomFilter(expected_records)
+        self._seen_rowid = 0
+
+    def add_record(self, record: AuditRecord) -> None:
+        """Queue a record; it is written with the next batch."""
+        with self._lock:
+            self._pending.append(record)
+            self._pending_ids.add(record.invoice_id)
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+
+    def flush(self) -> None:
+        """Write all queued records in a single transaction."""
+        with self._lock:
+            if not self._pending:
+                return
+            with self._conn:
+                self._conn.executemany(
+                    f"INSERT INTO audits (vendor_key, {_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(normalize_vendor(r.vendor), r.invoice_id, r.vendor, r.amount, r.status, r.timestamp, r.notes,
+                      r.invoice_date) for r in self._pending],
+                )
+            self._pending = []
+            self._pending_ids = set()
+
+    def _refresh_bloom(self) -> None:
+        rows = self._conn.execute(
+            "SELECT rowid, invoice_id FROM audits WHERE rowid > ? ORDER BY rowid", (self._seen_rowid,)
+        ).fetchall()
+        if not rows:
+            return
+        if self._bloom.count + len(rows) > self._bloom.capacity:
+            # Rebuild at double size so the false-positive rate stays bounded
+            self._bloom = BloomFilter(2 * (self._bloom.count + len(rows)))
+            self._seen_rowid = 0
+            rows = self._conn.execute("SELECT rowid, invoice_id FROM audits ORDER BY rowid").fetchall()
+        for rowid, invoice_id in rows:
+            self._bloom.add(invoice_id)
+        self._seen_rowid = rows[-1][0]
+
+    def has_duplicate(self, invoice_id: str) -> bool:
+        """Check if invoice was already processed, by this or any other process."""
+        with self._lock:
+            if invoice_id in self._pending_ids:
+                return True
+            self._refresh_bloom()
+            if invoice_id not in self._bloom:
+                return False
+            row = self._conn.execute("SELECT 1 FROM audits WHERE invoice_id = ? LIMIT 1", (invoice_id,)).fetchone()
+            return row is not None
+
+    def get_by_vendor(self, vendor: str, exact: bool = False) -> List[AuditRecord]:
+        """Past audits for a vendor; `exact` uses the normalized-vendor index."""
+        with self._lock:
+            self.flush()
+            if exact:
+                rows = self._conn.execute(
+                    f"SELECT {_COLUMNS} FROM audits WHERE vendor_key = ? ORDER BY rowid", (normalize_vendor(vendor),))
+            else:
+                rows = self._conn.execute(
+                    f"SELECT {_COLUMNS} FROM audits WHERE instr(lower(vendor), ?) > 0 ORDER BY rowid", (vendor.lower(),))
+            return [AuditRecord(*row) for row in rows]
+
+    def get_recent(self, n: int = 5) -> List[AuditRecord]:
+        """Get the most recent N audits."""
+        with self._lock:
+            self.flush()
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM audits ORDER BY rowid DESC LIMIT ?", (n,)).fetchall()
+            return [AuditRecord(*row) for row in reversed(rows)]
+
+    def iter_records(self, page_size: int = 10_000) -> Iterator[AuditRecord]:
+        """All records, oldest first, read `page_size` at a time so large histories stream."""
+        last = 0
+        while True:
+            with self._lock:
+                self.flush()
+                rows = self._conn.execute(
+                    f"SELECT rowid, {_COLUMNS} FROM audits WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                    (last, page_size)).fetchall()
+            if not rows:
+                return
+            last = rows[-1][0]
+            for row in rows:
+                yield AuditRecord(*row[1:])
+
     @property
     def total_processed(self) -> int:
         """Total number of processed invoices."""
-        return len(self._records)
+        with self._lock:
+            self.flush()
+            return self._conn.execute("SELECT COUNT(*) FROM audits").fetchone()[0]
+
+    def close(self) -> None:
+        """Flush queued records and close the database."""
+        with self._lock:
+            self.flush()
+            self._conn.close()
+
+    def __enter__(self) -> "SQLiteAuditMemory":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+AuditStore = Union[AuditMemory, SQLiteAuditMemory]
@@ -0,0 +1,165 @@
+"""Rate limiting, quota backoff and deadlines for model calls shared across threads."""
+import contextvars
+import random
+import sys
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Callable, Optional, Set, TypeVar
+
+T = TypeVar("T")
+
+
+class QuotaExceeded(Exception):
+    """Raised by stand-in models to simulate a 429 / quota error."""
+
+
+def is_quota_error(error: BaseException) -> bool:
+    if isinstance(error, QuotaExceeded):
+        return True
+    # Only a loaded SDK can have raised its own errors, so never import it here
+    google_exceptions = sys.modules.get("google.api_core.exceptions")
+    return google_exceptions is not None and isinstance(
+        error, (google_exceptions.ResourceExhausted, google_exceptions.TooManyRequests))
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` calls per second on average, with
+    bursts of up to `capacity` calls.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Take one token, waiting up to `timeout` seconds. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+
+def call_with_backoff(fn: Callable[[], T], retries: int = 5, base_delay: float = 1.0,
+                      max_delay: float = 30.0, deadline: Optional[float] = None) -> T:
+    """
+    Call `fn`, retrying quota errors with exponential backoff and jitter.
+
+    `deadline` is a time.monotonic() value; no retry sleeps past it.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return fn()
+        except Exception as e:
+            if not is_quota_error(e) or attempt == retries:
+                raise
+            delay = min(max_delay, base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+            if deadline is not None and time.monotonic() + delay > deadline:
+                raise TimeoutError("Audit timed out while backing off from quota errors") from e
+            time.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+MAX_ABANDONED_CALLS = 16  # Timed-out calls still running before new timed calls are refused
+
+_abandoned: "Set[Future]" = set()
+
+
+def call_with_timeout(fn: Callable[[], T], timeout: Optional[float]) -> T:
+    """
+    Call `fn`, giving up after `timeout` seconds.
+
+    The call runs on a daemon thread, in a copy of the caller's context so
+    timed_tool still charges the active audit, and a request that never
+    returns cannot hold the caller (or keep the process alive). A timed-out
+    call is abandoned, not killed: its thread runs until the request
+    returns. At most MAX_ABANDONED_CALLS may be left running; past that,
+    new calls fail at once with TimeoutError instead of piling up threads.
+    """
+    if timeout is None:
+        return fn()
+    abandoned = _abandoned
+    if len(abandoned) >= MAX_ABANDONED_CALLS:
+        raise TimeoutError(f"{len(abandoned)} timed-out model calls are still running")
+    future: "Future[T]" = Future()
+    context = contextvars.copy_context()
+
+    def run() -> None:
+        try:
+            future.set_result(context.run(fn))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="vouchvault-model-call", daemon=True).start()
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeout:
+        abandoned.add(future)
+        future.add_done_callback(abandoned.discard)  # Runs at once if the call has just finished
+        raise TimeoutError(f"Model call did not return within {timeout:.3g}s") from None
+
+
+class LimitedAnalyst:
+    """
+    Wraps an analyst so every model call takes a token from a shared bucket,
+    backs off on quota errors and respects a per-audit deadline. A call
+    still running at the deadline is abandoned and the analyst reset, so
+    its late reply cannot leak into the next audit.
+    """
+
+    def __init__(self, analyst, limiter: Optional[TokenBucket] = None, timeout: Optional[float] = None,
+                 retries: int = 5, base_delay: float = 1.0):
+        self.analyst = analyst
+        self.limiter = limiter
+        self.timeout = timeout
+        self.retries = retries
+        self.base_delay = base_delay
+        self._deadline: Optional[float] = None
+
+    def reset(self) -> None:
+        """Start a fresh chat and a fresh deadline for the next audit."""
+        self.analyst.reset()
+        self._deadline = None if self.timeout is None else time.monotonic() + self.timeout
+
+    def _remaining(self) -> Optional[float]:
+        if self._deadline is None:
+            return None
+        remaining = self._deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"Audit exceeded {self.timeout}s")
+        return remaining
+
+    def _call(self, fn: Callable[[str], T], message: str) -> T:
+        if self.limiter is not None and not self.limiter.acquire(timeout=self._remaining()):
+            raise TimeoutError(f"Audit exceeded {self.timeout}s waiting for the rate limiter")
+        try:
+            return call_with_backoff(lambda: call_with_timeout(lambda: fn(message), self._remaining()),
+                                     self.retries, self.base_delay, deadline=self._deadline)
+        except TimeoutError:
+            self.analyst.reset()
+            raise
+
+    def analyze(self, prompt: str):
+        return self._call(self.analyst.analyze, prompt)
+
+    def inject_message(self, message: str):
+        return self._call(self.analyst.inject_message, message)
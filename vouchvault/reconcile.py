@@ -0,0 +1,305 @@
+"""Incremental reconciliation of open invoices against a live bank feed."""
+import csv
+import heapq
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+from datetime import date as Date, timedelta
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .compliance import TDS_SECTIONS
+from .invoice import Invoice
+from .matching import to_paise
+from .memory import AuditRecord, AuditStore, normalize_vendor
+from .tools import fuzzy_match_vendor
+
+DUE_DAYS = 30
+MATCHED, PARTIAL, OVERDUE = "matched", "partial", "overdue"
+# Words too common in vendor names and bank narrations to pick out a vendor
+_GENERIC_WORDS = frozenset({
+    "pvt", "ltd", "private", "limited", "inc", "co", "corp", "company", "llp", "and", "the",
+    "services", "neft", "imps", "rtgs", "upi", "to", "from", "transfer", "payment",
+})
+
+
+@dataclass
+class OpenItem:
+    """An invoice still waiting for (full) payment. Amounts in paise."""
+    invoice_id: str
+    vendor: str
+    total: int
+    subtotal: Optional[int] = None
+    paid: int = 0
+    due: Optional[str] = None  # ISO date after which the invoice is overdue
+    overdue: bool = False
+
+    @property
+    def outstanding(self) -> int:
+        return self.total - self.paid
+
+
+@dataclass
+class ReconcileEvent:
+    """A state change of one invoice, caused by a bank row or by the clock passing its due date."""
+    kind: str                    # MATCHED, PARTIAL or OVERDUE
+    invoice_id: str
+    vendor: str
+    outstanding: float           # Still unpaid after this event, in rupees
+    row: Optional[Dict] = None   # The bank row that paid it (None for OVERDUE)
+
+
+def _words(text: str) -> Set[str]:
+    return {w for w in normalize_vendor(text).split() if w not in _GENERIC_WORDS and not w.isdigit()}
+
+
+def _row_debit(row: Dict) -> Optional[int]:
+    """Paise debited by a bank row, or None for credits and unreadable amounts."""
+    try:
+        paise = to_paise(row.get("amount") or "")
+    except ValueError:
+        return None
+    kind = str(row.get("type") or "").strip().upper()
+    if kind == "CREDIT" or (kind != "DEBIT" and paise >= 0):
+        return None
+    return abs(paise)
+
+
+class Reconciler:
+    """
+    Keeps the open invoices and settles them as bank rows arrive.
+
+    Open items are indexed by every amount that would settle them in one
+    payment (the outstanding balance and, before any payment, the total
+    less TDS at each standard rate) and by the distinctive words of the
+    vendor name. A debit is MATCHED to an open item with that amount whose
+    vendor appears in the narration; otherwise a smaller debit naming the
+    vendor is a PARTIAL payment on its oldest open invoice. Rows carry the
+    clock forward and invoices past their due date are reported OVERDUE
+    once. Settled invoices are dropped, so memory grows with the open set
+    only.
+    """
+
+    def __init__(self, due_days: int = DUE_DAYS):
+        self.due_days = due_days
+        self.items: Dict[str, OpenItem] = {}
+        self.clock: Optional[str] = None      # Latest row date seen
+        self.position: int = 0                # Opaque feed position (byte offset for tail_csv)
+        self.rows_seen: int = 0
+        self._by_amount: Dict[int, Set[str]] = {}
+        self._by_word: Dict[str, Set[str]] = {}
+        self._due: List[Tuple[str, str]] = []  # Heap of (due date, invoice_id)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def add_invoice(self, invoice: Invoice, due: Optional[str] = None) -> Optional[OpenItem]:
+        """Open an invoice. Invoices without an ID or total, or already open, are ignored."""
+        if not invoice.invoice_id or invoice.total is None or invoice.invoice_id in self.items:
+            return None
+        if due is None and invoice.date:
+            due = (Date.fromisoformat(invoice.date) + timedelta(days=self.due_days)).isoformat()
+        item = OpenItem(
+            invoice_id=invoice.invoice_id,
+            vendor=invoice.vendor or "",
+            total=to_paise(invoice.total),
+            subtotal=to_paise(invoice.subtotal) if invoice.subtotal is not None else None,
+            due=due,
+        )
+        self._open(item)
+        return item
+
+    def _amounts(self, item: OpenItem) -> Set[int]:
+        amounts = {item.outstanding}
+        if item.paid == 0 and item.subtotal is not None:
+            amounts.update(item.total - (item.subtotal * round(rate * 10_000) + 5_000) // 10_000
+                           for rate in TDS_SECTIONS.values())
+        return amounts
+
+    def _open(self, item: OpenItem) -> None:
+        self.items[item.invoice_id] = item
+        self._index(item)
+        for word in _words(item.vendor):
+            self._by_word.setdefault(word, set()).add(item.invoice_id)
+        if item.due and not item.overdue:
+            heapq.heappush(self._due, (item.due, item.invoice_id))
+
+    def _index(self, item: OpenItem) -> None:
+        for amount in self._amounts(item):
+            self._by_amount.setdefault(amount, set()).add(item.invoice_id)
+
+    def _unindex(self, item: OpenItem) -> None:
+        for amount in self._amounts(item):
+            ids = self._by_amount.get(amount)
+            if ids is not None:
+                ids.discard(item.invoice_id)
+                if not ids:
+                    del self._by_amount[amount]
+
+    def _close(self, item: OpenItem) -> None:
+        self._unindex(item)
+        for word in _words(item.vendor):
+            ids = self._by_word.get(word)
+            if ids is not None:
+                ids.discard(item.invoice_id)
+                if not ids:
+                    del self._by_word[word]
+        del self.items[item.invoice_id]
+
+    def _names_vendor(self, item: OpenItem, description: str) -> bool:
+        return not item.vendor or fuzzy_match_vendor(item.vendor, description)["match_found"]
+
+    def _oldest(self, ids: Iterable[str]) -> OpenItem:
+        return min((self.items[i] for i in ids), key=lambda item: (item.due or "", item.invoice_id))
+
+    def process(self, row: Dict) -> List[ReconcileEvent]:
+        """Apply one bank row and return the events it caused."""
+        self.rows_seen += 1
+        events = []
+        day = str(row.get("date") or "").strip()
+        if day and (self.clock is None or day > self.clock):
+            self.clock = day
+            events += self._expire()
+
+        paise = _row_debit(row)
+        if paise is None:
+            return events
+        description = str(row.get("description") or "")
+
+        exact = [self.items[i] for i in self._by_amount.get(paise, ())]
+        exact = [item for item in exact if self._names_vendor(item, description)]
+        if exact:
+            item = self._oldest(i.invoice_id for i in exact)
+            self._close(item)
+            item.paid = item.total
+            events.append(ReconcileEvent(MATCHED, item.invoice_id, item.vendor, 0.0, row))
+            return events
+
+        named = {i for word in _words(description) for i in self._by_word.get(word, ())}
+        named = [i for i in named if paise < self.items[i].outstanding
+                 and self._names_vendor(self.items[i], description)]
+        if named:
+            item = self._oldest(named)
+            self._unindex(item)
+            item.paid += paise
+            self._index(item)
+            events.append(ReconcileEvent(PARTIAL, item.invoice_id, item.vendor, item.outstanding / 100, row))
+        return events
+
+    def _expire(self) -> List[ReconcileEvent]:
+        events = []
+        while self._due and self._due[0][0] < self.clock:
+            _, invoice_id = heapq.heappop(self._due)
+            item = self.items.get(invoice_id)
+            if item is not None and not item.overdue:
+                item.overdue = True
+                events.append(ReconcileEvent(OVERDUE, invoice_id, item.vendor, item.outstanding / 100))
+        return events
+
+    def consume(self, rows: Iterable[Tuple[Dict, int]], checkpoint: Optional[str] = None,
+                checkpoint_every: int = 1000,
+                before_save: Optional[Callable[[], None]] = None) -> Iterator[ReconcileEvent]:
+        """
+        Process (row, position) pairs, yielding events as they happen.
+
+        With `checkpoint`, state is saved once a row's events have been
+        handled by the caller (before the next row is read), every
+        `checkpoint_every` quiet rows, and when the feed ends. A run that
+        dies while handling a row's events resumes before that row, so its
+        events are delivered again; pair with record_match to keep memory
+        writes idempotent. `before_save` runs before every save, e.g. to
+        flush buffered memory writes so no checkpoint gets ahead of them.
+        """
+        def save() -> None:
+            if before_save is not None:
+                before_save()
+            self.save(checkpoint)
+
+        since_save = 0
+        handled = True
+        try:
+            for row, position in rows:
+                events = self.process(row)
+                self.position = position
+                since_save += 1
+                handled = False
+                yield from events
+                handled = True
+                if checkpoint and (events or since_save >= checkpoint_every):
+                    save()
+                    since_save = 0
+        finally:
+            if checkpoint and handled:
+                save()
+
+    def to_dict(self) -> dict:
+        return {
+            "due_days": self.due_days,
+            "clock": self.clock,
+            "position": self.position,
+            "rows_seen": self.rows_seen,
+            "items": [asdict(item) for item in self.items.values()],
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "Reconciler":
+        reconciler = cls(due_days=state.get("due_days", DUE_DAYS))
+        reconciler.clock = state.get("clock")
+        reconciler.position = state.get("position", 0)
+        reconciler.rows_seen = state.get("rows_seen", 0)
+        for fields in state.get("items", []):
+            reconciler._open(OpenItem(**fields))
+        return reconciler
+
+    def save(self, path: str) -> None:
+        """Write the checkpoint atomically (write, then rename over the old one)."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, due_days: int = DUE_DAYS) -> "Reconciler":
+        """Resume from a checkpoint, or start empty if there is none yet."""
+        if not os.path.exists(path):
+            return cls(due_days=due_days)
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+def record_match(memory: AuditStore, event: ReconcileEvent) -> bool:
+    """Record a MATCHED event in audit memory once; False if it was already there (e.g. replayed after a crash)."""
+    if event.kind != MATCHED or memory.has_duplicate(event.invoice_id):
+        return False
+    memory.add_record(AuditRecord(invoice_id=event.invoice_id, vendor=event.vendor or "Detected Vendor",
+                                  amount=abs(float(event.row["amount"])), status="PASS",
+                                  notes="Reconciled from bank feed"))
+    return True
+
+
+def tail_csv(path: str, position: int = 0, follow: bool = False,
+             poll: float = 1.0) -> Iterator[Tuple[Dict, int]]:
+    """
+    Yield (row, position) for each CSV line after byte `position`.
+
+    Feed rows must be one line each. With `follow`, keep waiting for rows
+    appended to the file (like `tail -f`); a partially written last line
+    is held back until its newline arrives.
+    """
+    with open(path, "rb") as f:
+        header = [name.strip().lower() for name in next(csv.reader([f.readline().decode("utf-8")]), [])]
+        if position > f.tell():
+            f.seek(position)
+        while True:
+            start = f.tell()
+            line = f.readline()
+            if not line or (follow and not line.endswith(b"\n")):
+                # End of the feed so far, or a line still being written
+                if not follow:
+                    return
+                f.seek(start)
+                time.sleep(poll)
+                continue
+            if line.strip():
+                cells = next(csv.reader([line.decode("utf-8")]))
+                yield {name: cells[i].strip() if i < len(cells) else "" for i, name in enumerate(header)}, f.tell()
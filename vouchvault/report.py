@@ -0,0 +1,154 @@
+"""Columnar audit reports (Parquet, Arrow IPC or CSV), written in bulk row groups."""
+import csv
+import os
+import warnings
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .evaluation import STAGES, AuditMetrics
+
+ROW_GROUP_SIZE = 50_000  # Audits buffered before a row group is written
+FORMATS = {".parquet": "parquet", ".arrow": "arrow", ".feather": "arrow", ".csv": "csv"}
+
+_Column = Tuple[str, str, Callable[[AuditMetrics], Any]]
+# (name, type, value); types are "string", "int64", "float64" or "bool"
+COLUMNS: Tuple[_Column, ...] = (
+    ("invoice_id", "string", lambda m: m.invoice_id),
+    ("vendor", "string", lambda m: m.vendor),
+    ("status", "string", lambda m: m.status),
+    ("path", "string", lambda m: m.path),
+    ("attempts", "int64", lambda m: m.attempts),
+    ("model_calls", "int64", lambda m: m.model_calls),
+    ("invoice_total", "float64", lambda m: m.invoice_total),
+    ("match_date", "string", lambda m: m.match_date),
+    ("match_description", "string", lambda m: m.match_description),
+    ("match_amount", "float64", lambda m: m.match_amount),
+    ("difference", "float64", lambda m: m.difference),
+    ("tax_compliant", "bool", lambda m: m.tax_compliant),
+    ("vendor_matched", "bool", lambda m: m.vendor_matched),
+    ("amount_matched", "bool", lambda m: m.amount_matched),
+    ("prompt_tokens", "int64", lambda m: sum(m.prompt_tokens)),
+    ("response_tokens", "int64", lambda m: sum(m.response_tokens)),
+    ("tokens_estimated", "bool", lambda m: m.tokens_estimated if m.token_sources else None),
+    ("duration_ms", "float64", lambda m: m.elapsed_ns / 1e6 if m.elapsed_ns is not None else None),
+    *((f"{stage}_ms", "float64", lambda m, stage=stage: m.stage_ns[stage] / 1e6 if stage in m.stage_ns else None)
+      for stage in STAGES),
+    ("anomalies", "string", lambda m: "; ".join(m.anomalies) or None),
+    ("trail", "string", lambda m: "; ".join(m.trail) or None),
+)
+_ARROW_TYPES = {"string": "string", "int64": "int64", "float64": "float64", "bool": "bool_"}
+NAMES = ("source", "error") + tuple(name for name, _, _ in COLUMNS)
+TYPES = {"source": "string", "error": "string", **{name: kind for name, kind, _ in COLUMNS}}
+
+
+def _part_path(path: str) -> str:
+    """First unused `name-00001.ext` next to `path`, for appending to a columnar report."""
+    stem, ext = os.path.splitext(path)
+    part = 1
+    while os.path.exists(f"{stem}-{part:05d}{ext}"):
+        part += 1
+    return f"{stem}-{part:05d}{ext}"
+
+
+class ReportWriter:
+    """
+    Buffers audit outcomes and writes them out `row_group_size` at a time.
+
+    The format follows the file extension: .parquet and .arrow/.feather
+    need pyarrow; without it the report falls back to CSV next to the
+    requested path (with a warning). Each flush becomes one Parquet row
+    group or Arrow record batch, so memory holds one group at most.
+
+    With `append`, CSV rows go to the end of an existing file. A columnar
+    file cannot be reopened for writing, so new rows go to the next free
+    `name-00001.parquet` part beside it; read the parts together with
+    `pyarrow.dataset.dataset([...])` or a `name*.parquet` glob.
+    """
+
+    def __init__(self, path: str, row_group_size: int = ROW_GROUP_SIZE, append: bool = False,
+                 fmt: Optional[str] = None):
+        fmt = fmt or FORMATS.get(os.path.splitext(path)[1].lower(), "csv")
+        if fmt != "csv":
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                path = os.path.splitext(path)[0] + ".csv"
+                warnings.warn(f"pyarrow is not installed; writing the {fmt} report as CSV to {path}")
+                fmt = "csv"
+        if fmt != "csv" and append and os.path.exists(path):
+            path = _part_path(path)
+        self.path = path
+        self.format = fmt
+        self.row_group_size = row_group_size
+        self.append = append
+        self.rows_written = 0
+        self._buffer: Dict[str, List[Any]] = {name: [] for name in NAMES}
+        self._pending = 0
+        self._writer = None
+        self._file = None
+
+    def add(self, metrics: Optional[AuditMetrics], source: str = "", error: Optional[str] = None) -> None:
+        """Buffer one audit (or a source that failed before an audit started)."""
+        self._buffer["source"].append(source)
+        self._buffer["error"].append(error)
+        for name, _, value in COLUMNS:
+            self._buffer[name].append(value(metrics) if metrics is not None else None)
+        self._pending += 1
+        if self._pending >= self.row_group_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered audits as one row group."""
+        if not self._pending:
+            return
+        if self.format == "csv":
+            self._write_csv()
+        else:
+            self._write_arrow()
+        self.rows_written += self._pending
+        self._buffer = {name: [] for name in NAMES}
+        self._pending = 0
+
+    def _write_csv(self) -> None:
+        if self._file is None:
+            exists = self.append and os.path.exists(self.path) and os.path.getsize(self.path) > 0
+            self._file = open(self.path, "a" if self.append else "w", encoding="utf-8", newline="")
+            self._writer = csv.writer(self._file, lineterminator="\n")
+            if not exists:
+                self._writer.writerow(NAMES)
+        columns = [self._buffer[name] for name in NAMES]
+        self._writer.writerows(
+            ["" if v is None else ("true" if v else "false") if isinstance(v, bool) else v for v in row]
+            for row in zip(*columns))
+
+    def _write_arrow(self) -> None:
+        import pyarrow as pa
+
+        schema = pa.schema([(name, getattr(pa, _ARROW_TYPES[TYPES[name]])()) for name in NAMES])
+        table = pa.table({name: pa.array(self._buffer[name], type=schema.field(name).type) for name in NAMES},
+                         schema=schema)
+        if self._writer is None:
+            if self.format == "parquet":
+                import pyarrow.parquet as pq
+                self._writer = pq.ParquetWriter(self.path, schema)
+            else:
+                self._file = pa.OSFile(self.path, "wb")
+                self._writer = pa.ipc.new_file(self._file, schema)
+        if self.format == "parquet":
+            self._writer.write_table(table, row_group_size=self.row_group_size)
+        else:
+            self._writer.write_table(table, max_chunksize=self.row_group_size)
+
+    def close(self) -> None:
+        """Write what is buffered and close the file."""
+        self.flush()
+        if self._writer is not None and self.format != "csv":
+            self._writer.close()
+        if self._file is not None:
+            self._file.close()
+        self._writer = self._file = None
+
+    def __enter__(self) -> "ReportWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,132 @@
+"""Deterministic pre-checks that settle clear-cut audits without the model."""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from .compliance import TDS_SECTIONS
+from .invoice import Invoice
+from .matching import DEBIT, MatchCandidate, StatementIndex
+from .statement import BankStatement
+from .tools import calculate_tax_compliance, fuzzy_match_vendor
+from .vendors import VendorIndex
+
+TDS_RATES = tuple(TDS_SECTIONS.values())
+NEAR_MISS_TOLERANCE = 50.0  # Gaps below this may be a discount the model can explain
+GAP_TOLERANCE = 0.2  # Debits further than this share of the total from it cannot explain a failed audit
+
+
+@dataclass
+class RuleDecision:
+    """Outcome of the pre-checks. A status of None means the model must decide."""
+    status: Optional[str]
+    reason: str
+    tax_compliant: Optional[bool] = None
+    vendor_matched: Optional[bool] = None
+    amount_matched: Optional[bool] = None
+    match: Optional[MatchCandidate] = None  # The debit that paid the invoice, or the closest one
+
+    @property
+    def decided(self) -> bool:
+        return self.status is not None
+
+
+@lru_cache(maxsize=4)
+def statement_indexes(statement: BankStatement):
+    """Amount and vendor indexes, built once per statement and shared across invoices."""
+    return StatementIndex.from_statement(statement), VendorIndex.from_statement(statement)
+
+
+def _tax_compliant(invoice: Invoice) -> Optional[bool]:
+    if invoice.subtotal is None or invoice.tax is None:
+        return None
+    return calculate_tax_compliance(invoice.subtotal, invoice.tax, invoice.tax_rate)["is_compliant"]
+
+
+def _vendor_payment(invoice: Invoice, amounts: StatementIndex,
+                    date_window: Optional[int]) -> Tuple[Optional[str], Optional[MatchCandidate]]:
+    """The first expected amount (total, then total less TDS) debited to the vendor: (label, debit)."""
+    if not invoice.vendor:
+        return None, None
+    expected = [(invoice.total, "exact amount")]
+    if invoice.subtotal is not None:
+        expected += [(invoice.total - round(invoice.subtotal * rate, 2), f"TDS at {rate:.0%}") for rate in TDS_RATES]
+    for amount, label in expected:
+        for candidate in amounts.find(amount, date=invoice.date, date_window=date_window, direction=DEBIT):
+            if fuzzy_match_vendor(invoice.vendor, candidate.records[0]["description"])["match_found"]:
+                return label, candidate
+    return None, None
+
+
+def _paid(label: str, match: MatchCandidate, tax_compliant: Optional[bool]) -> RuleDecision:
+    """A debit to the vendor pays the invoice; PASS only once the GST has been checked too."""
+    if not tax_compliant:
+        return RuleDecision(None, f"Debit to vendor matches {label}, but the GST could not be checked",
+                            vendor_matched=True, amount_matched=True, match=match)
+    return RuleDecision("PASS", f"Debit to vendor matches {label}", tax_compliant=True,
+                        vendor_matched=True, amount_matched=True, match=match)
+
+
+def precheck(invoice: Invoice, statement: BankStatement) -> RuleDecision:
+    """
+    Settle the audit locally when the rules leave no doubt.
+
+    PASS: GST is correct and a debit to the vendor equals the total, or the
+    total less TDS at a standard rate. FAIL: GST is wrong, or neither the
+    vendor nor an amount near the total appears in the statement. Anything
+    in between (e.g. no GST line to check, or an unexplained gap under
+    NEAR_MISS_TOLERANCE) is left to the model.
+    """
+    if invoice.total is None:
+        return RuleDecision(None, "Invoice total not found")
+
+    tax_compliant = _tax_compliant(invoice)
+    if tax_compliant is False:
+        return RuleDecision("FAIL", f"GST is not {invoice.tax_rate:.0%} of the subtotal", tax_compliant=False)
+
+    amounts, vendors = statement_indexes(statement)
+    vendor_matched = None
+    if invoice.vendor:
+        vendor_matched = vendors.match(invoice.vendor) is not None
+
+    label, match = _vendor_payment(invoice, amounts, date_window=90)
+    if label is not None:
+        return _paid(label, match, tax_compliant)
+
+    near = amounts.find(invoice.total, tolerance=NEAR_MISS_TOLERANCE, direction=DEBIT)
+    if vendor_matched is False and not near:
+        return RuleDecision("FAIL", "Neither the vendor nor the amount appears in the statement",
+                            tax_compliant=tax_compliant, vendor_matched=False, amount_matched=False)
+    return RuleDecision(None, "Needs analyst review", tax_compliant=tax_compliant, vendor_matched=vendor_matched,
+                        match=near[0] if near else None)
+
+
+def explain_gap(invoice: Invoice, statement: BankStatement) -> RuleDecision:
+    """
+    Classify why the model failed an audit, so retries go only where they can help.
+
+    PASS: the GST is correct and the gap is explained, i.e. a debit to the
+    vendor equals the total or the total less TDS at a standard rate, on
+    any date. FAIL: GST is wrong, or no debit lies within GAP_TOLERANCE of
+    the total, so there is nothing left to explain. Otherwise the status is
+    None and one more model attempt may settle it.
+    """
+    if invoice.total is None:
+        return RuleDecision(None, "Invoice total not found")
+
+    tax_compliant = _tax_compliant(invoice)
+    if tax_compliant is False:
+        return RuleDecision("FAIL", f"GST is not {invoice.tax_rate:.0%} of the subtotal", tax_compliant=False)
+
+    amounts, _ = statement_indexes(statement)
+    label, match = _vendor_payment(invoice, amounts, date_window=None)
+    if label is not None:
+        return _paid(label, match, tax_compliant)
+
+    tolerance = max(NEAR_MISS_TOLERANCE, GAP_TOLERANCE * invoice.total)
+    near = amounts.find(invoice.total, tolerance=tolerance, direction=DEBIT)
+    if not near:
+        return RuleDecision("FAIL", f"No debit within {GAP_TOLERANCE:.0%} of the invoice total",
+                            tax_compliant=tax_compliant, amount_matched=False)
+    closest = near[0]  # Best first: smallest amount gap
+    return RuleDecision(None, f"Closest debit is {closest.amount_diff:.2f} off the total",
+                        tax_compliant=tax_compliant, match=closest)
@@ -0,0 +1,66 @@
+"""Read-only bank statement columns shared with worker processes through memory-mapped files."""
+import os
+import shutil
+import sys
+import tempfile
+from typing import List, Optional
+
+import numpy as np
+
+from .statement import BankStatement
+
+_SEPARATOR = "\x00"
+
+
+def _save_strings(path: str, values: List[str]) -> None:
+    blob = _SEPARATOR.join(values).encode("utf-8")
+    np.save(path, np.frombuffer(blob, dtype=np.uint8))
+
+
+def _load_strings(path: str, rows: int) -> List[str]:
+    if rows == 0:
+        return []
+    blob = np.load(path, mmap_mode="r")
+    return [sys.intern(v) for v in bytes(blob).decode("utf-8").split(_SEPARATOR)]
+
+
+class SharedStatement:
+    """
+    A statement's columns written once to a temporary directory of .npy files.
+
+    Worker processes call attach_statement(path) to memory-map the numeric
+    columns instead of receiving a pickled copy, so every worker reads the
+    same page-cache pages. Only the string columns are decoded per worker.
+    The directory is removed on close().
+    """
+
+    def __init__(self, statement: BankStatement, directory: Optional[str] = None):
+        self.rows = len(statement)
+        self.path = tempfile.mkdtemp(prefix="vouchvault-statement-", dir=directory)
+        np.save(os.path.join(self.path, "dates.npy"), statement.dates)
+        np.save(os.path.join(self.path, "amounts.npy"), statement.amounts)
+        np.save(os.path.join(self.path, "balances.npy"), statement.balances)
+        _save_strings(os.path.join(self.path, "descriptions.npy"), statement.descriptions)
+        _save_strings(os.path.join(self.path, "types.npy"), statement.types)
+
+    def close(self) -> None:
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def __enter__(self) -> "SharedStatement":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def attach_statement(path: str) -> BankStatement:
+    """Open a SharedStatement directory as a read-only, memory-mapped BankStatement."""
+    amounts = np.load(os.path.join(path, "amounts.npy"), mmap_mode="r")
+    rows = len(amounts)
+    return BankStatement.from_columns(
+        dates=np.load(os.path.join(path, "dates.npy"), mmap_mode="r"),
+        descriptions=_load_strings(os.path.join(path, "descriptions.npy"), rows),
+        amounts=amounts,
+        types=_load_strings(os.path.join(path, "types.npy"), rows),
+        balances=np.load(os.path.join(path, "balances.npy"), mmap_mode="r"),
+    )
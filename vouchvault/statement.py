@@ -0,0 +1,173 @@
+"""Bank statement parsing shared across audits."""
+import csv
+import io
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+COLUMNS = ("date", "description", "amount", "type", "balance")
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def _to_float(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return float("nan")
+
+
+def _to_date(value: str) -> np.datetime64:
+    try:
+        return np.datetime64(value, "D")
+    except ValueError:
+        return np.datetime64("NaT", "D")
+
+
+def _float_column(values: List[str]) -> np.ndarray:
+    cleaned = [v.replace(',', '') for v in values]
+    try:
+        return np.asarray(cleaned, dtype=np.float64)
+    except ValueError:
+        # Blank or malformed cells: fall back to a per-value parse
+        return np.array([_to_float(v) for v in cleaned], dtype=np.float64)
+
+
+def _date_column(values: List[str]) -> np.ndarray:
+    try:
+        return np.asarray(values, dtype="datetime64[D]")
+    except ValueError:
+        return np.array([_to_date(v) for v in values], dtype="datetime64[D]")
+
+
+class BankStatement:
+    """
+    A bank statement parsed once and reused across many invoice audits.
+
+    Rows are held column-wise: `dates`, `amounts` and `balances` are NumPy
+    arrays (NaT/NaN where a cell is blank or malformed) and `descriptions`
+    and `types` are lists of interned strings. Indexing returns one row as
+    a CSV-style dict, built on demand.
+    """
+
+    def __init__(self, text: str = ""):
+        chunks = _parse_chunks(csv.reader(io.StringIO(text.strip())), DEFAULT_CHUNK_SIZE)
+        self._assign(_concat(list(chunks)))
+
+    @classmethod
+    def from_columns(cls, dates: np.ndarray, descriptions: List[str], amounts: np.ndarray,
+                     types: List[str], balances: np.ndarray) -> "BankStatement":
+        """Build a statement from already-parsed columns."""
+        statement = cls.__new__(cls)
+        statement.dates = dates
+        statement.descriptions = descriptions
+        statement.amounts = amounts
+        statement.types = types
+        statement.balances = balances
+        return statement
+
+    def _assign(self, other: "BankStatement") -> None:
+        self.dates = other.dates
+        self.descriptions = other.descriptions
+        self.amounts = other.amounts
+        self.types = other.types
+        self.balances = other.balances
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    def __getitem__(self, pos: int) -> Dict[str, str]:
+        date = self.dates[pos]
+        amount = self.amounts[pos]
+        balance = self.balances[pos]
+        return {
+            "date": "" if np.isnat(date) else str(date),
+            "description": self.descriptions[pos],
+            "amount": "" if np.isnan(amount) else f"{amount:.2f}",
+            "type": self.types[pos],
+            "balance": "" if np.isnan(balance) else f"{balance:.2f}",
+        }
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        for pos in range(len(self)):
+            yield self[pos]
+
+    @property
+    def records(self) -> List[Dict[str, str]]:
+        """Every row as a dict. Materialises the whole statement; prefer indexing."""
+        return list(self)
+
+    def to_csv(self, positions: Optional[Iterable[int]] = None) -> str:
+        """Render the statement (or just `positions`) back to CSV text for a prompt."""
+        out = io.StringIO()
+        writer = csv.DictWriter(out, fieldnames=COLUMNS, lineterminator="\n")
+        writer.writeheader()
+        for pos in (range(len(self)) if positions is None else positions):
+            writer.writerow(self[pos])
+        return out.getvalue().strip()
+
+
+def _parse_chunks(reader: Iterator[List[str]], chunk_size: int) -> Iterator[BankStatement]:
+    """Turn csv.reader rows into columnar chunks of at most `chunk_size` rows."""
+    header = next(reader, None)
+    if header is None:
+        return
+    fields = {name.strip().lower(): i for i, name in enumerate(header)}
+    rows: List[List[str]] = []
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        rows.append(row)
+        if len(rows) >= chunk_size:
+            yield _columns(rows, fields)
+            rows = []
+    if rows:
+        yield _columns(rows, fields)
+
+
+def _columns(rows: Sequence[List[str]], fields: Dict[str, int]) -> BankStatement:
+    def column(name: str) -> List[str]:
+        i = fields.get(name)
+        if i is None:
+            return [""] * len(rows)
+        return [row[i].strip() if i < len(row) else "" for row in rows]
+
+    return BankStatement.from_columns(
+        dates=_date_column(column("date")),
+        descriptions=[sys.intern(v) for v in column("description")],
+        amounts=_float_column(column("amount")),
+        types=[sys.intern(v.upper()) for v in column("type")],
+        balances=_float_column(column("balance")),
+    )
+
+
+def _concat(chunks: List[BankStatement]) -> BankStatement:
+    if not chunks:
+        return BankStatement.from_columns(
+            np.array([], dtype="datetime64[D]"), [], np.array([], dtype=np.float64),
+            [], np.array([], dtype=np.float64))
+    if len(chunks) == 1:
+        return chunks[0]
+    return BankStatement.from_columns(
+        dates=np.concatenate([c.dates for c in chunks]),
+        descriptions=[d for c in chunks for d in c.descriptions],
+        amounts=np.concatenate([c.amounts for c in chunks]),
+        types=[t for c in chunks for t in c.types],
+        balances=np.concatenate([c.balances for c in chunks]),
+    )
+
+
+def iter_bank_statement(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[BankStatement]:
+    """
+    Stream a bank statement CSV file as columnar chunks.
+
+    Only one chunk of raw rows is held at a time, so multi-GB exports can be
+    processed with bounded memory.
+    """
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        yield from _parse_chunks(csv.reader(f), chunk_size)
+
+
+def load_bank_statement(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> BankStatement:
+    """Read and parse a bank statement CSV file chunk by chunk."""
+    return _concat(list(iter_bank_statement(path, chunk_size)))
@@ -1,4 +1,10 @@
-from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # The indexes pull in NumPy; import them only when a lookup needs them
+    from .matching import StatementIndex
+    from .statement import BankStatement
+    from .vendors import VendorIndex
 
 def calculate_gst(amount: float, rate: float = 0.18) -> float:
     """Calculates the GST amount based on the base amount and rate."""
@@ -25,54 +31,57 @@ def fuzzy_match_vendor(invoice_vendor: str, bank_statement_text: str) -> dict:
     """
     Checks if the vendor name exists in the bank statement using similarity matching.
     """
-    clean_vendor = invoice_vendor.lower().strip()
-    clean_statement = bank_statement_text.lower()
-    
+    match = _vendor_index(bank_statement_text).match(invoice_vendor)
+
+    if match is None:
+        return {"match_found": False, "vendor": invoice_vendor}
+
     # 1. Exact Substring Match (Fastest)
-    if clean_vendor in clean_statement:
+    if match.method == "exact":
         return {"match_found": True, "vendor": invoice_vendor, "method": "exact"}
-    
-    # 2. Similarity Match (Smarter)
-    # Check similarity against the whole statement
-    similarity = SequenceMatcher(None, clean_vendor, clean_statement).ratio()
-    
+
+    # 2. Similarity Match against the whole statement
     # Threshold: 0.6 means 60% similarity (e.g. "ABC Serv" matches "ABC Services")
-    if similarity > 0.6:  
+    if match.method == "statement":
         return {
-            "match_found": True, 
-            "vendor": invoice_vendor, 
-            "confidence": round(similarity, 2),
+            "match_found": True,
+            "vendor": invoice_vendor,
+            "confidence": round(match.confidence, 2),
             "note": "Fuzzy match detected"
         }
-    
-    # 3. Check against individual words/phrases in the statement
+
+    # 3. Best 1-3 word phrase in the statement (threshold 0.75)
     # This catches cases like "TechSolutions" in "Transfer to TechSolutons"
-    words = clean_statement.split()
-    for i in range(len(words)):
-        # Try matching against 1-word, 2-word, 3-word phrases
-        for phrase_len in [1, 2, 3]:
-            if i + phrase_len <= len(words):
-                phrase = ' '.join(words[i:i+phrase_len])
-                phrase_sim = SequenceMatcher(None, clean_vendor, phrase).ratio()
-                if phrase_sim > 0.75:  # Higher threshold for phrase matching
-                    return {
-                        "match_found": True,
-                        "vendor": invoice_vendor,
-                        "confidence": round(phrase_sim, 2),
-                        "note": f"Fuzzy match detected (phrase: '{phrase}')"
-                    }
-         
-    return {"match_found": False, "vendor": invoice_vendor}
+    return {
+        "match_found": True,
+        "vendor": invoice_vendor,
+        "confidence": round(match.confidence, 2),
+        "note": f"Fuzzy match detected (phrase: '{match.phrase}')"
+    }
 
-from typing import Optional, List, Dict
 
-def match_invoice_to_statement(invoice_amount: float, bank_records: List[Dict]) -> Optional[Dict]:
+@lru_cache(maxsize=8)
+def _vendor_index(bank_statement_text: str) -> "VendorIndex":
+    """The phrase index is built once per statement text and reused across invoices."""
+    from .vendors import VendorIndex
+    return VendorIndex(bank_statement_text)
+
+from typing import Optional, List, Dict, Union
+
+def match_invoice_to_statement(invoice_amount: float, bank_records: Union[List[Dict], "BankStatement", "StatementIndex"]) -> Optional[Dict]:
     """
     Finds a matching transaction in the bank records based on the amount.
-    Uses tolerance for float comparison and handles negative debits.
+    Amounts are compared as integer paise and negative debits are handled.
+    Pass a prebuilt StatementIndex when matching many invoices against one statement.
     """
-    for record in bank_records:
-        record_amount = abs(float(record["amount"]))  # Handle negative debits
-        if abs(record_amount - invoice_amount) < 0.01:  # Tolerance for float comparison
-            return record
-    return None
+    from .matching import StatementIndex
+    from .statement import BankStatement
+
+    if isinstance(bank_records, StatementIndex):
+        index = bank_records
+    elif isinstance(bank_records, BankStatement):
+        index = StatementIndex.from_statement(bank_records)
+    else:
+        index = StatementIndex(bank_records)
+    candidates = index.find(invoice_amount)
+    return candidates[0].records[0] if candidates else None
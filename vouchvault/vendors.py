@@ -0,0 +1,127 @@
+"""Indexed vendor-name matching (built once per statement, queried per vendor)."""
+import heapq
+from collections import Counter
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .statement import BankStatement
+
+STATEMENT_THRESHOLD = 0.6  # Similarity against the whole statement text
+PHRASE_THRESHOLD = 0.75    # Similarity against a 1-3 word phrase
+MAX_PHRASE_WORDS = 3
+
+
+@dataclass
+class VendorMatch:
+    """One place a vendor name was found in a statement."""
+    method: str          # "exact", "statement" (whole text) or "phrase"
+    confidence: float    # SequenceMatcher ratio, 1.0 for exact matches
+    phrase: Optional[str] = None
+
+
+def _length_bound(la: int, lb: int) -> float:
+    """Same upper bound as SequenceMatcher.real_quick_ratio."""
+    return 2.0 * min(la, lb) / (la + lb) if la + lb else 1.0
+
+
+class VendorIndex:
+    """
+    Distinct 1-3 word phrases of a statement with their lengths and
+    per-character counts, one column per character of the statement.
+
+    A query computes SequenceMatcher.quick_ratio for every phrase at once:
+    the characters a phrase shares with the vendor (counted with
+    multiplicity) bound the characters any alignment can match, so no
+    phrase above the threshold is ever pruned and the decisions are the
+    same as scoring every phrase. Phrases are then scored best bound
+    first, and the scan stops once the bound falls to the current floor.
+    """
+
+    def __init__(self, text: str, max_words: int = MAX_PHRASE_WORDS):
+        self.text = text.lower()
+        self.max_words = max_words
+        word_ids: Dict[str, int] = {}
+        tokens = [word_ids.setdefault(w, len(word_ids)) for w in self.text.split()]
+        words = list(word_ids)
+        members: Dict[Tuple[int, ...], None] = {}
+        for i in range(len(tokens)):
+            for n in range(1, max_words + 1):
+                if i + n <= len(tokens):
+                    members[tuple(tokens[i:i + n])] = None
+        self.phrases: List[str] = [' '.join([words[w] for w in ids]) for ids in members]
+        self._lengths = np.fromiter(map(len, self.phrases), dtype=np.int64, count=len(self.phrases))
+
+        pad = len(words)  # Word id of the empty row that pads short phrases
+        padded = np.array([ids + (pad,) * (max_words - len(ids)) for ids in members],
+                          dtype=np.int64).reshape(-1, max_words)
+
+        self._columns: Dict[str, int] = {' ': 0}
+        for word in words:
+            for ch in word:
+                self._columns.setdefault(ch, len(self._columns))
+        by_word = np.zeros((pad + 1, len(self._columns)), dtype=np.int64)
+        for wid, word in enumerate(words):
+            for ch, n in Counter(word).items():
+                by_word[wid, self._columns[ch]] = n
+        dtype = np.min_scalar_type(max(int(by_word.max(initial=0)), 1) * max_words)
+        self._counts = np.empty((len(self.phrases), len(self._columns)), dtype=dtype, order="F")
+        for column in range(1, len(self._columns)):
+            self._counts[:, column] = by_word[padded, column].sum(axis=1)
+        self._counts[:, 0] = (padded != pad).sum(axis=1) - 1  # Spaces between the words
+
+    @classmethod
+    def from_statement(cls, statement: BankStatement) -> "VendorIndex":
+        """Index only the description column, one description per line."""
+        return cls("\n".join(statement.descriptions))
+
+    def __len__(self) -> int:
+        return len(self.phrases)
+
+    def _bounds(self, clean: str) -> np.ndarray:
+        """SequenceMatcher.quick_ratio of `clean` against every phrase."""
+        matches = np.zeros(len(self.phrases), dtype=np.int64)
+        for ch, n in Counter(clean).items():
+            column = self._columns.get(ch)
+            if column is not None:
+                matches += np.minimum(self._counts[:, column], n)
+        return 2.0 * matches / (len(clean) + self._lengths)
+
+    def search(self, vendor: str, k: int = 5, threshold: float = PHRASE_THRESHOLD) -> List[VendorMatch]:
+        """Top `k` phrases scoring above `threshold` against `vendor`, best first."""
+        clean = vendor.lower().strip()
+        bounds = self._bounds(clean)
+        candidates = np.flatnonzero(bounds > threshold)
+        candidates = candidates[np.argsort(-bounds[candidates], kind="stable")]
+        matcher = SequenceMatcher(None, clean, "")
+        best: List[tuple] = []  # min-heap of (score, phrase)
+        floor = threshold
+        for pid in candidates.tolist():
+            if bounds[pid] <= floor:
+                break
+            phrase = self.phrases[pid]
+            matcher.set_seq2(phrase)
+            ratio = matcher.ratio()
+            if ratio > floor:
+                if len(best) >= k:
+                    heapq.heapreplace(best, (ratio, phrase))
+                else:
+                    heapq.heappush(best, (ratio, phrase))
+                if len(best) >= k:
+                    floor = best[0][0]
+        best.sort(reverse=True)
+        return [VendorMatch("phrase", ratio, phrase) for ratio, phrase in best]
+
+    def match(self, vendor: str) -> Optional[VendorMatch]:
+        """Best match using the exact, whole-statement and phrase checks in turn."""
+        clean = vendor.lower().strip()
+        if clean in self.text:
+            return VendorMatch("exact", 1.0)
+        if _length_bound(len(clean), len(self.text)) > STATEMENT_THRESHOLD:
+            similarity = SequenceMatcher(None, clean, self.text).ratio()
+            if similarity > STATEMENT_THRESHOLD:
+                return VendorMatch("statement", similarity)
+        found = self.search(vendor, k=1)
+        return found[0] if found else None